@@ -12,6 +12,7 @@ ERR_INVALID_ADDRESS = 14 # Invalid range.
 ERR_INVALID_RANGE = 16 # Invalid range.
 ERR_NO_FILE_NAME = 32 # Command can't take arguments.
 ERR_UNSAVED_CHANGES = 37 # The buffer has been modified but not saved.
+ERR_NO_ERRORS = 42 # The quickfix list is empty.
 ERR_READONLY_FILE = 45
 ERR_UNDEFINED_VARIABLE = 121
 ERR_CANT_MOVE_LINES_ONTO_THEMSELVES = 134
@@ -20,9 +21,12 @@ ERR_CANT_FIND_DIR_IN_CDPATH = 344
 ERR_OTHER_BUFFER_HAS_CHANGES = 445 # :only, for example, may trigger this
 ERR_INVALID_ARGUMENT = 474
 ERR_NO_BANG_ALLOWED = 477 # Command doesn't allow !.
+ERR_NO_MATCH = 480
 ERR_NO_RANGE_ALLOWED = 481 # Command can't take a range.
 ERR_TRAILING_CHARS = 488 # Unknown command.
 ERR_UNKNOWN_COMMAND = 492 # Command can't take arguments.
+ERR_NO_MORE_ITEMS = 553 # :cnext past the end of the quickfix list, for example.
+ERR_INVALID_SEARCH_PATTERN = 682
 ERR_EMPTY_BUFFER = 749 # for example, :print in an empty buffer
 
 
@@ -34,6 +38,7 @@ ERR_MESSAGES = {
     ERR_NO_FILE_NAME: 'No file name.',
     ERR_UNSAVED_CHANGES: 'There are unsaved changes.',
     ERR_READONLY_FILE: "'readonly' option is set (add ! to override)",
+    ERR_NO_ERRORS: "No Errors.",
     # TODO: Should pass the name of the variable to this message:
     ERR_UNDEFINED_VARIABLE: "Undefined variable.",
     ERR_CANT_MOVE_LINES_ONTO_THEMSELVES: "Move lines into themselves.",
@@ -42,9 +47,12 @@ ERR_MESSAGES = {
     ERR_OTHER_BUFFER_HAS_CHANGES: "Other buffer contains changes.",
     ERR_INVALID_ARGUMENT: "Invalid argument.",
     ERR_NO_BANG_ALLOWED: 'No ! allowed.',
+    ERR_NO_MATCH: "No match.",
     ERR_NO_RANGE_ALLOWED: 'No range allowed.',
     ERR_TRAILING_CHARS: 'Traling characters.',
     ERR_UNKNOWN_COMMAND: 'Not an editor command.',
+    ERR_NO_MORE_ITEMS: 'No more items.',
+    ERR_INVALID_SEARCH_PATTERN: 'Invalid search pattern or delimiter.',
     ERR_EMPTY_BUFFER: 'Empty buffer.',
 }
 
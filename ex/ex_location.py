@@ -1,5 +1,7 @@
 import sublime
 
+from Vintageous.vi import search as vi_search
+
 
 def get_line_nr(view, point):
     """Return 1-based line number for `point`.
@@ -64,31 +66,16 @@ def find_last_match(view, what, start, end, flags=0):
 
 
 def reverse_search(view, what, start=0, end=-1, flags=0):
-    """Do binary search to find `what` walking backwards in the buffer.
+    """Find the last occurrence of `what` before `end`, walking backwards.
+
+    Return: 1-based line number of the match, or `None` if not found.
     """
     if end == -1:
         end = view.size()
-    end = find_eol(view, view.line(end).a)
 
-    last_match = None
-
-    lo, hi = start, end
-    while True:
-        middle = (lo + hi) / 2
-        line = view.line(middle)
-        middle, eol = find_bol(view, line.a), find_eol(view, line.a)
-
-        if search_in_range(view, what, middle, hi, flags):
-            lo = middle
-        elif search_in_range(view, what, lo, middle - 1, flags):
-            hi = middle -1
-
-        # Don't search forever the same line.
-        if last_match and line.contains(last_match):
-            match = find_last_match(view, what, lo, hi, flags=flags)
-            return view.rowcol(match.begin())[0] + 1
-
-        last_match = sublime.Region(line.begin(), line.end())
+    match = vi_search.reverse_search(view, what, start, end, flags)
+    if match:
+        return view.rowcol(match.begin())[0] + 1
 
 
 def search(view, what, start_line=None, flags=0):
@@ -9,6 +9,7 @@ from Vintageous.ex.parser.tokens import TokenOfSearch
 from Vintageous.ex.parser.tokens import TokenPercent
 from Vintageous.ex.parser.tokens import TokenSearchBackward
 from Vintageous.ex.parser.tokens import TokenSearchForward
+from Vintageous.vi import regex
 from Vintageous.vi.search import reverse_search_by_pt
 from Vintageous.vi.utils import first_sel
 from Vintageous.vi.utils import R
@@ -78,7 +79,9 @@ class RangeNode(Node):
 
         if isinstance(token, TokenSearchForward):
             start_pt = view.text_point(current, 0)
-            match = view.find(str(token)[1:-1], start_pt)
+            pattern, flags = regex.to_sublime(str(token)[1:-1],
+                                              *regex.get_options(view))
+            match = view.find(pattern, start_pt, flags)
             if not match:
                 # TODO: Convert this to a VimError or something like that.
                 raise ValueError('pattern not found')
@@ -86,7 +89,9 @@ class RangeNode(Node):
 
         if isinstance(token, TokenSearchBackward):
             start_pt = view.text_point(current, 0)
-            match = reverse_search_by_pt(view, str(token)[1:-1], 0, start_pt)
+            pattern, flags = regex.to_sublime(str(token)[1:-1],
+                                              *regex.get_options(view))
+            match = reverse_search_by_pt(view, pattern, 0, start_pt, flags)
             if not match:
                 # TODO: Convert this to a VimError or something like that.
                 raise ValueError('pattern not found')
@@ -0,0 +1,22 @@
+from .state import EOF
+from .tokens import TokenEof
+from .tokens_base import TOKEN_COMMAND_CCLOSE
+from .tokens_base import TokenOfCommand
+from Vintageous import ex
+
+
+@ex.command('cclose', 'ccl')
+class TokenCommandCclose(TokenOfCommand):
+    def __init__(self, *args, **kwargs):
+        super().__init__({},
+                         TOKEN_COMMAND_CCLOSE,
+                         'cclose', *args, **kwargs)
+        self.target_command = 'ex_cclose'
+
+
+def scan_command_cclose(state):
+    state.skip(' ')
+    state.ignore()
+    state.expect(EOF)
+
+    return None, [TokenCommandCclose(), TokenEof()]
@@ -0,0 +1,42 @@
+from .state import EOF
+from .tokens import TokenEof
+from .tokens_base import TOKEN_COMMAND_CNEXT
+from .tokens_base import TokenOfCommand
+from Vintageous import ex
+
+
+@ex.command('cnext', 'cn')
+class TokenCommandCnext(TokenOfCommand):
+    def __init__(self, params, *args, **kwargs):
+        super().__init__(params,
+                         TOKEN_COMMAND_CNEXT,
+                         'cnext', *args, **kwargs)
+        self.target_command = 'ex_cnext'
+
+    @property
+    def count(self):
+        return self.params['count']
+
+
+def scan_command_cnext(state):
+    params = {
+        'count': 1,
+    }
+
+    c = state.consume()
+
+    bang = c == '!'
+    if not bang and c != EOF:
+        state.backup()
+
+    state.skip(' ')
+    state.ignore()
+
+    m = state.match(r'\d+')
+    if m:
+        params['count'] = int(m.group(0))
+        state.skip(' ')
+
+    state.expect(EOF)
+
+    return None, [TokenCommandCnext(params, forced=bang), TokenEof()]
@@ -0,0 +1,27 @@
+from .state import EOF
+from .tokens import TokenEof
+from .tokens_base import TOKEN_COMMAND_COPEN
+from .tokens_base import TokenOfCommand
+from Vintageous import ex
+
+
+@ex.command('copen', 'cope')
+class TokenCommandCopen(TokenOfCommand):
+    def __init__(self, *args, **kwargs):
+        super().__init__({},
+                         TOKEN_COMMAND_COPEN,
+                         'copen', *args, **kwargs)
+        self.target_command = 'ex_copen'
+
+
+def scan_command_copen(state):
+    state.skip(' ')
+    state.ignore()
+
+    # The height argument is accepted, but ignored.
+    state.match(r'\d*')
+    state.skip(' ')
+
+    state.expect(EOF)
+
+    return None, [TokenCommandCopen(), TokenEof()]
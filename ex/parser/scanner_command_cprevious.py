@@ -0,0 +1,42 @@
+from .state import EOF
+from .tokens import TokenEof
+from .tokens_base import TOKEN_COMMAND_CPREVIOUS
+from .tokens_base import TokenOfCommand
+from Vintageous import ex
+
+
+@ex.command('cprevious', 'cp')
+class TokenCommandCprevious(TokenOfCommand):
+    def __init__(self, params, *args, **kwargs):
+        super().__init__(params,
+                         TOKEN_COMMAND_CPREVIOUS,
+                         'cprevious', *args, **kwargs)
+        self.target_command = 'ex_cprevious'
+
+    @property
+    def count(self):
+        return self.params['count']
+
+
+def scan_command_cprevious(state):
+    params = {
+        'count': 1,
+    }
+
+    c = state.consume()
+
+    bang = c == '!'
+    if not bang and c != EOF:
+        state.backup()
+
+    state.skip(' ')
+    state.ignore()
+
+    m = state.match(r'\d+')
+    if m:
+        params['count'] = int(m.group(0))
+        state.skip(' ')
+
+    state.expect(EOF)
+
+    return None, [TokenCommandCprevious(params, forced=bang), TokenEof()]
@@ -0,0 +1,82 @@
+import re
+
+from .state import EOF
+from .tokens import TokenEof
+from .tokens_base import TOKEN_COMMAND_VIMGREP
+from .tokens_base import TokenOfCommand
+from Vintageous import ex
+
+
+@ex.command('vimgrep', 'vim')
+class TokenCommandVimgrep(TokenOfCommand):
+    def __init__(self, params, *args, **kwargs):
+        super().__init__(params,
+                         TOKEN_COMMAND_VIMGREP,
+                         'vimgrep', *args, **kwargs)
+        self.target_command = 'ex_vimgrep'
+
+    @property
+    def pattern(self):
+        return self.params['pattern']
+
+    @property
+    def flags(self):
+        return self.params['flags']
+
+    @property
+    def files(self):
+        return self.params['files']
+
+
+def scan_command_vimgrep(state):
+    params = {
+        'pattern': None,
+        'flags': [],
+        'files': [],
+    }
+
+    c = state.consume()
+
+    bang = c == '!'
+    if not bang and c != EOF:
+        state.backup()
+
+    state.skip(' ')
+    state.ignore()
+
+    c = state.consume()
+    if c == EOF:
+        raise ValueError('expected pattern in: ' + state.source)
+
+    if c.isalnum() or c == '_':
+        # :vimgrep {pattern} {file} ...
+        state.backup()
+        params['pattern'] = state.match(r'\S+').group(0)
+    else:
+        # :vimgrep /{pattern}/[g][j] {file} ...
+        sep = c
+        state.ignore()
+        while True:
+            c = state.consume()
+
+            if c == EOF:
+                raise ValueError('unexpected EOF in: ' + state.source)
+
+            if c == '\\':
+                state.consume()
+                continue
+
+            if c == sep:
+                state.backup()
+                params['pattern'] = state.emit().replace('\\' + sep, sep)
+                state.consume()
+                state.ignore()
+                break
+
+        params['flags'] = list(state.match(r'[gj]*').group(0))
+
+    params['files'] = [f.replace('\\ ', ' ') for f in
+                       re.split(r'(?<!\\)\s+', state.match(r'.*$').group(0))
+                       if f]
+
+    return None, [TokenCommandVimgrep(params, forced=bang), TokenEof()]
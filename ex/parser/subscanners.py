@@ -7,9 +7,13 @@ from collections import OrderedDict
 from .scanner_command_abbreviate import scan_command_abbreviate
 from .scanner_command_browse import scan_command_browse
 from .scanner_command_buffers import scan_command_buffers
+from .scanner_command_cclose import scan_command_cclose
 from .scanner_command_cd_command import scan_command_cd_command
 from .scanner_command_cdd_command import scan_command_cdd_command
+from .scanner_command_cnext import scan_command_cnext
+from .scanner_command_copen import scan_command_copen
 from .scanner_command_copy import scan_command_copy
+from .scanner_command_cprevious import scan_command_cprevious
 from .scanner_command_cquit import scan_command_cquit
 from .scanner_command_delete import scan_command_delete
 from .scanner_command_double_ampersand import scan_command_double_ampersand
@@ -46,6 +50,7 @@ from .scanner_command_tab_prev_command import scan_command_tab_prev_command
 from .scanner_command_unabbreviate import scan_command_unabbreviate
 from .scanner_command_unmap import scan_command_unmap
 from .scanner_command_unvsplit import scan_command_unvsplit
+from .scanner_command_vimgrep import scan_command_vimgrep
 from .scanner_command_vmap import scan_command_vmap
 from .scanner_command_vsplit import scan_command_vsplit
 from .scanner_command_vunmap import scan_command_vunmap
@@ -64,13 +69,18 @@ patterns[r'!(?=.+)'] = scan_command_shell_out
 patterns[r'&&?'] = scan_command_double_ampersand
 patterns[r'ab(?:breviate)?'] = scan_command_abbreviate
 patterns[r'bro(?:wse)?'] = scan_command_browse
+patterns[r'ccl(?:ose)?(?=[^a-z]|$)'] = scan_command_cclose
+patterns[r'cn(?:ext)?(?=[^a-z]|$)'] = scan_command_cnext
+patterns[r'cope(?:n)?(?=[^a-z]|$)'] = scan_command_copen
 patterns[r'co(?:py)?'] = scan_command_copy
+patterns[r'(?:cp(?:revious)?|cN(?:ext)?)(?=[^a-z]|$)'] = scan_command_cprevious
 patterns[r'cq(?:uit)?'] = scan_command_cquit
 patterns[r'd(?:elete)?'] = scan_command_delete
 patterns[r'exi(?:t)?'] = scan_command_exit
 patterns[r'f(?:ile)?'] = scan_command_file
 patterns[r'g(?:lobal)?(?=[^ ])'] = scan_command_global
 patterns[r'(?:ls|files|buffers)!?'] = scan_command_buffers
+patterns[r'vim(?:grep)?(?=[^a-z]|$)'] = scan_command_vimgrep
 patterns[r'vs(?:plit)?'] = scan_command_vsplit
 patterns[r'x(?:it)?$'] = scan_command_exit
 patterns[r'^cd(?=[^d]|$)'] = scan_command_cd_command
@@ -74,6 +74,11 @@ TOKEN_COMMAND_SET_LOCAL = 53
 TOKEN_COMMAND_SET = 54
 TOKEN_COMMAND_LET = 55
 TOKEN_COMMAND_WRITE_AND_QUIT_ALL = 56
+TOKEN_COMMAND_VIMGREP = 57
+TOKEN_COMMAND_CNEXT = 58
+TOKEN_COMMAND_CPREVIOUS = 59
+TOKEN_COMMAND_COPEN = 60
+TOKEN_COMMAND_CCLOSE = 61
 
 
 class Token(object):
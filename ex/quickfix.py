@@ -0,0 +1,100 @@
+"""
+Quickfix lists.
+
+:vimgrep fills the quickfix list of the current window with the locations of
+its matches; :cnext, :cprevious and :copen browse them.
+"""
+
+from collections import namedtuple
+
+import sublime
+
+
+# Stores QuickfixList instances indexed by window.id().
+_lists = {}
+
+
+class QuickfixEntry(namedtuple('QuickfixEntry', 'file_name row col text')):
+    """
+    Location in a file. Rows and columns are 1-based.
+    """
+
+    def encoded_position(self):
+        return '{0}:{1}:{2}'.format(self.file_name, self.row, self.col)
+
+    def __str__(self):
+        return '{0}:{1}:{2}: {3}'.format(self.file_name, self.row, self.col,
+                                         self.text)
+
+
+def get_list(window):
+    """
+    Returns the quickfix list of @window.
+    """
+    try:
+        return _lists[window.id()]
+    except KeyError:
+        qf_list = QuickfixList()
+        _lists[window.id()] = qf_list
+        return qf_list
+
+
+def new_list(window, title=''):
+    """
+    Replaces the quickfix list of @window with an empty one and returns it.
+    """
+    qf_list = QuickfixList(title)
+    _lists[window.id()] = qf_list
+    return qf_list
+
+
+def open_entry(window, entry, flags=0):
+    """
+    Opens the file of @entry in @window at its location.
+    """
+    return window.open_file(entry.encoded_position(),
+                            sublime.ENCODED_POSITION | flags)
+
+
+class QuickfixList(object):
+    """
+    Sequence of `QuickfixEntry` with a current entry.
+    """
+
+    def __init__(self, title=''):
+        self.title = title
+        self.entries = []
+        self.index = -1
+
+    def __len__(self):
+        return len(self.entries)
+
+    def extend(self, entries):
+        self.entries.extend(entries)
+
+    def current(self):
+        if 0 <= self.index < len(self.entries):
+            return self.entries[self.index]
+
+    def select(self, index):
+        """
+        Makes the entry at @index current and returns it, or returns `None`
+        if there's no such entry.
+        """
+        if not 0 <= index < len(self.entries):
+            return None
+        self.index = index
+        return self.entries[index]
+
+    def move(self, count):
+        """
+        Moves @count entries forward (or backwards, if @count is negative)
+        and returns the new current entry. Stops at the first and last
+        entries; returns `None` if already there.
+        """
+        if not self.entries:
+            return None
+        index = max(0, min(self.index + count, len(self.entries) - 1))
+        if index == self.index:
+            return None
+        return self.select(index)
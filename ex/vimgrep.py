@@ -0,0 +1,272 @@
+"""
+Multi-file search for :vimgrep.
+
+Files are enumerated in a background thread and searched by a pool of
+worker threads, so the UI stays responsive even in projects with tens of
+thousands of files. Matches are delivered to the UI thread in batches as
+they're found. Big files are memory-mapped instead of read into memory.
+
+Files are searched as bytes: patterns are encoded as UTF-8, and classes like
+\\w only match ASCII characters.
+"""
+
+import fnmatch
+import mmap
+import os
+import queue
+import re
+import threading
+
+import sublime
+
+from Vintageous.ex.quickfix import QuickfixEntry
+from Vintageous.vi import regex
+
+
+# Stores the running Grep indexed by window.id().
+_searches = {}
+
+# Files larger than this many bytes are memory-mapped.
+MMAP_THRESHOLD = 1 << 20
+# Number of threads searching files.
+WORKER_COUNT = 4
+# Number of matches delivered to the UI thread at a time.
+BATCH_SIZE = 256
+# Files with a null byte in their first bytes are skipped as binary.
+BINARY_CHECK_SIZE = 1 << 13
+
+
+def start(window, grep):
+    """
+    Runs @grep on behalf of @window, cancelling any search that window was
+    running.
+    """
+    cancel(window)
+    _searches[window.id()] = grep
+    grep.start()
+
+
+def cancel(window):
+    """
+    Cancels the search running on behalf of @window, if any.
+
+    Returns `True` if a search was stopped.
+    """
+    grep = _searches.pop(window.id(), None)
+    if grep is None or grep.finished:
+        return False
+    grep.cancel()
+    return True
+
+
+def compile_pattern(pattern, magic=True, ignorecase=False):
+    """
+    Compiles the Vim pattern @pattern to search files as bytes.
+
+    Raises `ValueError` or `re.error` if the pattern is invalid.
+    """
+    translated, flags = regex.to_sublime(pattern, magic, ignorecase)
+    re_flags = re.MULTILINE
+    if flags & sublime.IGNORECASE:
+        re_flags |= re.IGNORECASE
+    return re.compile(translated.encode('utf-8'), re_flags)
+
+
+def iter_files(specs, folder_exclude_patterns=(), file_exclude_patterns=()):
+    """
+    Yields the paths of the files matching @specs.
+
+    @specs
+      Absolute file names, glob patterns, or directories. '**' in a pattern
+      matches any number of directories. Directories stand for all the files
+      under them.
+    @folder_exclude_patterns
+      Glob patterns for the names of directories to skip.
+    @file_exclude_patterns
+      Glob patterns for the names of files to skip.
+    """
+    seen = set()
+
+    def excluded_file(name):
+        return any(fnmatch.fnmatch(name, p) for p in file_exclude_patterns)
+
+    def walk(base, pattern):
+        for root, dirs, files in os.walk(base):
+            dirs[:] = [d for d in dirs if not any(
+                fnmatch.fnmatch(d, p) for p in folder_exclude_patterns)]
+            for name in files:
+                path = os.path.join(root, name)
+                target = (name if os.sep not in pattern and '/' not in pattern
+                          else os.path.relpath(path, base))
+                if fnmatch.fnmatch(target, pattern) and not excluded_file(name):
+                    yield path
+
+    for spec in specs:
+        if os.path.isdir(spec):
+            paths = walk(spec, '*')
+        elif '**' in spec:
+            base, _, pattern = spec.partition('**')
+            pattern = pattern.lstrip('/\\') or '*'
+            paths = walk(base.rstrip('/\\') or os.sep, pattern)
+        else:
+            paths = (p for p in _glob(spec) if os.path.isfile(p))
+
+        for path in paths:
+            if path not in seen:
+                seen.add(path)
+                yield path
+
+
+def _glob(spec):
+    if not any(c in spec for c in '*?['):
+        return [spec]
+    base, pattern = os.path.split(spec)
+    try:
+        names = os.listdir(base)
+    except OSError:
+        return []
+    return [os.path.join(base, name) for name in sorted(names)
+            if fnmatch.fnmatch(name, pattern)]
+
+
+class Grep(object):
+    """
+    Searches files for a pattern in background threads.
+
+    @on_matches is called on the UI thread with lists of `QuickfixEntry` as
+    they are found, and @on_done, with the number of files searched, when
+    the search ends. Neither is called after the search is cancelled.
+    """
+
+    def __init__(self, pattern, files, on_matches, on_done, all_matches=False):
+        """
+        @pattern
+          Pattern compiled with `compile_pattern()`.
+        @files
+          Iterable of file names to search. It's consumed in a background
+          thread.
+        @all_matches
+          If `True`, report every match in a line, not just the first one.
+        """
+        self.pattern = pattern
+        self.files = files
+        self.on_matches = on_matches
+        self.on_done = on_done
+        self.all_matches = all_matches
+        self.cancelled = threading.Event()
+        self.finished = False
+        self.queue = queue.Queue(maxsize=1024)
+        self.file_count = 0
+        self._lock = threading.Lock()
+        self._running = WORKER_COUNT
+
+    def start(self):
+        threading.Thread(target=self._produce, daemon=True).start()
+        for i in range(WORKER_COUNT):
+            threading.Thread(target=self._work, daemon=True).start()
+
+    def cancel(self):
+        self.cancelled.set()
+
+    def _produce(self):
+        try:
+            for path in self.files:
+                if self.cancelled.is_set():
+                    break
+                self.queue.put(path)
+        finally:
+            for i in range(WORKER_COUNT):
+                self.queue.put(None)
+
+    def _work(self):
+        batch = []
+        searched = 0
+        while True:
+            path = self.queue.get()
+            if path is None:
+                break
+            if self.cancelled.is_set():
+                # Keep draining the queue so that the producer can finish.
+                continue
+            searched += 1
+            for entry in self.search_file(path):
+                batch.append(entry)
+                if len(batch) >= BATCH_SIZE:
+                    self._deliver(batch)
+                    batch = []
+        if batch:
+            self._deliver(batch)
+
+        with self._lock:
+            self.file_count += searched
+            self._running -= 1
+            finished = self._running == 0
+        if finished:
+            sublime.set_timeout(self._finish, 0)
+
+    def _deliver(self, entries):
+        def deliver():
+            if not self.cancelled.is_set():
+                self.on_matches(entries)
+        sublime.set_timeout(deliver, 0)
+
+    def _finish(self):
+        self.finished = True
+        if not self.cancelled.is_set():
+            self.on_done(self.file_count)
+
+    def search_file(self, path):
+        """
+        Returns the matches in the file @path as `QuickfixEntry` instances.
+        """
+        try:
+            with open(path, 'rb') as f:
+                size = os.fstat(f.fileno()).st_size
+                if size == 0:
+                    return []
+                if size > MMAP_THRESHOLD:
+                    data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                else:
+                    data = f.read()
+                try:
+                    if b'\0' in data[:BINARY_CHECK_SIZE]:
+                        return []
+                    return self.search(path, data)
+                finally:
+                    if isinstance(data, mmap.mmap):
+                        data.close()
+        except (OSError, ValueError):
+            return []
+
+    def search(self, path, data):
+        """
+        Returns the matches in @data, the contents of the file @path.
+        """
+        entries = []
+        row = 0
+        last = 0
+        pos = 0
+        size = len(data)
+        while pos <= size and not self.cancelled.is_set():
+            match = self.pattern.search(data, pos)
+            if not match:
+                break
+
+            start = match.start()
+            row += data[last:start].count(b'\n')
+            last = start
+            line_start = data.rfind(b'\n', 0, start) + 1
+            line_end = data.find(b'\n', start)
+            if line_end == -1:
+                line_end = size
+
+            line = data[line_start:line_end]
+            col = len(line[:start - line_start].decode('utf-8', 'replace'))
+            text = line.decode('utf-8', 'replace').rstrip('\r')
+            entries.append(QuickfixEntry(path, row + 1, col + 1, text))
+
+            if self.all_matches:
+                pos = match.end() if match.end() > start else start + 1
+            else:
+                pos = line_end + 1
+        return entries
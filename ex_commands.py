@@ -7,7 +7,9 @@ import sublime
 import sublime_plugin
 
 from Vintageous.ex import ex_error
+from Vintageous.ex import quickfix
 from Vintageous.ex import shell
+from Vintageous.ex import vimgrep
 from Vintageous.ex.ex_error import Display
 from Vintageous.ex.ex_error import ERR_CANT_FIND_DIR_IN_CDPATH
 from Vintageous.ex.ex_error import ERR_CANT_MOVE_LINES_ONTO_THEMSELVES
@@ -15,7 +17,11 @@ from Vintageous.ex.ex_error import ERR_CANT_WRITE_FILE
 from Vintageous.ex.ex_error import ERR_EMPTY_BUFFER
 from Vintageous.ex.ex_error import ERR_FILE_EXISTS
 from Vintageous.ex.ex_error import ERR_INVALID_ADDRESS
+from Vintageous.ex.ex_error import ERR_INVALID_SEARCH_PATTERN
+from Vintageous.ex.ex_error import ERR_NO_ERRORS
 from Vintageous.ex.ex_error import ERR_NO_FILE_NAME
+from Vintageous.ex.ex_error import ERR_NO_MATCH
+from Vintageous.ex.ex_error import ERR_NO_MORE_ITEMS
 from Vintageous.ex.ex_error import ERR_OTHER_BUFFER_HAS_CHANGES
 from Vintageous.ex.ex_error import ERR_READONLY_FILE
 from Vintageous.ex.ex_error import ERR_UNSAVED_CHANGES
@@ -29,6 +35,8 @@ from Vintageous.ex.plat.windows import get_oem_cp
 from Vintageous.ex.plat.windows import get_startup_info
 from Vintageous.state import State
 from Vintageous.vi import abbrev
+from Vintageous.vi import regex
+from Vintageous.vi import registers
 from Vintageous.vi import utils
 from Vintageous.vi.constants import MODE_NORMAL
 from Vintageous.vi.constants import MODE_VISUAL
@@ -941,16 +949,19 @@ class ExSubstitute(sublime_plugin.TextCommand):
         ExSubstitute.last_replacement = replacement
         ExSubstitute.last_flags = flags
 
-        computed_flags = re.MULTILINE
-        computed_flags |= re.IGNORECASE if ('i' in flags) else 0
+        magic, ignorecase = regex.get_options(self.view)
+        if 'i' in flags:
+            ignorecase = True
+        elif 'I' in flags:
+            ignorecase = False
 
         try:
-            compiled_rx = re.compile(pattern, flags=computed_flags)
+            compiled_rx = regex.compile_pattern(pattern, magic, ignorecase)
         except Exception as e:
             sublime.status_message(
-                "Vintageous: bad pattern '%s'" % (e.message, pattern))
+                "Vintageous: bad pattern '%s'" % pattern)
             print("Vintageous [regex error]: %s ... in pattern '%s'"
-                % (e.message, pattern))
+                % (str(e), pattern))
             return
 
         # TODO: Implement 'count'
@@ -959,7 +970,9 @@ class ExSubstitute(sublime_plugin.TextCommand):
         target_region = parsed.line_range.resolve(self.view)
 
         if 'c' in flags:
-            self.replace_confirming(edit, pattern, compiled_rx, replacement, replace_count, target_region)
+            st_pattern, st_flags = regex.to_sublime(pattern, magic, ignorecase)
+            self.replace_confirming(edit, st_pattern, compiled_rx, replacement,
+                                    replace_count, target_region, st_flags)
             return
 
         line_text = self.view.substr(target_region)
@@ -967,12 +980,12 @@ class ExSubstitute(sublime_plugin.TextCommand):
         self.view.replace(edit, target_region, new_text)
 
     def replace_confirming(self, edit, pattern, compiled_rx, replacement,
-                replace_count, target_region):
+                replace_count, target_region, flags=0):
         last_row = row_at(self.view, target_region.b - 1)
         start = target_region.begin()
 
         while True:
-            match = self.view.find(pattern, start)
+            match = self.view.find(pattern, start, flags)
 
             # no match or match out of range -- stop
             if (match == R(-1)) or (row_at(self.view, match.a) > last_row):
@@ -1083,8 +1096,10 @@ class ExGlobal(ViWindowCommandBase):
         subcmd = parsed.command.subcommand
 
         try:
-            matches = find_all_in_range(self._view, pattern,
-                    global_range.begin(), global_range.end())
+            st_pattern, flags = regex.to_sublime(pattern,
+                                                 *regex.get_options(self._view))
+            matches = find_all_in_range(self._view, st_pattern,
+                    global_range.begin(), global_range.end(), flags)
         except Exception as e:
             msg = "Vintageous (global): %s ... in pattern '%s'" % (str(e), pattern)
             sublime.status_message(msg)
@@ -1327,6 +1342,169 @@ class ExCquit(ViWindowCommandBase):
         self.window.run_command('exit')
 
 
+class ExVimgrep(ViWindowCommandBase):
+    '''
+    Command: :vim[grep][!] /{pattern}/[g][j] {file} ...
+             :vim[grep][!] {pattern} {file} ...
+
+    Files are searched in background threads and the quickfix list fills up
+    as matches are found. Running :vimgrep again or :cclose cancels the
+    search in progress. Matches are listed in the order they are found, which isn't
+    necessarily the order of {file} ...
+
+    http://vimdoc.sourceforge.net/htmldoc/quickfix.html#:vimgrep
+    '''
+
+    @changing_cd
+    def run(self, command_line=''):
+        assert command_line, 'expected non-empty command line'
+
+        parsed = parse_command_line(command_line)
+
+        try:
+            pattern = vimgrep.compile_pattern(parsed.command.pattern,
+                                              *regex.get_options(self._view))
+        except (ValueError, re.error):
+            show_error(VimError(ERR_INVALID_SEARCH_PATTERN))
+            return
+
+        specs = self.expand_file_specs(parsed.command.files)
+        if not specs:
+            show_error(VimError(ERR_NO_FILE_NAME))
+            return
+
+        settings = self._view.settings()
+        files = vimgrep.iter_files(
+            specs,
+            folder_exclude_patterns=settings.get('folder_exclude_patterns', []),
+            file_exclude_patterns=(settings.get('file_exclude_patterns', []) +
+                                   settings.get('binary_file_patterns', [])))
+
+        qf_list = quickfix.new_list(self.window, ':' + command_line)
+        jump = 'j' not in parsed.command.flags
+
+        def on_matches(entries):
+            qf_list.extend(entries)
+            if jump and qf_list.current() is None:
+                quickfix.open_entry(self.window, qf_list.select(0))
+            show_status('vimgrep: {0} matches so far...'.format(len(qf_list)))
+
+        def on_done(file_count):
+            if not qf_list:
+                show_error(VimError(ERR_NO_MATCH))
+                return
+            show_status('vimgrep: {0} matches in {1} files searched'.format(
+                        len(qf_list), file_count))
+
+        vimgrep.start(self.window, vimgrep.Grep(
+            pattern, files, on_matches, on_done,
+            all_matches='g' in parsed.command.flags))
+        show_status('vimgrep: searching... (:cclose to stop)')
+
+    def expand_file_specs(self, specs):
+        expanded = []
+        for spec in specs:
+            if spec == '%':
+                spec = self._view.file_name()
+                if not spec:
+                    continue
+            expanded.append(os.path.abspath(os.path.expanduser(spec)))
+        return expanded
+
+
+def _go_to_quickfix_entry(window, count):
+    qf_list = quickfix.get_list(window)
+    if not qf_list:
+        show_error(VimError(ERR_NO_ERRORS))
+        return
+
+    entry = qf_list.move(count)
+    if entry is None:
+        show_error(VimError(ERR_NO_MORE_ITEMS))
+        return
+
+    quickfix.open_entry(window, entry)
+    show_status('({0} of {1}): {2}'.format(qf_list.index + 1, len(qf_list),
+                                          entry.text.strip()))
+
+
+class ExCnext(ViWindowCommandBase):
+    '''
+    Command: :cn[ext][!] [count]
+
+    http://vimdoc.sourceforge.net/htmldoc/quickfix.html#:cnext
+    '''
+    def run(self, command_line=''):
+        assert command_line, 'expected non-empty command line'
+
+        parsed = parse_command_line(command_line)
+        _go_to_quickfix_entry(self.window, parsed.command.count)
+
+
+class ExCprevious(ViWindowCommandBase):
+    '''
+    Command: :cp[revious][!] [count]
+             :cN[ext][!] [count]
+
+    http://vimdoc.sourceforge.net/htmldoc/quickfix.html#:cprevious
+    '''
+    def run(self, command_line=''):
+        assert command_line, 'expected non-empty command line'
+
+        parsed = parse_command_line(command_line)
+        _go_to_quickfix_entry(self.window, -parsed.command.count)
+
+
+class ExCopen(ViWindowCommandBase):
+    '''
+    Command: :cope[n] [height]
+
+    Lists the quickfix list in the quick panel and opens the selected entry.
+
+    http://vimdoc.sourceforge.net/htmldoc/quickfix.html#:copen
+    '''
+    def run(self, command_line=''):
+        assert command_line, 'expected non-empty command line'
+
+        qf_list = quickfix.get_list(self.window)
+        if not qf_list:
+            show_error(VimError(ERR_NO_ERRORS))
+            return
+
+        items = [['{0}:{1}:{2}'.format(e.file_name, e.row, e.col),
+                  e.text.strip()] for e in qf_list.entries]
+        self.window.show_quick_panel(items, self.on_done,
+                                     flags=sublime.MONOSPACE_FONT,
+                                     selected_index=max(qf_list.index, 0))
+
+    def on_done(self, idx):
+        if idx == -1:
+            return
+
+        entry = quickfix.get_list(self.window).select(idx)
+        if entry:
+            quickfix.open_entry(self.window, entry)
+
+
+class ExCclose(ViWindowCommandBase):
+    '''
+    Command: :ccl[ose]
+
+    Stops the :vimgrep running in the current window, if any, and closes the
+    quickfix list.
+
+    http://vimdoc.sourceforge.net/htmldoc/quickfix.html#:cclose
+    '''
+    def run(self, command_line=''):
+        assert command_line, 'expected non-empty command line'
+
+        self.window.run_command('hide_overlay')
+        if vimgrep.cancel(self.window):
+            qf_list = quickfix.get_list(self.window)
+            show_status('vimgrep: stopped after {0} matches'.format(
+                        len(qf_list) if qf_list else 0))
+
+
 class ExExit(ViWindowCommandBase):
     """
     Command: :[range]exi[t][!] [++opt] [file]
@@ -1365,19 +1543,23 @@ class ExListRegisters(ViWindowCommandBase):
 
         # TODO: implement arguments.
 
-        pairs = [(k, v) for (k, v) in self.state.registers.to_dict().items() if v]
-        pairs = [(k, repr(v[0]), len(v)) for (k, v) in pairs]
-        pairs = ['"{0}  {1}  {2}'.format(k, v, show_lines(lines)) for (k, v, lines) in pairs]
+        summaries = self.state.registers.summarize()
+        self.names = [k for (k, v, lines) in summaries]
+        pairs = ['"{0}  {1}  {2}'.format(k, repr(v), show_lines(lines)) for (k, v, lines) in summaries]
 
         self.window.show_quick_panel(pairs, self.on_done, flags=sublime.MONOSPACE_FONT)
 
+        in_memory, on_disk = registers.memory_usage()
+        show_status('Registers: {0} characters in memory, {1} in temporary '
+                    'files'.format(in_memory, on_disk))
+
     def on_done(self, idx):
         """Save selected value to `"` register."""
         if idx == -1:
             return
 
-        value = list(self.state.registers.to_dict().values())[idx]
-        self.state.registers['"'] = [value]
+        value = self.state.registers.get(self.names[idx])
+        self.state.registers['"'] = value
 
 
 class ExNew(ViWindowCommandBase):
@@ -1,11 +1,10 @@
-from collections import Counter
-
 import sublime
 
 from Vintageous import PluginLogger
 from Vintageous import NullPluginLogger
 from Vintageous.vi import cmd_base
 from Vintageous.vi import cmd_defs
+from Vintageous.vi import columns
 from Vintageous.vi import settings
 from Vintageous.vi import utils
 from Vintageous.vi.contexts import KeyContext
@@ -648,11 +647,7 @@ class State(object):
                     if sel.a < sel.b:
                         pos -= 1
                 # ============================================================
-                r = sublime.Region(self.view.line(pos).a, pos)
-                counter = Counter(self.view.substr(r))
-                tab_size = self.view.settings().get('tab_size')
-                xpos = (self.view.rowcol(pos)[1] +
-                        ((counter['\t'] * tab_size) - counter['\t']))
+                xpos = columns.col_at(self.view, pos)
             except Exception as e:
                 print(e)
                 _logger.error(
@@ -0,0 +1,71 @@
+import sublime
+
+from collections import namedtuple
+
+from Vintageous.vi.utils import modes
+from Vintageous.vi import registers
+from Vintageous.vi.registers import Block
+
+from Vintageous.tests import add_sel
+from Vintageous.tests import ViewTest
+
+
+test_data = namedtuple('test_data', 'content regions in_register params expected msg')
+
+R = sublime.Region
+
+TESTS = (
+    test_data(content='abc',
+              regions=[[(0, 0), (0, 0)]],
+              in_register=['xy'], params={'mode': modes.NORMAL, 'count': 1},
+              expected=('axybc', [R(2, 2)]), msg='failed in {0}'),
+
+    test_data(content='abc',
+              regions=[[(0, 0), (0, 0)]],
+              in_register=['xy'], params={'mode': modes.NORMAL, 'count': 3},
+              expected=('axyxyxybc', [R(6, 6)]), msg='failed with count in {0}'),
+
+    test_data(content='abc\ndef',
+              regions=[[(0, 1), (0, 1)]],
+              in_register=['  xxx\n'], params={'mode': modes.NORMAL, 'count': 1},
+              expected=('abc\n  xxx\ndef', [R(6, 6)]), msg='failed linewise in {0}'),
+
+    test_data(content='abc\nabc',
+              regions=[[(0, 0), (0, 0)], [(1, 0), (1, 0)]],
+              in_register=['x'], params={'mode': modes.NORMAL, 'count': 1},
+              expected=('axbc\naxbc', [R(1, 1), R(6, 6)]),
+              msg='failed with multiple selections in {0}'),
+
+    test_data(content='abc\nabc',
+              regions=[[(0, 0), (0, 0)], [(1, 0), (1, 0)]],
+              in_register=['x', 'yy'], params={'mode': modes.NORMAL, 'count': 2},
+              expected=('axxbc\nayyyybc', [R(2, 2), R(10, 10)]),
+              msg='failed with multiple fragments in {0}'),
+
+    test_data(content='abcd\nefgh',
+              regions=[[(0, 1), (0, 1)]],
+              in_register=Block(['X', 'YY']), params={'mode': modes.NORMAL, 'count': 1},
+              expected=('abX cd\nefYYgh', [R(2, 2)]), msg='failed blockwise in {0}'),
+)
+
+
+class Test__vi_p(ViewTest):
+    def testAll(self):
+        for (i, data) in enumerate(TESTS):
+            self.view.sel().clear()
+
+            self.write(data.content)
+            for region in data.regions:
+                add_sel(self.view, self.R(*region))
+
+            self.state.mode = modes.NORMAL
+            self.view.settings().set('vintageous_use_sys_clipboard', False)
+            registers._REGISTER_DATA['"'] = data.in_register
+
+            self.view.run_command('_vi_p', data.params)
+
+            msg = "[{0}] {1}".format(i, data.msg)
+            actual_1 = self.view.substr(self.R(0, self.view.size()))
+            actual_2 = list(self.view.sel())
+            self.assertEqual(data.expected[0], actual_1, msg.format(i))
+            self.assertEqual(data.expected[1], actual_2, msg.format(i))
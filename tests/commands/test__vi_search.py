@@ -40,6 +40,14 @@ class Test_vi_slash_InNormalMode(ViewTest):
         self.view.run_command('_vi_slash_impl', {'mode': modes.NORMAL, 'search_string': 'abc'})
         self.assertEqual(self.R(4, 4), first_sel(self.view))
 
+    def testIgnoresInvalidPattern(self):
+        self.write('foo\nabc\nbar')
+        self.clear_sel()
+        self.add_sel(self.R(0, 0))
+
+        self.view.run_command('_vi_slash_impl', {'mode': modes.NORMAL, 'search_string': 'abc\\'})
+        self.assertEqual(self.R(0, 0), first_sel(self.view))
+
 class Test_vi_question_mark_InNormalMode(ViewTest):
     def testSearchWrapBegin(self):
         self.write('foo\nabc\nbar\nabc\nmoo\nabc\nend')
@@ -73,3 +81,11 @@ class Test_vi_question_mark_InNormalMode(ViewTest):
 
         self.view.run_command('_vi_question_mark_impl', {'mode': modes.NORMAL, 'search_string': 'abc'})
         self.assertEqual(self.R(20, 20), first_sel(self.view))
+
+    def testIgnoresInvalidPattern(self):
+        self.write('foo\nabc\nbar')
+        self.clear_sel()
+        self.add_sel(self.R(8, 8))
+
+        self.view.run_command('_vi_question_mark_impl', {'mode': modes.NORMAL, 'search_string': 'abc\\'})
+        self.assertEqual(self.R(8, 8), first_sel(self.view))
@@ -1,7 +1,12 @@
 import unittest
 
 from Vintageous.ex.parser.scanner import Scanner
+from Vintageous.ex.parser.scanner_command_cclose import TokenCommandCclose
+from Vintageous.ex.parser.scanner_command_cnext import TokenCommandCnext
+from Vintageous.ex.parser.scanner_command_copen import TokenCommandCopen
+from Vintageous.ex.parser.scanner_command_cprevious import TokenCommandCprevious
 from Vintageous.ex.parser.scanner_command_substitute import TokenCommandSubstitute
+from Vintageous.ex.parser.scanner_command_vimgrep import TokenCommandVimgrep
 from Vintageous.ex.parser.scanner_command_write import TokenCommandWrite
 from Vintageous.ex.parser.state import EOF
 from Vintageous.ex.parser.tokens import TokenComma
@@ -255,3 +260,66 @@ class ScannerWriteCommand_Tests(unittest.TestCase):
         tokens = list(scanner.scan())
         params = {'++': '', 'file_name': 'foo.txt', '>>': False, 'cmd': ''}
         self.assertEqual([TokenCommandWrite(params), TokenEof()], tokens)
+
+
+class ScannerVimgrepCommand_Tests(unittest.TestCase):
+    def testCanScanDelimitedPattern(self):
+        scanner = Scanner("vimgrep /foo bar/ *.py")
+        tokens = list(scanner.scan())
+        params = {'pattern': 'foo bar', 'flags': [], 'files': ['*.py']}
+        self.assertEqual([TokenCommandVimgrep(params), TokenEof()], tokens)
+
+    def testCanScanFlags(self):
+        scanner = Scanner("vim! /foo/gj a.txt b.txt")
+        tokens = list(scanner.scan())
+        params = {'pattern': 'foo', 'flags': ['g', 'j'], 'files': ['a.txt', 'b.txt']}
+        self.assertEqual([TokenCommandVimgrep(params, forced=True), TokenEof()], tokens)
+
+    def testCanScanEscapedDelimiter(self):
+        scanner = Scanner(r"vim #a\#b# %")
+        tokens = list(scanner.scan())
+        params = {'pattern': 'a#b', 'flags': [], 'files': ['%']}
+        self.assertEqual([TokenCommandVimgrep(params), TokenEof()], tokens)
+
+    def testCanScanUndelimitedPattern(self):
+        scanner = Scanner(r"vimgrep foo src/**/*.py my\ file.txt")
+        tokens = list(scanner.scan())
+        params = {'pattern': 'foo', 'flags': [], 'files': ['src/**/*.py', 'my file.txt']}
+        self.assertEqual([TokenCommandVimgrep(params), TokenEof()], tokens)
+
+
+class ScannerQuickfixCommands_Tests(unittest.TestCase):
+    def testCanScanCnext(self):
+        scanner = Scanner("cn")
+        tokens = list(scanner.scan())
+        self.assertEqual([TokenCommandCnext({'count': 1}), TokenEof()], tokens)
+
+    def testCanScanCnextWithCount(self):
+        scanner = Scanner("cnext 3")
+        tokens = list(scanner.scan())
+        self.assertEqual([TokenCommandCnext({'count': 3}), TokenEof()], tokens)
+
+    def testCanScanCprevious(self):
+        scanner = Scanner("cprevious")
+        tokens = list(scanner.scan())
+        self.assertEqual([TokenCommandCprevious({'count': 1}), TokenEof()], tokens)
+
+    def testCanScanCNextAsCprevious(self):
+        scanner = Scanner("cN 2")
+        tokens = list(scanner.scan())
+        self.assertEqual([TokenCommandCprevious({'count': 2}), TokenEof()], tokens)
+
+    def testCanScanCopen(self):
+        scanner = Scanner("copen")
+        tokens = list(scanner.scan())
+        self.assertEqual([TokenCommandCopen(), TokenEof()], tokens)
+
+    def testDoesNotMistakeCopyForCopen(self):
+        scanner = Scanner("copy 3")
+        tokens = list(scanner.scan())
+        self.assertNotIsInstance(tokens[0], TokenCommandCopen)
+
+    def testCanScanCclose(self):
+        scanner = Scanner("ccl")
+        tokens = list(scanner.scan())
+        self.assertEqual([TokenCommandCclose(), TokenEof()], tokens)
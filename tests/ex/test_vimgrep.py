@@ -0,0 +1,169 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from Vintageous.ex import vimgrep
+from Vintageous.ex.quickfix import QuickfixEntry
+from Vintageous.ex.quickfix import QuickfixList
+
+
+def make_grep(pattern, all_matches=False):
+    return vimgrep.Grep(vimgrep.compile_pattern(pattern), [], None, None,
+                        all_matches=all_matches)
+
+
+class Test_QuickfixList(unittest.TestCase):
+    def setUp(self):
+        self.qf_list = QuickfixList()
+        self.qf_list.extend([QuickfixEntry('a.txt', i, 1, 'foo')
+                             for i in range(1, 4)])
+
+    def testCanSelect(self):
+        self.assertEqual(self.qf_list.select(1).row, 2)
+        self.assertEqual(self.qf_list.current().row, 2)
+
+    def testCannotSelectMissingEntry(self):
+        self.assertIsNone(self.qf_list.select(3))
+        self.assertIsNone(self.qf_list.current())
+
+    def testCanMoveForward(self):
+        self.assertEqual(self.qf_list.move(1).row, 1)
+        self.assertEqual(self.qf_list.move(5).row, 3)
+
+    def testCannotMovePastTheEnds(self):
+        self.qf_list.select(2)
+        self.assertIsNone(self.qf_list.move(1))
+        self.qf_list.select(0)
+        self.assertIsNone(self.qf_list.move(-1))
+
+    def testCanMoveBackwards(self):
+        self.qf_list.select(2)
+        self.assertEqual(self.qf_list.move(-1).row, 2)
+
+    def testCanEncodePosition(self):
+        self.assertEqual(QuickfixEntry('a.txt', 3, 4, 'foo').encoded_position(),
+                         'a.txt:3:4')
+
+
+class Test_Grep_search(unittest.TestCase):
+    def testReportsRowsAndColumns(self):
+        entries = make_grep('foo').search('x', b'abc\nxx foo\n\nfoo')
+        self.assertEqual(entries, [QuickfixEntry('x', 2, 4, 'xx foo'),
+                                   QuickfixEntry('x', 4, 1, 'foo')])
+
+    def testReportsFirstMatchInLineOnly(self):
+        entries = make_grep('o').search('x', b'foo\nbar\nbo')
+        self.assertEqual([(e.row, e.col) for e in entries], [(1, 2), (3, 2)])
+
+    def testReportsEveryMatchInLineIfAsked(self):
+        entries = make_grep('o', all_matches=True).search('x', b'foo\nbo')
+        self.assertEqual([(e.row, e.col) for e in entries],
+                         [(1, 2), (1, 3), (2, 2)])
+
+    def testCountsColumnsInCharacters(self):
+        entries = make_grep('bar').search('x', 'äö bar'.encode('utf-8'))
+        self.assertEqual(entries[0].col, 4)
+        self.assertEqual(entries[0].text, 'äö bar')
+
+    def testStripsCarriageReturns(self):
+        entries = make_grep('bar').search('x', b'bar\r\nbar')
+        self.assertEqual([(e.row, e.text) for e in entries],
+                         [(1, 'bar'), (2, 'bar')])
+
+    def testTranslatesVimPatterns(self):
+        entries = make_grep(r'\<ab\>').search('x', b'abc\nab c')
+        self.assertEqual([e.row for e in entries], [2])
+
+
+class Test_Grep_search_file(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def write(self, name, data):
+        path = os.path.join(self.dir, name)
+        with open(path, 'wb') as f:
+            f.write(data)
+        return path
+
+    def testCanSearchMemoryMappedFile(self):
+        path = self.write('big.txt', b'x\n' * 100 + b'foo\n')
+        old, vimgrep.MMAP_THRESHOLD = vimgrep.MMAP_THRESHOLD, 10
+        try:
+            entries = make_grep('foo').search_file(path)
+        finally:
+            vimgrep.MMAP_THRESHOLD = old
+        self.assertEqual([e.row for e in entries], [101])
+
+    def testSkipsBinaryFiles(self):
+        path = self.write('bin.dat', b'foo\0foo')
+        self.assertEqual(make_grep('foo').search_file(path), [])
+
+    def testSkipsMissingFiles(self):
+        path = os.path.join(self.dir, 'missing.txt')
+        self.assertEqual(make_grep('foo').search_file(path), [])
+
+
+class Test_iter_files(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        for name in ('a.py', 'b.txt', os.path.join('sub', 'c.py'),
+                     os.path.join('.git', 'd.py')):
+            path = os.path.join(self.dir, name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            open(path, 'w').close()
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def relative(self, paths):
+        return sorted(os.path.relpath(p, self.dir) for p in paths)
+
+    def testCanExpandGlob(self):
+        files = vimgrep.iter_files([os.path.join(self.dir, '*.py')])
+        self.assertEqual(self.relative(files), ['a.py'])
+
+    def testCanExpandRecursiveGlob(self):
+        files = vimgrep.iter_files([os.path.join(self.dir, '**', '*.py')],
+                                   folder_exclude_patterns=['.git'])
+        self.assertEqual(self.relative(files),
+                         ['a.py', os.path.join('sub', 'c.py')])
+
+    def testCanExpandDirectory(self):
+        files = vimgrep.iter_files([self.dir],
+                                   folder_exclude_patterns=['.git'],
+                                   file_exclude_patterns=['*.txt'])
+        self.assertEqual(self.relative(files),
+                         ['a.py', os.path.join('sub', 'c.py')])
+
+    def testYieldsFilesOnce(self):
+        files = vimgrep.iter_files([os.path.join(self.dir, 'a.py'),
+                                    os.path.join(self.dir, '*.py')])
+        self.assertEqual(self.relative(files), ['a.py'])
+
+
+class Test_cancel(unittest.TestCase):
+    class Window(object):
+        def id(self):
+            return -1
+
+    def setUp(self):
+        self.window = self.Window()
+        self.grep = make_grep('foo')
+        vimgrep._searches[self.window.id()] = self.grep
+
+    def tearDown(self):
+        vimgrep._searches.pop(self.window.id(), None)
+
+    def testCanStopRunningSearch(self):
+        self.assertTrue(vimgrep.cancel(self.window))
+        self.assertTrue(self.grep.cancelled.is_set())
+        self.assertFalse(vimgrep.cancel(self.window))
+
+    def testIgnoresFinishedSearch(self):
+        self.grep.finished = True
+        self.assertFalse(vimgrep.cancel(self.window))
+        self.assertFalse(self.grep.cancelled.is_set())
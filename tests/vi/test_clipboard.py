@@ -0,0 +1,60 @@
+import unittest
+from unittest import mock
+
+from Vintageous.vi import clipboard
+
+
+class Test_clipboard(unittest.TestCase):
+    def setUp(self):
+        clipboard._pending = None
+        clipboard.invalidate()
+        patcher = mock.patch.multiple('sublime', set_timeout_async=mock.DEFAULT,
+                                      get_clipboard=mock.DEFAULT,
+                                      set_clipboard=mock.DEFAULT)
+        self.sublime = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.sublime['get_clipboard'].return_value = 'outside'
+
+    def tearDown(self):
+        clipboard._pending = None
+        clipboard.invalidate()
+
+    def testCoalescesWrites(self):
+        clipboard.set('foo')
+        clipboard.set('bar')
+        self.assertEqual(self.sublime['set_timeout_async'].call_count, 1)
+        self.assertFalse(self.sublime['set_clipboard'].called)
+
+        clipboard.flush()
+        self.sublime['set_clipboard'].assert_called_once_with('bar')
+
+    def testReadsPendingWrite(self):
+        clipboard.set('foo')
+        self.assertEqual(clipboard.get(), 'foo')
+        self.assertFalse(self.sublime['get_clipboard'].called)
+
+    def testCachesReads(self):
+        self.assertEqual(clipboard.get(), 'outside')
+        self.assertEqual(clipboard.get(), 'outside')
+        self.assertEqual(self.sublime['get_clipboard'].call_count, 1)
+
+    def testCanInvalidateCache(self):
+        clipboard.get()
+        clipboard.invalidate()
+        clipboard.get()
+        self.assertEqual(self.sublime['get_clipboard'].call_count, 2)
+
+    def testCanReset(self):
+        clipboard.set('foo')
+        clipboard.reset()
+        self.assertEqual(clipboard.get(), 'outside')
+
+        clipboard.flush()
+        self.assertFalse(self.sublime['set_clipboard'].called)
+
+    def testCacheExpires(self):
+        clipboard.get()
+        with mock.patch('time.time', return_value=clipboard._cached_at +
+                        clipboard.CACHE_TTL):
+            clipboard.get()
+        self.assertEqual(self.sublime['get_clipboard'].call_count, 2)
@@ -0,0 +1,53 @@
+import unittest
+
+from Vintageous.vi.columns import char_width
+from Vintageous.vi.columns import ColumnMap
+
+
+class TestColumnMap(unittest.TestCase):
+    def testMapsPlainTextOneToOne(self):
+        column_map = ColumnMap('foo bar', begin=10)
+        self.assertEqual(column_map.col_at(13), 3)
+        self.assertEqual(column_map.pt_at(3), 13)
+        self.assertEqual(column_map.width, 7)
+
+    def testExpandsTabsToNextTabStop(self):
+        column_map = ColumnMap('a\tb', tab_size=4)
+        self.assertEqual(column_map.col_at(1), 1)
+        self.assertEqual(column_map.col_at(2), 4)
+        self.assertEqual(column_map.width, 5)
+
+    def testMapsColumnsInsideTabsToTheTab(self):
+        column_map = ColumnMap('\t\taaa', tab_size=4)
+        self.assertEqual(column_map.pt_at(0), 0)
+        self.assertEqual(column_map.pt_at(6), 1)
+        self.assertEqual(column_map.pt_at(8), 2)
+
+    def testCountsWideCharactersAsTwoColumns(self):
+        column_map = ColumnMap('日本x')
+        self.assertEqual(column_map.col_at(2), 4)
+        self.assertEqual(column_map.pt_at(3), 1)
+        self.assertEqual(column_map.width, 5)
+
+    def testReturnsPointsPastEndOfLine(self):
+        column_map = ColumnMap('\tab', tab_size=4, begin=5)
+        self.assertEqual(column_map.pt_at(10), 12)
+        self.assertEqual(column_map.clamp(12), 7)
+
+    def testCanMapLongLinesWithoutReadingThem(self):
+        column_map = ColumnMap.plain(10, 50000)
+        self.assertEqual(column_map.col_at(1010), 1000)
+        self.assertEqual(column_map.pt_at(1000), 1010)
+        self.assertEqual(column_map.clamp(60000), 50009)
+
+    def testClampsEmptyLinesToTheirBeginning(self):
+        column_map = ColumnMap('', begin=5)
+        self.assertEqual(column_map.clamp(7), 5)
+
+
+class Test_char_width(unittest.TestCase):
+    def testCanTellWideCharacters(self):
+        self.assertEqual(char_width('a'), 1)
+        self.assertEqual(char_width('é'), 1)
+        self.assertEqual(char_width('中'), 2)
+        self.assertEqual(char_width('Ａ'), 2)
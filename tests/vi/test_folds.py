@@ -0,0 +1,64 @@
+import unittest
+
+from Vintageous.vi.folds import FoldIndex
+from Vintageous.vi.folds import get_index
+from Vintageous.tests import ViewTest
+
+
+class TestFoldIndex(unittest.TestCase):
+    def testMergesAdjacentFolds(self):
+        index = FoldIndex([(2, 4), (5, 7)])
+        self.assertEqual(len(index), 1)
+        self.assertEqual(index.next_visible_row(1), 8)
+
+    def testMergesNestedFolds(self):
+        index = FoldIndex([(2, 10), (4, 5)])
+        self.assertEqual(len(index), 1)
+        self.assertEqual(index.hidden_between(0, 20), 9)
+
+    def testCanDetectHiddenRows(self):
+        index = FoldIndex([(2, 4)])
+        self.assertFalse(index.is_hidden(1))
+        self.assertTrue(index.is_hidden(2))
+        self.assertTrue(index.is_hidden(4))
+        self.assertFalse(index.is_hidden(5))
+
+    def testCanCountHiddenRowsBetween(self):
+        index = FoldIndex([(2, 4), (8, 9)])
+        self.assertEqual(index.hidden_between(0, 1), 0)
+        self.assertEqual(index.hidden_between(0, 3), 2)
+        self.assertEqual(index.hidden_between(3, 8), 3)
+        self.assertEqual(index.hidden_between(9, 0), 5)
+
+    def testRowBelowSkipsFolds(self):
+        index = FoldIndex([(2, 4), (6, 9)])
+        self.assertEqual(index.row_below(0, 1), 1)
+        self.assertEqual(index.row_below(1, 1), 5)
+        self.assertEqual(index.row_below(1, 2), 10)
+        self.assertEqual(index.row_below(0, 4), 11)
+
+    def testRowAboveSkipsFolds(self):
+        index = FoldIndex([(2, 4), (6, 9)])
+        self.assertEqual(index.row_above(10, 1), 5)
+        self.assertEqual(index.row_above(10, 2), 1)
+        self.assertEqual(index.row_above(10, 100), 0)
+
+    def testHiddenRowsResolveToFoldRow(self):
+        index = FoldIndex([(2, 4)])
+        self.assertEqual(index.visible_row(3), 1)
+        self.assertEqual(index.row_below(3, 1), 5)
+
+
+class Test_get_index(ViewTest):
+    def testCanIndexFolds(self):
+        self.write('abc\nabc\nabc\nabc\nabc\n')
+        self.view.fold(self.R((0, 3), (2, 3)))
+        index = get_index(self.view)
+        self.assertEqual(index.next_visible_row(0), 3)
+
+    def testRebuildsWhenFoldsChange(self):
+        self.write('abc\nabc\nabc\nabc\nabc\n')
+        self.view.fold(self.R((0, 3), (2, 3)))
+        get_index(self.view)
+        self.view.unfold(self.R(0, self.view.size()))
+        self.assertEqual(get_index(self.view).next_visible_row(0), 1)
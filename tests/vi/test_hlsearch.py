@@ -0,0 +1,53 @@
+from Vintageous.tests import ViewTest
+
+from Vintageous.vi import hlsearch
+from Vintageous.vi import search
+
+
+class Test_highlight(ViewTest):
+    def tearDown(self):
+        hlsearch.clear(self.view)
+        super().tearDown()
+
+    def testHighlightsAllMatchesInSmallBuffers(self):
+        self.write('abc\nxabc\nabc')
+        hlsearch.highlight(self.view, 'abc')
+        self.assertEqual(self.view.get_regions('vi_search'),
+                         self.view.find_all('abc'))
+
+    def testErasesHighlightsIfThereAreNoMatches(self):
+        self.write('abc')
+        hlsearch.highlight(self.view, 'abc')
+        hlsearch.highlight(self.view, 'xyz')
+        self.assertEqual(self.view.get_regions('vi_search'), [])
+
+    def testCanClearHighlights(self):
+        self.write('abc')
+        hlsearch.highlight(self.view, 'abc')
+        hlsearch.clear(self.view)
+        self.assertEqual(self.view.get_regions('vi_search'), [])
+        self.assertIsNone(hlsearch.get_highlight(self.view))
+
+
+class Test_Highlight_find(ViewTest):
+    def testFindsMatchesStartingInRange(self):
+        self.write('ab ab ab ab')
+        hl = hlsearch.Highlight(self.view, 'ab')
+        self.assertEqual(hl.find(2, 7), [self.R(3, 5), self.R(6, 8)])
+
+    def testStepsOverEmptyMatches(self):
+        self.write('abc')
+        hl = hlsearch.Highlight(self.view, 'x*')
+        self.assertEqual(len(hl.find(0, 3)), 3)
+
+    def testSlicesCachedMatches(self):
+        self.write('ab ab ab ab')
+        search.get_matches(self.view, 'a(b)')
+        hl = hlsearch.Highlight(self.view, 'a(b)')
+        self.assertEqual(hl.find(2, 7), [self.R(3, 5), self.R(6, 8)])
+
+    def testDoesntScanWholeBufferWithoutCachedMatches(self):
+        self.write('ab ab ab ab')
+        hl = hlsearch.Highlight(self.view, 'a(b)')
+        hl.find(0, 5)
+        self.assertIsNone(search.get_cached_matches(self.view, 'a(b)'))
@@ -0,0 +1,70 @@
+import unittest
+
+from Vintageous.tests import ViewTest
+
+from Vintageous.vi import identifiers
+from Vintageous.vi.identifiers import IdentifierIndex
+from Vintageous.vi.identifiers import is_identifier
+from Vintageous.vi.utils import changed_range
+
+
+class Test_is_identifier(unittest.TestCase):
+    def testCanDetectIdentifiers(self):
+        self.assertTrue(is_identifier('foo_1'))
+        self.assertFalse(is_identifier('foo bar'))
+        self.assertFalse(is_identifier('foo.'))
+        self.assertFalse(is_identifier(''))
+
+
+class Test_IdentifierIndex(unittest.TestCase):
+    def make_index(self, text):
+        index = IdentifierIndex(None)
+        index.rebuild(text)
+        return index
+
+    def update(self, index, text):
+        index.replace(text, *changed_range(index.text, text))
+
+    def testFindsOccurrences(self):
+        index = self.make_index('foo bar foo.foo foobar')
+        self.assertEqual(index.occurrences('foo'), [0, 8, 12])
+        self.assertEqual(index.occurrences('baz'), [])
+
+    def testCanUpdateAfterInsertion(self):
+        index = self.make_index('foo bar foo')
+        self.update(index, 'foo xx bar foo')
+        self.assertEqual(index.occurrences('foo'), [0, 11])
+        self.assertEqual(index.occurrences('xx'), [4])
+
+    def testCanUpdateWordsTouchingChange(self):
+        index = self.make_index('foo bar foo')
+        self.update(index, 'foo barfoo')
+        self.assertEqual(index.occurrences('foo'), [0])
+        self.assertEqual(index.occurrences('barfoo'), [4])
+        self.assertEqual(index.occurrences('bar'), [])
+
+    def testCanFindScopeStart(self):
+        index = self.make_index('def f():\n    x = 1\n\n    y = x\ndef g():\n')
+        self.assertEqual(index.scope_start(25), 0)
+        self.assertEqual(index.scope_start(32), 30)
+
+
+class Test_changed_range(unittest.TestCase):
+    def testFindsChangedRange(self):
+        self.assertEqual(changed_range('abcdef', 'abXYef'), (2, 4, 4))
+        self.assertEqual(changed_range('abc', 'abc'), (3, 3, 3))
+        self.assertEqual(changed_range('aaa', 'aaaa'), (3, 3, 4))
+
+
+class Test_find_declaration(ViewTest):
+    def tearDown(self):
+        identifiers.destroy(self.view)
+        super().tearDown()
+
+    def testFindsFirstOccurrenceInScope(self):
+        self.write('x = 1\ndef f():\n    x = 2\n    print(x)\n')
+        pt = self.view.text_point(3, 10)
+        self.assertEqual(identifiers.find_declaration(self.view, pt),
+                         self.view.text_point(2, 4))
+        self.assertEqual(identifiers.find_declaration(self.view, pt,
+                                                      globally=True), 0)
@@ -0,0 +1,50 @@
+import unittest
+
+import sublime
+
+from Vintageous.vi.incsearch import IncrementalSearch
+from Vintageous.vi.search import Matches
+
+
+class TestIncrementalSearch(unittest.TestCase):
+    def setUp(self):
+        self.search = IncrementalSearch(None, on_found=None)
+
+    def find_all(self, text, query, flags=sublime.LITERAL):
+        pattern = self.search._compile(query, flags)
+        return self.search.find_all(text, query, flags, pattern)
+
+    def testFindsOverlappingLiteralMatches(self):
+        matches = self.find_all('aaab', 'aa')
+        self.assertEqual(matches.starts, [0, 1])
+        self.assertEqual(matches.ends, [2, 3])
+
+    def testRefinesMatchesOfPrefix(self):
+        self.find_all('aaab aab', 'aa')
+        matches = self.find_all('aaab aab', 'aab')
+        self.assertEqual(matches.starts, [1, 5])
+
+    def testRefinesMatchesOfPrefixOfPlainRegexQuery(self):
+        self.find_all('aaab a.b', 'aa', flags=0)
+        matches = self.find_all('aaab a.b', r'aab', flags=0)
+        self.assertEqual(matches.starts, [1])
+        matches = self.find_all('aaab a.b', r'a\.b', flags=0)
+        self.assertEqual(matches.starts, [5])
+
+    def testCanFindRegexMatches(self):
+        matches = self.find_all('foo bar fizz', r'f\w+', flags=0)
+        self.assertEqual(matches.starts, [0, 8])
+        self.assertEqual(matches.ends, [3, 12])
+
+    def testPicksNextMatchWrappingAround(self):
+        matches = Matches([0, 10], [3, 13])
+        sel = sublime.Region(11, 11)
+        self.assertEqual(self.search.pick(matches, sel, 1, 20),
+                         sublime.Region(0, 3))
+
+    def testPicksPreviousMatchWrappingAround(self):
+        self.search.forward = False
+        matches = Matches([5, 10], [8, 13])
+        sel = sublime.Region(2, 2)
+        self.assertEqual(self.search.pick(matches, sel, 1, 20),
+                         sublime.Region(10, 13))
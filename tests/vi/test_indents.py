@@ -0,0 +1,78 @@
+import unittest
+
+from Vintageous.vi.indents import IndentIndex
+from Vintageous.vi.indents import indentation_width
+from Vintageous.vi.utils import changed_range
+
+
+PYTHON = '''class A:
+    def f(self):
+        x = 1
+
+        y = 2
+    def g(self):
+        pass
+z = 3
+'''
+
+
+class Test_indentation_width(unittest.TestCase):
+    def testCountsSpacesAndTabs(self):
+        self.assertEqual(indentation_width('    x', 4), 4)
+        self.assertEqual(indentation_width('\tx', 4), 4)
+        self.assertEqual(indentation_width('  \tx', 8), 8)
+        self.assertEqual(indentation_width('x', 4), 0)
+
+    def testReturnsNoneForBlankLines(self):
+        self.assertIsNone(indentation_width('', 4))
+        self.assertIsNone(indentation_width(' \t ', 4))
+
+
+class Test_IndentIndex(unittest.TestCase):
+    def make_index(self, text, tab_size=4):
+        index = IndentIndex(None)
+        index.rebuild(text, tab_size)
+        return index
+
+    def update(self, index, text):
+        index.replace(text, *changed_range(index.text, text))
+
+    def testComputesWidths(self):
+        index = self.make_index(PYTHON)
+        self.assertEqual(index.widths, [0, 4, 8, None, 8, 4, 8, 0, None])
+
+    def testCanUpdateAfterInsertingLines(self):
+        index = self.make_index(PYTHON)
+        self.update(index, PYTHON.replace('x = 1\n', 'x = 1\n  if x:\n\n'))
+        self.assertEqual(index.widths,
+                         [0, 4, 8, 2, None, None, 8, 4, 8, 0, None])
+
+    def testCanUpdateAfterDeletingLines(self):
+        index = self.make_index(PYTHON)
+        self.update(index, PYTHON.replace('        x = 1\n\n', ''))
+        self.assertEqual(index.widths, [0, 4, 8, 4, 8, 0, None])
+
+    def testCanUpdateChangedIndentation(self):
+        index = self.make_index(PYTHON)
+        self.update(index, PYTHON.replace('    def g', 'def g'))
+        self.assertEqual(index.widths, [0, 4, 8, None, 8, 0, 8, 0, None])
+
+    def testFindsInnerBlock(self):
+        index = self.make_index(PYTHON)
+        self.assertEqual(index.block(2), (2, 4))
+        self.assertEqual(index.block(3), (2, 4))
+
+    def testFindsOuterBlocksWithCount(self):
+        index = self.make_index(PYTHON)
+        self.assertEqual(index.block(2, count=2), (1, 6))
+        self.assertEqual(index.block(2, count=3), (0, 7))
+        self.assertEqual(index.block(2, count=4), (0, 7))
+
+    def testCanIncludeSurroundingLines(self):
+        index = self.make_index(PYTHON)
+        self.assertEqual(index.block(2, above=True), (1, 4))
+        self.assertEqual(index.block(6, above=True, below=True), (5, 7))
+        self.assertEqual(index.block(0, above=True, below=True), (0, 7))
+
+    def testReturnsNoneInBlankBuffer(self):
+        self.assertIsNone(self.make_index('\n\n').block(1))
@@ -0,0 +1,89 @@
+import unittest
+
+import sublime
+
+from Vintageous.vi import regex
+from Vintageous.vi.regex import compile_pattern
+from Vintageous.vi.regex import to_sublime
+from Vintageous.vi.regex import translate
+
+
+class Test_translate(unittest.TestCase):
+    def testEscapesCharactersThatAreLiteralInVim(self):
+        self.assertEqual(translate('a+b(c)')[0], r'a\+b\(c\)')
+        self.assertEqual(translate('a{1}|b')[0], r'a\{1\}\|b')
+
+    def testCanTranslateMagicOperators(self):
+        self.assertEqual(translate(r'\(a\|b\)\+x\=')[0], '(a|b)+x?')
+        self.assertEqual(translate(r'\%(ab\)')[0], '(?:ab)')
+
+    def testCanTranslateVeryMagicPatterns(self):
+        self.assertEqual(translate(r'\v(a|b)+x=')[0], '(a|b)+x?')
+        self.assertEqual(translate(r'\va\+')[0], r'a\+')
+
+    def testCanTranslateNoMagicPatterns(self):
+        self.assertEqual(translate(r'.*\.', magic=False)[0], r'\.\*.')
+        self.assertEqual(translate(r'\V.*\.\*')[0], r'\.\*.*')
+
+    def testCanTranslateBraces(self):
+        self.assertEqual(translate(r'a\{2,3}')[0], 'a{2,3}')
+        self.assertEqual(translate(r'a\{2}')[0], 'a{2}')
+        self.assertEqual(translate(r'a\{,3\}')[0], 'a{0,3}')
+        self.assertEqual(translate(r'a\{-1,}')[0], 'a{1,}?')
+        self.assertEqual(translate(r'a\{-}')[0], 'a*?')
+
+    def testCanTranslateWordBoundaries(self):
+        rx = compile_pattern(r'\<foo\>')
+        self.assertEqual(len(rx.findall('foo food xfoo foo')), 2)
+
+    def testCanTranslateClasses(self):
+        self.assertEqual(translate(r'\s\S')[0], r'[ \t][^ \t\n]')
+        self.assertEqual(translate(r'\_s')[0], r'[ \t\n]')
+        self.assertEqual(translate(r'\_S')[0], r'[^ \t]')
+        self.assertEqual(translate('[[:digit:]x]')[0], '[0-9x]')
+
+    def testNegatedClassesDontMatchNewlines(self):
+        for pattern in (r'\S\+', r'\D\+', r'\W\+', '[^x]\\+'):
+            rx = compile_pattern(pattern)
+            self.assertNotIn('\n', ''.join(rx.findall('cd\nef')), pattern)
+
+    def testNegatedClassesWithUnderscoreMatchNewlines(self):
+        rx = compile_pattern(r'\_[^x]\+')
+        self.assertEqual(rx.findall('cd\nef'), ['cd\nef'])
+        rx = compile_pattern(r'\_S\+')
+        self.assertEqual(rx.findall('cd\nef'), ['cd\nef'])
+
+    def testTreatsAnchorsLiterallyInTheMiddle(self):
+        self.assertEqual(translate('^a^b$c$')[0], r'^a\^b\$c$')
+
+    def testTreatsUnclosedBracketLiterally(self):
+        self.assertEqual(translate('[a')[0], r'\[a')
+
+    def testCanDetectCaseModifiers(self):
+        self.assertEqual(translate(r'foo\c'), ('foo', True))
+        self.assertEqual(translate(r'foo\C'), ('foo', False))
+        self.assertEqual(translate('foo'), ('foo', None))
+
+    def testRaisesErrorForUnsupportedItems(self):
+        self.assertRaises(ValueError, translate, r'foo\zsbar')
+        self.assertRaises(ValueError, translate, 'foo\\')
+
+
+class Test_to_sublime(unittest.TestCase):
+    def testCaseModifiersOverrideIgnorecase(self):
+        self.assertEqual(to_sublime('a', ignorecase=True),
+                         ('a', sublime.IGNORECASE))
+        self.assertEqual(to_sublime(r'a\C', ignorecase=True), ('a', 0))
+        self.assertEqual(to_sublime(r'a\c'), ('a', sublime.IGNORECASE))
+
+
+class Test_compile_pattern(unittest.TestCase):
+    def testCachesCompiledPatterns(self):
+        self.assertIs(compile_pattern('abc'), compile_pattern('abc'))
+
+    def testEvictsLeastRecentlyUsedPatterns(self):
+        compile_pattern('first')
+        for i in range(regex.MAX_CACHED_PATTERNS):
+            compile_pattern('x' * (i + 1))
+        self.assertNotIn(('compile', 'first', True, False), regex._cache)
+        self.assertLessEqual(len(regex._cache), regex.MAX_CACHED_PATTERNS)
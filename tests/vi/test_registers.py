@@ -1,9 +1,11 @@
 import unittest
 import builtins
+from collections import deque
 
 import sublime
 
 from unittest import mock
+from Vintageous.vi import clipboard
 from Vintageous.vi import registers
 from Vintageous.vi.registers import Registers
 from Vintageous.vi.settings import SettingsManager
@@ -73,7 +75,9 @@ class TestCaseRegistersConstants(unittest.TestCase):
 class TestCaseRegisters(ViewTest):
     def setUp(self):
         super().setUp()
+        clipboard.flush()
         sublime.set_clipboard('')
+        clipboard.invalidate()
         registers._REGISTER_DATA = registers.init_register_data()
         self.view.settings().erase('vintage')
         self.view.settings().erase('vintageous_use_sys_clipboard')
@@ -147,8 +151,19 @@ class TestCaseRegisters(ViewTest):
     def testSettingRegisterSetsClipboardIfNeeded(self):
         self.regs.settings.view['vintageous_use_sys_clipboard'] = True
         self.regs.set('a', [100])
+        clipboard.flush()
         self.assertEqual(sublime.get_clipboard(), '100')
 
+    def testSettingMultipleValuesCopiesSelections(self):
+        self.write('foo bar')
+        self.clear_sel()
+        self.add_sel(self.R(0, 3))
+        self.add_sel(self.R(4, 7))
+        self.regs.settings.view['vintageous_use_sys_clipboard'] = True
+        self.regs.set('a', ['foo', 'bar'])
+        self.assertIsNone(clipboard._pending)
+        self.assertEqual(sublime.get_clipboard(), 'foo\nbar')
+
     def testCanAppendToSingleValue(self):
         self.regs.set('a', ['foo'])
         self.regs.append_to('A', ['bar'])
@@ -179,6 +194,7 @@ class TestCaseRegisters(ViewTest):
         self.regs.settings.view['vintageous_use_sys_clipboard'] = True
         self.regs.set('a', ['foo'])
         self.regs.append_to('A', ['bar'])
+        clipboard.flush()
         self.assertEqual(sublime.get_clipboard(), 'foobar')
 
     def testGetDefaultToUnnamedRegister(self):
@@ -205,6 +221,7 @@ class TestCaseRegisters(ViewTest):
     def testGetSysClipboardAlwaysIfRequested(self):
         self.regs.settings.view['vintageous_use_sys_clipboard'] = True
         sublime.set_clipboard('foo')
+        clipboard.invalidate()
         self.assertEqual(self.regs.get(), ['foo'])
 
     def testGettingExpressionRegisterClearsExpressionRegister(self):
@@ -241,6 +258,14 @@ class TestCaseRegisters(ViewTest):
         values.update({'a': ['100'], 'b': ['200']})
         self.assertEqual(self.regs.to_dict(), values)
 
+    def testCanSummarizeRegisters(self):
+        self.regs.set('a', ['foo', 'bar'])
+        registers._REGISTER_DATA['b'] = registers.SpilledValue(['baz'])
+        summaries = dict((k, (v, n)) for (k, v, n) in self.regs.summarize())
+        self.assertEqual(summaries['a'], ('foo', 2))
+        self.assertEqual(summaries['b'], ('baz', 1))
+        self.assertNotIn('c', summaries)
+
     def testGettingEmptyRegisterReturnsNone(self):
         self.assertEqual(self.regs.get('a'), None)
 
@@ -390,7 +415,7 @@ class Test_yank(ViewTest):
 
         self.regs.yank(vi_cmd_data)
         self.assertEqual(registers._REGISTER_DATA, {
-            '1-9': [None] * 9,
+            '1-9': deque([None] * 9, maxlen=9),
             '0': None,
             })
 
@@ -408,7 +433,7 @@ class Test_yank(ViewTest):
             self.assertEqual(registers._REGISTER_DATA, {
                 '"': ['foo'],
                 '0': ['foo'],
-                '1-9': [None] * 9,
+                '1-9': deque([None] * 9, maxlen=9),
                 })
 
     def testYanksToRegisters(self):
@@ -423,7 +448,7 @@ class Test_yank(ViewTest):
                 '"': ['foo'],
                 'a': ['foo'],
                 '0': None,
-                '1-9': [None] * 9,
+                '1-9': deque([None] * 9, maxlen=9),
                 })
 
     def testCanPopulateSmallDeleteRegister(self):
@@ -441,7 +466,7 @@ class Test_yank(ViewTest):
                     '"': ['foo'],
                     '-': ['foo'],
                     '0': ['foo'],
-                    '1-9': [None] * 9})
+                    '1-9': deque([None] * 9, maxlen=9)})
 
     def testDoesNotPopulateSmallDeleteRegisterIfWeShouldNot(self):
         class vi_cmd_data:
@@ -455,6 +480,78 @@ class Test_yank(ViewTest):
                 a.return_value = False
                 self.regs.yank(vi_cmd_data)
                 self.assertEqual(registers._REGISTER_DATA, {
-                    '1-9': [None] * 9,
+                    '1-9': deque([None] * 9, maxlen=9),
                     '0': None,
                     })
+
+
+class Test_SpilledValue(unittest.TestCase):
+    def setUp(self):
+        registers._REGISTER_DATA = registers.init_register_data()
+        registers._packed_size = 0
+
+    def tearDown(self):
+        registers._REGISTER_DATA = registers.init_register_data()
+
+    def testCanLoadValues(self):
+        value = registers.SpilledValue(['foo', '', 'bär\n'])
+        self.assertEqual(value.load(), ['foo', '', 'bär\n'])
+        self.assertEqual(value.size, 7)
+
+    def testCanReadFirstFragment(self):
+        self.assertEqual(registers.SpilledValue(['bär', 'foo']).first(), 'bär')
+
+    def testSpillsLargeValues(self):
+        old, registers.SPILL_THRESHOLD = registers.SPILL_THRESHOLD, 5
+        try:
+            self.assertEqual(registers._pack(['foo', 1]), ['foo', '1'])
+            value = registers._pack(['foo', 'bar'])
+        finally:
+            registers.SPILL_THRESHOLD = old
+        self.assertIsInstance(value, registers.SpilledValue)
+        self.assertEqual(registers._unpack(value), ['foo', 'bar'])
+
+    def testKeepsNineNumberedRegisters(self):
+        for i in range(12):
+            registers._REGISTER_DATA['1-9'].appendleft([str(i)])
+        self.assertEqual(list(registers._REGISTER_DATA['1-9']),
+                         [[str(i)] for i in range(11, 2, -1)])
+
+    def testCanEnforceMemoryLimit(self):
+        shared = ['x' * 10]
+        registers._REGISTER_DATA['a'] = shared
+        registers._REGISTER_DATA['"'] = shared
+        registers._REGISTER_DATA['1-9'].appendleft(['y' * 4])
+        self.assertEqual(registers.memory_usage(), (14, 0))
+
+        registers.enforce_memory_limit(5)
+        self.assertIsInstance(registers._REGISTER_DATA['a'],
+                              registers.SpilledValue)
+        self.assertIs(registers._REGISTER_DATA['"'],
+                      registers._REGISTER_DATA['a'])
+        self.assertEqual(registers._REGISTER_DATA['1-9'][0], ['y' * 4])
+        self.assertEqual(registers.memory_usage(), (4, 10))
+
+    def testTracksPackedSize(self):
+        registers._REGISTER_DATA['a'] = registers._pack(['foo', 'ba'])
+        registers._pack(['dropped'])
+        self.assertEqual(registers._packed_size, 12)
+
+        registers.enforce_memory_limit(100)
+        self.assertEqual(registers._packed_size, 5)
+
+
+class Test_Block(unittest.TestCase):
+    def testComputesWidth(self):
+        self.assertEqual(registers.Block(['a', 'bbb', '']).width, 3)
+        self.assertEqual(registers.Block([]).width, 0)
+
+    def testStaysBlockwiseWhenStored(self):
+        value = registers._pack(registers.Block(['a', 1], width=4))
+        self.assertIsInstance(value, registers.Block)
+        self.assertEqual((value, value.width), (['a', '1'], 4))
+
+    def testStaysBlockwiseWhenSpilled(self):
+        value = registers.SpilledValue(registers.Block(['ab', 'c'])).load()
+        self.assertIsInstance(value, registers.Block)
+        self.assertEqual((value, value.width), (['ab', 'c'], 2))
@@ -1,7 +1,20 @@
+import unittest
+
+import sublime
+
 from Vintageous.tests import first_sel
 from Vintageous.tests import ViewTest
 
+from Vintageous.vi.search import compile_line_pattern
+from Vintageous.vi.search import find_in_range
+from Vintageous.vi.search import find_last_in_range
 from Vintageous.vi.search import find_wrapping
+from Vintageous.vi.search import format_search_count
+from Vintageous.vi.search import get_cached_matches
+from Vintageous.vi.search import get_matches
+from Vintageous.vi.search import literal_term
+from Vintageous.vi.search import Matches
+from Vintageous.vi.search import reverse_search
 
 
 class Test_find_wrapping(ViewTest):
@@ -36,4 +49,174 @@ aaa aaa xxx aaa
 
         # 4 is the beginning of the second line
         match = find_wrapping(self.view, 'xxx', 4, self.view.size())
-        self.assertEqual(match, self.R(12, 15))
\ No newline at end of file
+        self.assertEqual(match, self.R(12, 15))
+
+
+class TestMatches(unittest.TestCase):
+    def testCanFindFirstMatchAfterPoint(self):
+        matches = Matches([0, 10, 20], [3, 13, 23])
+        self.assertEqual(matches.first_after(5, 100), sublime.Region(10, 13))
+        self.assertEqual(matches.first_after(21, 100), None)
+        self.assertEqual(matches.first_after(5, 12), None)
+
+    def testCanFindLastMatchBeforePoint(self):
+        matches = Matches([0, 10, 20], [3, 13, 23])
+        self.assertEqual(matches.last_before(0, 15), sublime.Region(10, 13))
+        self.assertEqual(matches.last_before(0, 2), None)
+        self.assertEqual(matches.last_before(11, 15), None)
+
+    def testCanFindWrapping(self):
+        matches = Matches([0, 10, 20], [3, 13, 23])
+        self.assertEqual(matches.find_wrapping(11, 30, 11, times=1),
+                         sublime.Region(20, 23))
+        self.assertEqual(matches.find_wrapping(11, 30, 11, times=2),
+                         sublime.Region(0, 3))
+        self.assertEqual(matches.find_wrapping(21, 30, 0), None)
+
+    def testSearchesFromInsideMatches(self):
+        matches = Matches([1, 3], [3, 5], lambda pt: sublime.Region(pt, pt + 2))
+        self.assertEqual(matches.first_after(2, 5), sublime.Region(2, 4))
+        self.assertEqual(matches.first_after(2, 3), None)
+        self.assertEqual(matches.first_after(3, 5), sublime.Region(3, 5))
+
+    def testCanFindWrappingBackwards(self):
+        matches = Matches([0, 10, 20], [3, 13, 23])
+        self.assertEqual(matches.reverse_find_wrapping(0, 15, 15, 30, times=1),
+                         sublime.Region(10, 13))
+        self.assertEqual(matches.reverse_find_wrapping(0, 15, 15, 30, times=3),
+                         sublime.Region(20, 23))
+
+    def testKeepsGoingBackwardsAfterWrapping(self):
+        matches = Matches([0, 10, 20], [3, 13, 23])
+        self.assertEqual(matches.reverse_find_wrapping(0, 2, 2, 30, times=2),
+                         sublime.Region(10, 13))
+        self.assertEqual(matches.reverse_find_wrapping(0, 2, 2, 30, times=3),
+                         sublime.Region(0, 3))
+        self.assertEqual(matches.reverse_find_wrapping(0, 2, 2, 30, times=4),
+                         sublime.Region(20, 23))
+
+
+class Test_get_matches(ViewTest):
+    def testCanFindAllMatches(self):
+        self.write('xxx aaa xxx')
+        matches = get_matches(self.view, 'xxx', sublime.LITERAL)
+        self.assertEqual(matches.regions(), [self.R(0, 3), self.R(8, 11)])
+
+    def testFindsMatchesStartingInsideOthers(self):
+        self.write('xaaaa')
+        matches = get_matches(self.view, 'aa', sublime.LITERAL)
+        self.assertEqual(matches.regions(), [self.R(1, 3), self.R(3, 5)])
+        self.assertEqual(matches.find_wrapping(2, 5, 2), self.R(2, 4))
+
+    def testIsUpdatedWhenBufferChanges(self):
+        self.write('xxx aaa xxx')
+        get_matches(self.view, 'xxx', sublime.LITERAL)
+        self.write('aaa xxx')
+        matches = get_matches(self.view, 'xxx', sublime.LITERAL)
+        self.assertEqual(matches.regions(), [self.R(4, 7)])
+
+
+class Test_compile_line_pattern(unittest.TestCase):
+    def testCompilesLineLocalPatterns(self):
+        self.assertTrue(compile_line_pattern(r'^foo\w+$'))
+        self.assertTrue(compile_line_pattern('a.b', sublime.LITERAL))
+
+    def testRejectsPatternsThatMaySpanLines(self):
+        self.assertEqual(compile_line_pattern(r'foo\nbar'), None)
+        self.assertEqual(compile_line_pattern(r'foo\s+bar'), None)
+        self.assertEqual(compile_line_pattern(r'[^a]'), None)
+
+    def testRejectsSublimeTextOnlySyntax(self):
+        self.assertEqual(compile_line_pattern(r'\<foo\>'), None)
+        self.assertEqual(compile_line_pattern(r'[[:alpha:]]'), None)
+
+
+class Test_reverse_search(ViewTest):
+    def testFindsClosestMatchBeforeEnd(self):
+        self.write('foo bar\nfoo bar\nfoo bar\n')
+        match = reverse_search(self.view, 'foo', 0, 14)
+        self.assertEqual(match, self.R(8, 11))
+
+    def testRespectsStart(self):
+        self.write('foo bar\nfoo bar\n')
+        self.assertEqual(reverse_search(self.view, 'foo', 1, 7), None)
+
+    def testCanFindMatchesFarAway(self):
+        self.write('foo\n' + ('x' * 100 + '\n') * 1000)
+        match = reverse_search(self.view, 'foo', 0, self.view.size())
+        self.assertEqual(match, self.R(0, 3))
+
+    def testCanFindMultilineMatches(self):
+        self.write('foo\nbar\nfoo\nbaz\n')
+        match = reverse_search(self.view, r'foo\nbar', 0, self.view.size())
+        self.assertEqual(match, self.R(0, 7))
+
+    def testAnchorsDontMatchAtChunkBoundaries(self):
+        self.write('x\n\n' + 'abcdefgh\n' * 1000 + 'end')
+        match = reverse_search(self.view, '^$', 0, self.view.size())
+        self.assertEqual(match, self.R(2, 2))
+
+
+
+class Test_literal_term(unittest.TestCase):
+    def testCanDetectPlainStrings(self):
+        self.assertEqual(literal_term('foo bar'), 'foo bar')
+        self.assertEqual(literal_term(r'a\.b\('), 'a.b(')
+        self.assertEqual(literal_term('a.b', sublime.LITERAL), 'a.b')
+
+    def testRejectsPatterns(self):
+        self.assertEqual(literal_term('a.b'), None)
+        self.assertEqual(literal_term(r'\bfoo'), None)
+        self.assertEqual(literal_term('foo\\'), None)
+        self.assertEqual(literal_term(''), None)
+
+    def testRejectsCasedTextsIgnoringCase(self):
+        self.assertEqual(literal_term('foo', sublime.IGNORECASE), None)
+        self.assertEqual(literal_term(r'\(', sublime.IGNORECASE), '(')
+
+
+class Test_literal_search(ViewTest):
+    def testCanFindLiteralInRange(self):
+        self.write('a(b) a(c)')
+        self.assertEqual(find_in_range(self.view, r'\(', 2, 9),
+                         self.R(6, 7))
+        self.assertEqual(find_in_range(self.view, r'\(', 2, 6), None)
+
+    def testCanFindLastLiteralInRange(self):
+        self.write('a(b) a(c)')
+        self.assertEqual(find_last_in_range(self.view, '(', 0, 9,
+                                            sublime.LITERAL),
+                         self.R(6, 7))
+
+    def testCanFindLiteralBackwards(self):
+        self.write('foo bar foo bar')
+        self.assertEqual(reverse_search(self.view, 'foo', 0, 10),
+                         self.R(0, 3))
+        self.assertEqual(reverse_search(self.view, 'foo', 0, 11),
+                         self.R(8, 11))
+
+    def testLiteralMatchesAreCached(self):
+        self.write('ab ab ab')
+        matches = get_matches(self.view, 'ab')
+        self.assertEqual(matches.starts, [0, 3, 6])
+        self.assertIs(get_matches(self.view, 'ab'), matches)
+
+
+class Test_format_search_count(unittest.TestCase):
+    def testShowsIndexOfMatchAndTotal(self):
+        matches = Matches([0, 10, 20], [3, 13, 23])
+        self.assertEqual(format_search_count(matches, 10), '[2/3]')
+        self.assertEqual(format_search_count(matches, 0), '[1/3]')
+
+    def testCapsCounts(self):
+        matches = Matches(list(range(0, 50, 2)), list(range(1, 51, 2)))
+        self.assertEqual(format_search_count(matches, 4, 10), '[3/>10]')
+        self.assertEqual(format_search_count(matches, 40, 10), '[>10/>10]')
+
+
+class Test_get_cached_matches(ViewTest):
+    def testReturnsNoneUntilMatchesAreFound(self):
+        self.write('abc abc')
+        self.assertEqual(get_cached_matches(self.view, 'b+'), None)
+        matches = get_matches(self.view, 'b+')
+        self.assertIs(get_cached_matches(self.view, 'b+'), matches)
@@ -0,0 +1,67 @@
+from Vintageous.tests import ViewTest
+
+from Vintageous.vi.snapshot import TextSnapshot
+from Vintageous.vi.utils import regions_transformer_batch
+
+
+class Test_TextSnapshot(ViewTest):
+    def make_snapshot(self, text, chunk_size=4):
+        self.write(text)
+        snapshot = TextSnapshot(self.view)
+        snapshot.chunk_size = chunk_size
+        return snapshot
+
+    def testCanReadAcrossChunks(self):
+        snapshot = self.make_snapshot('abcdefghij')
+        self.assertEqual(snapshot.substr(2, 9), 'cdefghi')
+        self.assertEqual(snapshot.char(5), 'f')
+
+    def testReturnsNullCharOutsideBuffer(self):
+        snapshot = self.make_snapshot('abc')
+        self.assertEqual(snapshot.char(3), '\x00')
+        self.assertEqual(snapshot.char(-1), '\x00')
+
+    def testCanFindAcrossChunkBoundaries(self):
+        snapshot = self.make_snapshot('abcdefghij')
+        self.assertEqual(snapshot.find('def'), 3)
+        self.assertEqual(snapshot.find('def', 4), -1)
+        self.assertEqual(snapshot.rfind('cde'), 2)
+        self.assertEqual(snapshot.rfind('cde', 0, 4), -1)
+
+    def testCanFindLineBoundaries(self):
+        snapshot = self.make_snapshot('abc\ndefgh\n\nxyz')
+        self.assertEqual(snapshot.line_begin(6), 4)
+        self.assertEqual(snapshot.line_end(6), 9)
+        self.assertEqual(snapshot.line_begin(10), 10)
+        self.assertEqual(snapshot.line_end(10), 10)
+        self.assertEqual(snapshot.line_end(12), 14)
+
+    def testCanFindBoundariesOfLinesLongerThanChunks(self):
+        snapshot = self.make_snapshot('abc\nabcdefghij\nxy')
+        self.assertEqual(snapshot.line_begin(12), 4)
+        self.assertEqual(snapshot.line_end(5), 14)
+
+    def testKnowsWhenItIsStale(self):
+        snapshot = self.make_snapshot('abc')
+        self.assertTrue(snapshot.is_valid())
+        self.write('xyz')
+        self.assertFalse(snapshot.is_valid())
+
+
+class Test_regions_transformer_batch(ViewTest):
+    def testCanTransformAllSelections(self):
+        self.write('abc\nabc\nabc')
+        self.clear_sel()
+        self.add_sel(a=0, b=0)
+        self.add_sel(a=4, b=4)
+        self.add_sel(a=8, b=8)
+
+        def f(view, a, b, text):
+            for i in range(len(a)):
+                a[i] = b[i] = text.line_end(a[i])
+            return a, b
+
+        regions_transformer_batch(self.view, f)
+
+        self.assertEqual(list(self.view.sel()),
+                         [self.R(3, 3), self.R(7, 7), self.R(11, 11)])
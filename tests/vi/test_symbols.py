@@ -0,0 +1,94 @@
+import re
+import unittest
+
+from Vintageous.vi.symbols import CLASS
+from Vintageous.vi.symbols import FUNCTION
+from Vintageous.vi.symbols import SymbolIndex
+
+
+PYTHON = '''import x
+
+class A:
+    def m(self,
+          a):
+        return 1
+
+    def n(self): pass
+
+def g():
+    return 2
+'''
+
+C = '''struct A {
+    int m() {
+        return 1;
+    }
+}
+
+void f()
+{
+    y();
+}
+'''
+
+
+def make_index(text, names):
+    return SymbolIndex(text, [(text.index(name),
+                               re.match(r'\w+', name).group(0), kind)
+                              for (name, kind) in names])
+
+
+def substr(text, region):
+    return text[region.a:region.b]
+
+
+class Test_SymbolIndex(unittest.TestCase):
+    def setUp(self):
+        self.python = make_index(PYTHON, [('A:', CLASS), ('m(', FUNCTION),
+                                          ('n(', FUNCTION), ('g(', FUNCTION)])
+        self.c = make_index(C, [('A {', CLASS), ('m()', FUNCTION),
+                                ('f()', FUNCTION)])
+
+    def testFindsIndentedDefinitions(self):
+        m = self.python.symbols[1]
+        self.assertEqual(substr(PYTHON, m.region),
+                         '    def m(self,\n          a):\n        return 1\n')
+        self.assertEqual(substr(PYTHON, m.inner), '        return 1\n')
+        self.assertEqual(m.parent, self.python.symbols[0])
+
+    def testFindsOneLineDefinitions(self):
+        n = self.python.symbols[2]
+        self.assertEqual(substr(PYTHON, n.region), '    def n(self): pass\n')
+        self.assertIsNone(n.inner)
+
+    def testIncludesClosingLines(self):
+        m = self.c.symbols[1]
+        self.assertEqual(substr(C, m.region),
+                         '    int m() {\n        return 1;\n    }\n')
+        self.assertEqual(substr(C, m.inner), '        return 1;\n')
+
+    def testIncludesOpeningBraceInOwnLine(self):
+        f = self.c.symbols[2]
+        self.assertEqual(substr(C, f.region), 'void f()\n{\n    y();\n}\n')
+        self.assertEqual(substr(C, f.inner), '    y();\n')
+
+    def testFindsContainingSymbol(self):
+        pt = PYTHON.index('return 1')
+        self.assertEqual(self.python.containing(pt).name, 'm')
+        self.assertEqual(self.python.containing(pt, CLASS).name, 'A')
+        self.assertEqual(self.python.containing(pt, FUNCTION, 2), None)
+        self.assertEqual(self.python.containing(0), None)
+
+    def testFindsNextAndPreviousStarts(self):
+        pt = PYTHON.index('return 1')
+        self.assertEqual(self.python.next_start(pt), PYTHON.index('def n'))
+        self.assertEqual(self.python.next_start(pt, top_level=True),
+                         PYTHON.index('def g'))
+        self.assertEqual(self.python.previous_start(pt, top_level=True),
+                         PYTHON.index('class A'))
+        self.assertEqual(self.python.next_start(pt, count=3), None)
+
+    def testFindsNextAndPreviousEnds(self):
+        self.assertEqual(self.c.next_end(0, top_level=True), C.index('}\n\n'))
+        self.assertEqual(self.c.previous_end(len(C), top_level=True),
+                         C.rindex('}'))
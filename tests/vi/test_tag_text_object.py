@@ -1,15 +1,9 @@
-import unittest
 from collections import namedtuple
 
 import sublime
 
-from Vintageous.vi.text_objects import previous_begin_tag
 from Vintageous.vi.text_objects import find_containing_tag
-from Vintageous.vi.text_objects import next_end_tag
-from Vintageous.vi.text_objects import get_region_end
-from Vintageous.vi.text_objects import next_unbalanced_tag
-from Vintageous.vi.utils import modes
-from Vintageous.tests import first_sel
+from Vintageous.vi.text_objects import get_text_object_region
 from Vintageous.tests import ViewTest
 
 
@@ -18,63 +12,6 @@ test_data = namedtuple('test_data', 'content args expected msg')
 R = sublime.Region
 
 
-TESTS_SEARCH_TAG_FORWARD = (
-    test_data(content='<a>foo', args={'start': 0}, expected=(R(0, 3), 'a', False), msg='find tag'),
-    test_data(content='<a>foo', args={'start': 1}, expected=(None, None, None), msg="don't find tag"),
-    test_data(content='<a>foo</a>', args={'start': 1}, expected=(R(6, 10), 'a', True), msg='find other tag'),
-
-
-    test_data(content='<a hey="ho">foo', args={'start': 0}, expected=(R(0, 12), 'a', False), msg='find tag with attributes'),
-)
-
-TESTS_SEARCH_TAG_BACKWARD = (
-    test_data(content='<a>foo', args={'pattern': r'</?(a) *?.*?>', 'start': 0, 'end': 6}, expected=(R(0, 3), 'a', True), msg='find tag'),
-    test_data(content='<a>foo', args={'pattern': r'</?(a) *?.*?>', 'start': 0, 'end': 0}, expected=(None, None, None), msg="don't find tag"),
-    test_data(content='</a>foo', args={'pattern': r'</?(a) *?.*?>', 'start': 0, 'end': 6}, expected=(R(0, 4), 'a', False), msg='find a closing tag'),
-    test_data(content='<a>foo</a>', args={'pattern': r'</?(a) *?.*?>', 'start': 0, 'end': 5}, expected=(R(0, 3), 'a', True), msg='find other tag'),
-
-    test_data(content='<a hey="ho">foo', args={'pattern': r'</?(a) *?.*?>', 'start': 0, 'end': 14}, expected=(R(0, 12), 'a', True), msg='find tag with attributes'),
-)
-
-
-TESTS_NEXT_UNBALANCED_END_TAG = (
-    test_data(content='<p>foo <p>bar</p> baz</p>', args={'search': next_end_tag, 'search_args': {'start': 3}, 'restart_at': get_region_end}, expected=(R(21, 25), 'p'), msg='find end tag skipping nested'),
-)
-
-
-
-class Test_next_unbalanced_end_tag(ViewTest):
-    def test_next_unbalanced_end_tag(self):
-        self.view.set_syntax_file('Packages/HTML/HTML.tmLanguage')
-        for (i, data) in enumerate(TESTS_NEXT_UNBALANCED_END_TAG):
-            self.write(data.content)
-            actual = next_unbalanced_tag(self.view, **data.args)
-
-            msg = "failed at test index {0}: {1}".format(i, data.msg)
-            self.assertEqual(data.expected, actual, msg)
-
-
-
-class Test_TagSearch(ViewTest):
-    def test_next_end_tag(self):
-        self.view.set_syntax_file('Packages/HTML/HTML.tmLanguage')
-        for (i, data) in enumerate(TESTS_SEARCH_TAG_FORWARD):
-            self.write(data.content)
-            actual = next_end_tag(self.view, **data.args)
-
-            msg = "failed at test index {0}: {1}".format(i, data.msg)
-            self.assertEqual(data.expected, actual, msg)
-
-    def test_previous_begin_tag(self):
-        self.view.set_syntax_file('Packages/HTML/HTML.tmLanguage')
-        for (i, data) in enumerate(TESTS_SEARCH_TAG_BACKWARD):
-            self.write(data.content)
-            actual = previous_begin_tag(self.view, **data.args)
-
-            msg = "failed at test index {0}: {1}".format(i, data.msg)
-            self.assertEqual(data.expected, actual, msg)
-
-
 TESTS_CONTAINING_TAG = (
     test_data(content='<a>foo</a>', args={'start': 4}, expected=(R(0, 3), R(6, 10), 'a'), msg='find tag'),
     test_data(content='<div>foo</div>', args={'start': 5}, expected=(R(0, 5), R(8, 14), 'div'), msg='find long tag'),
@@ -84,6 +21,11 @@ TESTS_CONTAINING_TAG = (
     test_data(content='<div>foo</div>', args={'start': 13}, expected=(R(0, 5), R(8, 14), 'div'), msg='find tag from within end tag'),
 
     test_data(content='<div>foo <p>bar</p></div>', args={'start': 12}, expected=(R(9, 12), R(15, 19), 'p'), msg='find nested tag from inside'),
+    test_data(content='<p>foo <p>bar</p> baz</p>', args={'start': 3}, expected=(R(0, 3), R(21, 25), 'p'), msg='find end tag skipping nested'),
+    test_data(content='<div>foo <p>bar</p></div>', args={'start': 12, 'count': 2}, expected=(R(0, 5), R(19, 25), 'div'), msg='find outer tag with count'),
+
+    test_data(content='<a>foo', args={'start': 4}, expected=(None, None, None), msg="don't find unclosed tag"),
+    test_data(content='</a>foo', args={'start': 5}, expected=(None, None, None), msg="don't find stray end tag"),
 )
 
 class Test_FindContainingTag(ViewTest):
@@ -95,3 +37,25 @@ class Test_FindContainingTag(ViewTest):
 
             msg = "failed at test index {0}: {1}".format(i, data.msg)
             self.assertEqual(data.expected, actual, msg)
+
+
+TESTS_TAG_TEXT_OBJECT = (
+    test_data(content='<a>foo</a>', args={'pt': 4, 'inclusive': False}, expected=R(3, 6), msg='it selects content'),
+    test_data(content='<a>foo</a>', args={'pt': 4, 'inclusive': True}, expected=R(0, 10), msg='at selects element'),
+    test_data(content='<a hey="ho">foo</a>', args={'pt': 13, 'inclusive': False}, expected=R(12, 15), msg='it skips attributes'),
+    test_data(content='<p>foo <p>bar</p> baz</p>', args={'pt': 4, 'inclusive': False}, expected=R(3, 21), msg='it spans nested tags'),
+    test_data(content='<p>foo <p>bar</p> baz</p>', args={'pt': 11, 'inclusive': True, 'count': 2}, expected=R(0, 25), msg='at with count selects outer element'),
+    test_data(content='foo <a>bar', args={'pt': 1, 'inclusive': True}, expected=R(1, 1), msg='no tag leaves selection'),
+)
+
+class Test_TagTextObject(ViewTest):
+    def test_tag_text_object(self):
+        self.view.set_syntax_file('Packages/HTML/HTML.tmLanguage')
+        for (i, data) in enumerate(TESTS_TAG_TEXT_OBJECT):
+            self.write(data.content)
+            args = dict(data.args)
+            pt = args.pop('pt')
+            actual = get_text_object_region(self.view, R(pt, pt), 't', **args)
+
+            msg = "failed at test index {0}: {1}".format(i, data.msg)
+            self.assertEqual(data.expected, actual, msg)
@@ -0,0 +1,56 @@
+import unittest
+
+import sublime
+
+from Vintageous.vi.tags import TagTree
+
+
+R = sublime.Region
+
+
+class Test_TagTree(unittest.TestCase):
+    def testPairsTags(self):
+        tree = TagTree('<div>foo <p>bar</p></div>')
+        self.assertEqual([(e.name, e.start, e.end) for e in tree.elements],
+                         [('div', R(0, 5), R(19, 25)),
+                          ('p', R(9, 12), R(15, 19))])
+
+    def testNestsElements(self):
+        tree = TagTree('<div>foo <p>bar</p></div>')
+        self.assertEqual(tree.elements[1].parent, tree.elements[0])
+        self.assertIsNone(tree.elements[0].parent)
+
+    def testIgnoresUnclosedElementsAndStrayEndTags(self):
+        tree = TagTree('<ul><li>a<br></ul></p>')
+        self.assertEqual([e.name for e in tree.elements], ['ul'])
+
+    def testIgnoresSelfClosingTagsAndComments(self):
+        tree = TagTree('<a><b/><!-- <a> --></a>')
+        self.assertEqual([(e.start, e.end) for e in tree.elements],
+                         [(R(0, 3), R(19, 23))])
+
+    def testSkipsScriptContent(self):
+        tree = TagTree('<script>if (a<b) {}</b></script>')
+        self.assertEqual([e.name for e in tree.elements], ['script'])
+
+    def testAllowsGreaterThanInQuotedAttributes(self):
+        tree = TagTree('<a title="x>y">foo</a>')
+        self.assertEqual(tree.elements[0].start, R(0, 15))
+
+    def testFindsContainingElement(self):
+        tree = TagTree('<div>foo <p>bar</p> baz</div>')
+        self.assertEqual(tree.containing(13).name, 'p')
+        self.assertEqual(tree.containing(21).name, 'div')
+        self.assertEqual(tree.containing(2).name, 'div')
+        self.assertIsNone(tree.containing(29))
+
+    def testFindsContainingElementWithCount(self):
+        tree = TagTree('<div>foo <p>bar</p> baz</div>')
+        self.assertEqual(tree.containing(13, 2).name, 'div')
+        self.assertIsNone(tree.containing(13, 3))
+
+    def testFindsTagAtPoint(self):
+        tree = TagTree('<div>foo <p>bar</p></div>')
+        self.assertEqual(tree.tag_at(10), (tree.elements[1], True))
+        self.assertEqual(tree.tag_at(24), (tree.elements[0], False))
+        self.assertEqual(tree.tag_at(6), (None, None))
@@ -7,7 +7,9 @@ from Vintageous.tests import add_sel
 from Vintageous.tests import ViewTest
 
 from Vintageous.vi.text_objects import find_prev_lone_bracket
+from Vintageous.vi.text_objects import find_argument
 from Vintageous.vi.text_objects import find_next_lone_bracket
+from Vintageous.vi.text_objects import find_quoted_region
 
 
 test = namedtuple('simple_test', 'content start brackets expected msg')
@@ -32,6 +34,37 @@ TESTS = (
     )
 
 
+quote_test = namedtuple('quote_test', 'content start expected msg')
+
+TESTS_QUOTES = (
+    quote_test(content='a "bc" d',        start=4, expected=R(2, 6), msg='should find string around caret'),
+    quote_test(content='a "bc" d',        start=2, expected=R(2, 6), msg='should find string at opening quote'),
+    quote_test(content='a "bc" d',        start=5, expected=R(2, 6), msg='should find string at closing quote'),
+    quote_test(content='a "bc" d',        start=0, expected=R(2, 6), msg='should find next string'),
+    quote_test(content='"a" b "c"',       start=4, expected=R(6, 9), msg='should not pair quotes of different strings'),
+    quote_test(content='"a" b "c"',       start=7, expected=R(6, 9), msg='should find second string in line'),
+    quote_test(content='"a\\"b" c',       start=1, expected=R(0, 6), msg='should skip escaped quote'),
+    quote_test(content='"a\\\\" b "c"',   start=1, expected=R(0, 5), msg='should not skip quote after escaped backslash'),
+    quote_test(content='"a"\n"b"',        start=5, expected=R(4, 7), msg='should pair quotes in caret line only'),
+    quote_test(content='a "bc',           start=3, expected=None,    msg='should not find unbalanced string'),
+    )
+
+
+argument_test = namedtuple('argument_test', 'content start inclusive count expected msg')
+
+TESTS_ARGUMENTS = (
+    argument_test(content='f(a, b, c)',    start=5, inclusive=False, count=1, expected=R(5, 6), msg='should find argument'),
+    argument_test(content='f(a, b, c)',    start=3, inclusive=False, count=1, expected=R(2, 3), msg='should find argument before comma'),
+    argument_test(content='f(a, b, c)',    start=5, inclusive=True,  count=1, expected=R(5, 8), msg='should include next comma'),
+    argument_test(content='f(a, b, c)',    start=8, inclusive=True,  count=1, expected=R(6, 9), msg='should include previous comma for last argument'),
+    argument_test(content='f(a, b, c)',    start=2, inclusive=False, count=2, expected=R(2, 6), msg='should find many arguments'),
+    argument_test(content='f(a, g(b, c))', start=5, inclusive=False, count=1, expected=R(5, 12), msg='should skip nested commas'),
+    argument_test(content='f(a, g(b, c))', start=7, inclusive=False, count=1, expected=R(7, 8), msg='should find nested argument'),
+    argument_test(content='f(a, "b, )")',  start=2, inclusive=True,  count=1, expected=R(2, 5), msg='should skip commas in strings'),
+    argument_test(content='f a, b',        start=5, inclusive=False, count=1, expected=None,    msg='should not find argument outside brackets'),
+    )
+
+
 TESTS_NEXT_BRACKET = (
     test(content='a\\}bc', start=2, brackets=('\\{', '\\}'), expected=None, msg='should not find escaped bracket at caret position'),
     test(content='a\\}bc', start=0, brackets=('\\{', '\\}'), expected=None, msg='should not find escaped bracket'),
@@ -69,3 +102,26 @@ class Test_next_bracket(ViewTest):
 
             msg = "failed at test index {0}: {1}".format(i, data.msg)
             self.assertEqual(data.expected, actual, msg)
+
+
+class Test_find_quoted_region(ViewTest):
+    def testAll(self):
+        for (i, data) in enumerate(TESTS_QUOTES):
+            self.write(data.content)
+
+            actual = find_quoted_region(self.view, data.start, '"')
+
+            msg = "failed at test index {0}: {1}".format(i, data.msg)
+            self.assertEqual(data.expected, actual, msg)
+
+
+class Test_find_argument(ViewTest):
+    def testAll(self):
+        for (i, data) in enumerate(TESTS_ARGUMENTS):
+            self.write(data.content)
+
+            actual = find_argument(self.view, data.start,
+                                   inclusive=data.inclusive, count=data.count)
+
+            msg = "failed at test index {0}: {1}".format(i, data.msg)
+            self.assertEqual(data.expected, actual, msg)
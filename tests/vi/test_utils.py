@@ -0,0 +1,32 @@
+import unittest
+from unittest import mock
+
+import sublime
+
+from Vintageous.vi import utils
+
+
+class Test_read_regions(unittest.TestCase):
+    def setUp(self):
+        self.view = mock.Mock()
+        text = 'foo bar baz\n' * 100
+        self.view.substr.side_effect = lambda r: text[r.begin():r.end()]
+        self.regions = [sublime.Region(i * 12, i * 12 + 3) for i in range(100)]
+
+    def testReadsFewRegionsOneByOne(self):
+        fragments = utils.read_regions(self.view, self.regions[:3])
+        self.assertEqual(fragments, ['foo'] * 3)
+        self.assertEqual(self.view.substr.call_count, 3)
+
+    def testReadsManyRegionsAtOnce(self):
+        fragments = utils.read_regions(self.view, self.regions)
+        self.assertEqual(fragments, ['foo'] * 100)
+        self.assertEqual(self.view.substr.call_count, 1)
+
+    def testReadsSparseRegionsOneByOne(self):
+        self.view.substr.side_effect = lambda r: 'x' * r.size()
+        regions = [sublime.Region(i * 100000, i * 100000 + 1)
+                   for i in range(100)]
+        fragments = utils.read_regions(self.view, regions)
+        self.assertEqual(fragments, ['x'] * 100)
+        self.assertEqual(self.view.substr.call_count, 100)
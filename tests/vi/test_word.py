@@ -10,6 +10,7 @@ from Vintageous.tests import set_text
 from Vintageous.tests import add_sel
 
 from Vintageous.vi.units import next_word_start
+from Vintageous.vi.units import nth_word_start
 from Vintageous.vi.units import word_starts
 from Vintageous.vi.units import CLASS_VI_INTERNAL_WORD_START
 
@@ -828,3 +829,32 @@ class Test_words_InInternalNormalMode_FromLine(ViewTest):
 
         pt = word_starts(self.view, r.b, internal=True, count=2)
         self.assertEqual(pt, 7)
+
+
+class Test_nth_word_start(ViewTest):
+    def testCanSkipManyWords(self):
+        set_text(self.view, ''.join(('foo bar\n',) * 1000))
+
+        pt = nth_word_start(self.view, 0, 1999)
+        self.assertEqual(pt, 7996)
+
+    def testStopsAtEmptyLinesOnly(self):
+        set_text(self.view, 'foo\n  \n\nbar\n')
+
+        self.assertEqual(nth_word_start(self.view, 0, 1), 7)
+        self.assertEqual(nth_word_start(self.view, 0, 2), 8)
+
+    def testStopsAtPunctuation(self):
+        set_text(self.view, 'foo.bar(baz)\n')
+
+        self.assertEqual(nth_word_start(self.view, 0, 3), 7)
+
+    def testReturnsEofIfCountTooHigh(self):
+        set_text(self.view, 'foo bar\n')
+
+        self.assertEqual(nth_word_start(self.view, 0, 100), 8)
+
+    def testCanSkipBigWords(self):
+        set_text(self.view, 'foo.bar baz(qux) x\n')
+
+        self.assertEqual(nth_word_start(self.view, 0, 2, big=True), 17)
@@ -0,0 +1,98 @@
+"""
+Access to the system clipboard for registers.
+
+Writing to and reading from the system clipboard can be slow if clipboard
+managers are listening. Writes are therefore deferred to the async thread
+and, if several happen before it runs, only the last one is made. Reads are
+served from a cache of the last value read or written, which expires after
+`CACHE_TTL` seconds or when Sublime Text regains focus, as the clipboard may
+have changed in other applications. Copying or cutting with Sublime Text's
+own commands resets both.
+
+Writes of multiple selections aren't made here: registers run the copy
+command instead, which keeps one fragment per selection.
+"""
+
+import threading
+import time
+
+import sublime
+
+
+# Milliseconds to wait before writing to the system clipboard.
+SYNC_DELAY = 10
+# Seconds a value read from or written to the clipboard is trusted for.
+CACHE_TTL = 1.0
+
+_lock = threading.Lock()
+# Value waiting to be written to the system clipboard, or `None`.
+_pending = None
+# Last value read from or written to the clipboard and when, or `None`.
+_cached = None
+_cached_at = 0
+
+
+def set(text):
+    """
+    Sets the system clipboard to @text soon. `get()` returns @text
+    immediately.
+    """
+    global _pending, _cached, _cached_at
+    with _lock:
+        is_scheduled = _pending is not None
+        _pending = text
+        _cached = text
+        _cached_at = time.time()
+    if not is_scheduled:
+        sublime.set_timeout_async(flush, SYNC_DELAY)
+
+
+def get():
+    """
+    Returns the contents of the system clipboard, including writes not made
+    yet.
+    """
+    global _cached, _cached_at
+    with _lock:
+        if _pending is not None:
+            return _pending
+        if _cached is not None and time.time() - _cached_at < CACHE_TTL:
+            return _cached
+
+    text = sublime.get_clipboard()
+    with _lock:
+        _cached = text
+        _cached_at = time.time()
+    return text
+
+
+def flush():
+    """
+    Makes the pending write to the system clipboard, if any.
+    """
+    global _pending
+    with _lock:
+        text, _pending = _pending, None
+    if text is not None:
+        sublime.set_clipboard(text)
+
+
+def invalidate():
+    """
+    Forgets the cached contents of the clipboard, so that the next read
+    goes to the system clipboard.
+    """
+    global _cached
+    with _lock:
+        _cached = None
+
+
+def reset():
+    """
+    Drops the pending write and the cached contents after the clipboard was
+    set by something else, like Sublime Text's copy command.
+    """
+    global _pending, _cached
+    with _lock:
+        _pending = None
+        _cached = None
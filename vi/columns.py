@@ -0,0 +1,194 @@
+"""
+Conversions between buffer offsets and display columns.
+
+Vim keeps track of the column the caret is displayed at, not of its offset
+in the line, so that vertical motions and visual block selections line up on
+screen. Tabs and East Asian wide characters take up more than one column,
+so we build a map of the display columns in a line and cache it per view
+until the buffer changes.
+"""
+
+from array import array
+from bisect import bisect_right
+
+from Vintageous.vi.utils import is_long_line
+
+
+# Stores (change_count, tab_size, {line_begin: ColumnMap}) indexed by view.id().
+_maps = {}
+
+# Maps cached per view before we start over.
+MAX_CACHED_LINES = 1024
+
+# Ranges of code points displayed as two columns (East Asian Wide and
+# Fullwidth), as (first, last) pairs.
+_WIDE_RANGES = (
+    (0x1100, 0x115F),
+    (0x2E80, 0x303E),
+    (0x3041, 0x33FF),
+    (0x3400, 0x4DBF),
+    (0x4E00, 0x9FFF),
+    (0xA000, 0xA4CF),
+    (0xA960, 0xA97F),
+    (0xAC00, 0xD7A3),
+    (0xF900, 0xFAFF),
+    (0xFE10, 0xFE19),
+    (0xFE30, 0xFE6F),
+    (0xFF00, 0xFF60),
+    (0xFFE0, 0xFFE6),
+    (0x1F300, 0x1F64F),
+    (0x1F900, 0x1F9FF),
+    (0x20000, 0x2FFFD),
+    (0x30000, 0x3FFFD),
+)
+_WIDE_STARTS = [first for (first, last) in _WIDE_RANGES]
+
+
+def destroy(view):
+    try:
+        del _maps[view.id()]
+    except KeyError:
+        pass
+
+
+def char_width(c):
+    """
+    Returns the number of display columns taken up by the character @c,
+    ignoring tabs.
+    """
+    cp = ord(c)
+    if cp < _WIDE_STARTS[0]:
+        return 1
+    i = bisect_right(_WIDE_STARTS, cp) - 1
+    return 2 if cp <= _WIDE_RANGES[i][1] else 1
+
+
+def get_map(view, pt):
+    """
+    Returns a `ColumnMap` for the line containing @pt.
+
+    Maps are cached until the view's contents or its tab size change.
+
+    @view
+      Target view.
+    @pt
+      Any point in the line.
+    """
+    line = view.line(pt)
+    tab_size = view.settings().get('tab_size') or 8
+    change_count = view.change_count()
+
+    try:
+        cached_change_count, cached_tab_size, maps = _maps[view.id()]
+        if (cached_change_count != change_count or
+                cached_tab_size != tab_size or
+                len(maps) >= MAX_CACHED_LINES):
+            raise KeyError
+    except KeyError:
+        maps = {}
+        _maps[view.id()] = (change_count, tab_size, maps)
+
+    try:
+        return maps[line.a]
+    except KeyError:
+        pass
+
+    if is_long_line(view, line):
+        # Reading long lines in full on every keypress is too slow, so we
+        # assume they are made up of single-column characters.
+        column_map = ColumnMap.plain(line.a, line.size())
+    else:
+        column_map = ColumnMap(view.substr(line), tab_size, begin=line.a)
+    maps[line.a] = column_map
+    return column_map
+
+
+def col_at(view, pt):
+    """
+    Returns the display column at which @pt is shown.
+    """
+    return get_map(view, pt).col_at(pt)
+
+
+def pt_at(view, pt, col):
+    """
+    Returns the point in the line containing @pt that is displayed at the
+    column @col. Points beyond the end of the line are clamped to its last
+    character.
+    """
+    column_map = get_map(view, pt)
+    return column_map.clamp(column_map.pt_at(col))
+
+
+class ColumnMap(object):
+    """
+    Display columns of the characters in a single line.
+
+    Lines made up of single-column characters only map offsets to columns
+    one to one, so they don't store anything else.
+    """
+
+    def __init__(self, text, tab_size=8, begin=0):
+        self.begin = begin
+        self.size = len(text)
+
+        if '\t' not in text and all(ord(c) < _WIDE_STARTS[0] for c in text):
+            self.starts = None
+            self.width = self.size
+            return
+
+        # Column at which each character starts, plus the line's width.
+        starts = array('l')
+        col = 0
+        for c in text:
+            starts.append(col)
+            if c == '\t':
+                col += tab_size - (col % tab_size)
+            else:
+                col += char_width(c)
+        starts.append(col)
+        self.starts = starts
+        self.width = col
+
+    @classmethod
+    def plain(cls, begin, size):
+        """
+        Returns a map for a line of @size single-column characters.
+        """
+        column_map = cls('', begin=begin)
+        column_map.size = column_map.width = size
+        return column_map
+
+    def clamp(self, pt):
+        """
+        Returns @pt if it's on a character of the line, or else the line's
+        last character. Empty lines clamp to their beginning.
+        """
+        end = self.begin + max(self.size - 1, 0)
+        return max(self.begin, min(pt, end))
+
+    def col_at(self, pt):
+        """
+        Returns the display column at which the character at @pt starts.
+        """
+        offset = max(pt - self.begin, 0)
+        if offset >= self.size:
+            return self.width + (offset - self.size)
+        if self.starts is None:
+            return offset
+        return self.starts[offset]
+
+    def pt_at(self, col):
+        """
+        Returns the point whose character is displayed at @col.
+
+        Columns beyond the end of the line yield points beyond the line, one
+        per column, so that callers can tell how far off they are.
+        """
+        col = max(col, 0)
+        if col >= self.width:
+            return self.begin + self.size + (col - self.width)
+        if self.starts is None:
+            return self.begin + col
+        return self.begin + bisect_right(self.starts, col) - 1
+
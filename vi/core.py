@@ -2,6 +2,7 @@ import sublime
 import sublime_plugin
 
 from Vintageous.state import State
+from Vintageous.vi.utils import erase_regions
 from Vintageous.vi.utils import IrreversibleTextCommand
 
 
@@ -118,6 +119,15 @@ class ViTextCommandBase(sublime_plugin.TextCommand, ViCommandMixin):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
+    def erase_sel(self, edit):
+        """
+        Erases the text in every selection in one pass and leaves an empty
+        caret where each selection began.
+        """
+        pts = erase_regions(self.view, edit, list(self.view.sel()))
+        self.view.sel().clear()
+        self.view.sel().add_all([sublime.Region(pt) for pt in pts])
+
 
 # Due to MRO in Python subclasses, IrreversibleTextCommand must come first so
 # that the modified .run_() method is found first.
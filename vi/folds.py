@@ -0,0 +1,176 @@
+"""
+Index of the rows hidden by folds in a view.
+
+Line motions need to know which rows are hidden so that they can skip over
+them. Asking Sublime Text for the folded regions and scanning them for every
+selection gets slow in heavily folded buffers, so we keep a sorted list of
+hidden row intervals per view and only rebuild it when the folds change.
+"""
+
+from bisect import bisect_right
+
+
+# Stores FoldIndex instances indexed by view.id().
+_indexes = {}
+
+
+def destroy(view):
+    try:
+        del _indexes[view.id()]
+    except KeyError:
+        pass
+
+
+def get_index(view):
+    """
+    Returns an up-to-date `FoldIndex` for @view.
+
+    The index is cached and only rebuilt when the view's folds or its
+    contents change.
+
+    @view
+      Target view.
+    """
+    folds = tuple((r.a, r.b) for r in view.folded_regions())
+    key = (view.change_count(), folds)
+
+    try:
+        cached_key, index = _indexes[view.id()]
+        if cached_key == key:
+            return index
+    except KeyError:
+        pass
+
+    index = FoldIndex.from_view(view, folds)
+    _indexes[view.id()] = (key, index)
+    return index
+
+
+class FoldIndex(object):
+    """
+    Sorted, non-overlapping intervals of hidden rows.
+
+    Intervals are (first_hidden_row, last_hidden_row) pairs, both ends
+    inclusive. Adjacent and nested folds are merged, so that every interval
+    is preceded by a visible row.
+    """
+
+    def __init__(self, intervals=()):
+        merged = []
+        for first, last in sorted(intervals):
+            if last < first:
+                continue
+            if merged and first <= merged[-1][1] + 1:
+                if last > merged[-1][1]:
+                    merged[-1] = (merged[-1][0], last)
+                continue
+            merged.append((first, last))
+
+        self.starts = [first for (first, last) in merged]
+        self.ends = [last for (first, last) in merged]
+        # Number of hidden rows in all intervals before the i-th one.
+        self.hidden_before = [0]
+        for first, last in merged:
+            self.hidden_before.append(self.hidden_before[-1] +
+                                      (last - first + 1))
+
+    @classmethod
+    def from_view(cls, view, folds=None):
+        """
+        Builds an index from the folded regions in @view.
+
+        A fold hides every row after the one it starts in up to, and
+        including, the one it ends in; that row's tail is displayed next to
+        the fold's first row.
+        """
+        if folds is None:
+            folds = tuple((r.a, r.b) for r in view.folded_regions())
+
+        intervals = []
+        for a, b in folds:
+            if a == b:
+                continue
+            first = view.rowcol(min(a, b))[0] + 1
+            last = view.rowcol(max(a, b))[0]
+            intervals.append((first, last))
+        return cls(intervals)
+
+    def __len__(self):
+        return len(self.starts)
+
+    def _interval_at(self, row):
+        i = bisect_right(self.starts, row) - 1
+        if i >= 0 and row <= self.ends[i]:
+            return i
+        return -1
+
+    def is_hidden(self, row):
+        return self._interval_at(row) != -1
+
+    def visible_row(self, row):
+        """
+        Returns @row if it's visible, or else the row displaying the fold
+        that hides it.
+        """
+        i = self._interval_at(row)
+        if i == -1:
+            return row
+        return self.starts[i] - 1
+
+    def hidden_between(self, a, b):
+        """
+        Returns the number of hidden rows in the range [@a, @b].
+        """
+        if b < a:
+            a, b = b, a
+        return self._hidden_upto(b) - self._hidden_upto(a - 1)
+
+    def _hidden_upto(self, row):
+        # Hidden rows in the range [0, row].
+        i = bisect_right(self.starts, row)
+        if i == 0:
+            return 0
+        hidden = self.hidden_before[i]
+        if row < self.ends[i - 1]:
+            hidden -= self.ends[i - 1] - row
+        return hidden
+
+    def _rank(self, row):
+        # Number of visible rows before @row.
+        row = self.visible_row(row)
+        return row - self._hidden_upto(row)
+
+    def _row_at_rank(self, rank):
+        # Returns the visible row that has @rank visible rows before it.
+        lo, hi = 0, len(self.starts)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.starts[mid] - self.hidden_before[mid] <= rank:
+                lo = mid + 1
+            else:
+                hi = mid
+        return rank + self.hidden_before[lo]
+
+    def next_visible_row(self, row):
+        """
+        Returns the first visible row after @row.
+
+        The returned row may lie beyond the end of the buffer.
+        """
+        return self.row_below(row, 1)
+
+    def row_below(self, row, count=1):
+        """
+        Returns the visible row @count visible rows below @row.
+
+        The returned row may lie beyond the end of the buffer, so callers
+        should clamp it.
+        """
+        return self._row_at_rank(self._rank(row) + count)
+
+    def row_above(self, row, count=1):
+        """
+        Returns the visible row @count visible rows above @row, or 0 if
+        there aren't enough rows.
+        """
+        return self._row_at_rank(max(self._rank(row) - count, 0))
@@ -0,0 +1,200 @@
+"""
+Highlighting of search matches (hlsearch).
+
+Highlighting every match of a common term in a big buffer means adding
+millions of regions to the view, which freezes Sublime Text for a long time.
+Instead, we only highlight the matches in and around the visible region, and
+extend the highlighted range as the view scrolls. In small buffers, the
+highlighted range spans the whole buffer, so all matches are highlighted.
+"""
+
+from bisect import bisect_left
+
+import sublime
+
+
+# Stores Highlight instances indexed by view.id().
+_highlights = {}
+
+# Characters before and after the visible region whose matches are
+# highlighted too.
+MARGIN = 1 << 15
+# Maximum number of matches highlighted at a time.
+MAX_REGIONS = 10000
+# Milliseconds between checks for scrolling.
+POLL_INTERVAL = 250
+# Milliseconds to wait for more edits before updating the highlights.
+EDIT_DELAY = 100
+
+
+def destroy(view):
+    try:
+        _highlights.pop(view.id()).cancel()
+    except KeyError:
+        pass
+
+
+def highlight(view, pattern, flags=0):
+    """
+    Highlights the matches of @pattern around the visible region of @view,
+    replacing any previous highlights.
+
+    @view
+      Target view.
+    @pattern
+      Search pattern in Sublime Text's syntax.
+    @flags
+      Sublime Text search flags.
+    """
+    destroy(view)
+    hl = Highlight(view, pattern, flags)
+    _highlights[view.id()] = hl
+    hl.update()
+    hl.poll()
+
+
+def clear(view):
+    """
+    Removes the search highlights from @view.
+    """
+    destroy(view)
+    view.erase_regions('vi_search')
+
+
+def get_highlight(view):
+    """
+    Returns the active `Highlight` in @view, or `None`.
+    """
+    return _highlights.get(view.id())
+
+
+def on_modified(view):
+    hl = get_highlight(view)
+    if hl:
+        hl.schedule_update(EDIT_DELAY)
+
+
+class Highlight(object):
+    """
+    Matches of a pattern highlighted in the range [.a, .b) of a view.
+    """
+
+    def __init__(self, view, pattern, flags=0):
+        self.view = view
+        self.pattern = pattern
+        self.flags = flags
+        self.a = self.b = 0
+        self.regions = []
+        self.change_count = None
+        # Bumped to drop any pending update.
+        self.generation = 0
+
+    def cancel(self):
+        self.generation += 1
+
+    def window(self):
+        """
+        Returns the range that should be highlighted right now.
+        """
+        visible = self.view.visible_region()
+        return (max(visible.begin() - MARGIN, 0),
+                min(visible.end() + MARGIN, self.view.size()))
+
+    def update(self):
+        """
+        Highlights the matches in the current window if they aren't yet.
+        """
+        a, b = self.window()
+        change_count = self.view.change_count()
+
+        if change_count == self.change_count:
+            if self.a <= a and b <= self.b:
+                return
+            if a <= self.b and self.a <= b:
+                # Extend the highlighted range.
+                before = self.find(a, self.a) if a < self.a else []
+                after = self.find(self.b, b) if b > self.b else []
+                regions = before + self.regions + after
+                if len(regions) <= MAX_REGIONS:
+                    self.a, self.b = min(a, self.a), max(b, self.b)
+                    self.regions = regions
+                    self.draw()
+                    return
+
+        self.a, self.b = a, b
+        self.regions = self.find(a, b)
+        self.change_count = change_count
+        self.draw()
+
+    def find(self, a, b):
+        """
+        Returns the matches starting in the range [@a, @b).
+
+        If the search has cached the matches in the buffer, they're sliced
+        from those. Otherwise, only the range is scanned, so that big
+        buffers aren't scanned whole after every edit.
+        """
+        # The search module imports this one.
+        from Vintageous.vi import search
+
+        matches = search.get_cached_matches(self.view, self.pattern,
+                                            self.flags)
+        if matches is not None:
+            i = bisect_left(matches.starts, a)
+            j = min(bisect_left(matches.starts, b), i + MAX_REGIONS)
+            return [sublime.Region(matches.starts[k], matches.ends[k])
+                    for k in range(i, j)]
+
+        regions = []
+        pt = a
+        while pt < b and len(regions) < MAX_REGIONS:
+            match = self.view.find(self.pattern, pt, self.flags)
+            if not match or match.a == -1 or match.a >= b:
+                break
+            regions.append(match)
+            pt = match.b if (match.b > match.a) else (match.b + 1)
+        return regions
+
+    def draw(self):
+        if not self.regions:
+            self.view.erase_regions('vi_search')
+            return
+
+        # TODO: Re-enable this.
+        # if State(self.view).settings.vi['hlsearch'] == False:
+        #     return
+
+        self.view.add_regions('vi_search', self.regions, 'comment', '',
+                              sublime.DRAW_NO_FILL)
+
+    def schedule_update(self, delay):
+        self.generation += 1
+        generation = self.generation
+        sublime.set_timeout(lambda: self._update_if_current(generation),
+                            delay)
+
+    def _update_if_current(self, generation):
+        if generation != self.generation:
+            return
+        self.update()
+        self.poll()
+
+    def poll(self):
+        """
+        Keeps the highlights in sync with the visible region.
+
+        Sublime Text doesn't tell plugins when a view scrolls, so we check
+        periodically while the highlights are active.
+        """
+        generation = self.generation
+
+        def check():
+            if generation != self.generation:
+                return
+            if self.view.window() is None:
+                destroy(self.view)
+                return
+            self.update()
+            self.poll()
+
+        sublime.set_timeout(check, POLL_INTERVAL)
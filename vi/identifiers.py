@@ -0,0 +1,174 @@
+"""
+Index of the identifiers in a view.
+
+*, # and gd look for whole-word occurrences of the identifier under the
+caret. Instead of scanning the buffer for each of them, we keep a map from
+identifiers to the sorted offsets where they occur. The map is built the
+first time it's needed and, after the buffer changes, only the part of the
+buffer that changed is scanned again.
+
+Identifiers are runs of letters, digits and underscores, like keywords with
+Vim's default 'iskeyword'.
+"""
+
+from bisect import bisect_left
+import re
+
+import sublime
+
+from Vintageous.vi.utils import changed_range
+
+
+# Stores IdentifierIndex instances indexed by view.id().
+_indexes = {}
+
+_RX_IDENTIFIER = re.compile(r'\w+')
+
+
+def destroy(view):
+    try:
+        del _indexes[view.id()]
+    except KeyError:
+        pass
+
+
+def is_identifier(text):
+    """
+    Returns `True` if @text is a single identifier.
+    """
+    return bool(text) and _RX_IDENTIFIER.match(text).end() == len(text)
+
+
+def get_index(view):
+    """
+    Returns the up-to-date `IdentifierIndex` of @view.
+    """
+    try:
+        index = _indexes[view.id()]
+    except KeyError:
+        index = IdentifierIndex(view)
+        _indexes[view.id()] = index
+    index.update()
+    return index
+
+
+def occurrences(view, word):
+    """
+    Returns the sorted offsets where the identifier @word occurs in @view.
+    """
+    return get_index(view).occurrences(word)
+
+
+def find_declaration(view, pt, globally=False):
+    """
+    Returns the first occurrence of the identifier at @pt in the top-level
+    block containing it or, if @globally is `True`, in the whole buffer. This
+    is where Vim's gd and gD look for declarations.
+
+    Returns `None` if there's no identifier at @pt.
+    """
+    index = get_index(view)
+    begin = _word_begin(index.text, pt)
+    end = _word_end(index.text, begin)
+    if begin == end:
+        return None
+
+    offsets = index.occurrences(index.text[begin:end])
+    start = 0 if globally else index.scope_start(begin)
+    return offsets[bisect_left(offsets, start)]
+
+
+class IdentifierIndex(object):
+    """
+    Map from identifiers in a view to the sorted offsets where they occur.
+    """
+
+    # Changes touching more than this fraction of the buffer cause the index
+    # to be built again from scratch.
+    max_update_ratio = 0.25
+
+    def __init__(self, view):
+        self.view = view
+        self.change_count = None
+        self.text = ''
+        self.words = {}
+
+    def occurrences(self, word):
+        return self.words.get(word, [])
+
+    def scope_start(self, pt):
+        """
+        Returns the start of the top-level block containing @pt: the closest
+        line at or before @pt that isn't blank and isn't indented.
+        """
+        start = self.text.rfind('\n', 0, pt) + 1
+        while start > 0 and self.text[start:start + 1] in ('', ' ', '\t',
+                                                           '\n'):
+            start = self.text.rfind('\n', 0, start - 1) + 1
+        return start
+
+    def update(self):
+        """
+        Brings the index up to date with the view's contents.
+        """
+        change_count = self.view.change_count()
+        if change_count == self.change_count:
+            return
+
+        text = self.view.substr(sublime.Region(0, self.view.size()))
+        is_new = self.change_count is None
+        self.change_count = change_count
+        if is_new:
+            self.rebuild(text)
+            return
+
+        a, old_b, new_b = changed_range(self.text, text)
+        if max(old_b, new_b) - a > len(text) * self.max_update_ratio:
+            self.rebuild(text)
+            return
+        self.replace(text, a, old_b, new_b)
+
+    def rebuild(self, text):
+        words = {}
+        for match in _RX_IDENTIFIER.finditer(text):
+            words.setdefault(match.group(), []).append(match.start())
+        self.words = words
+        self.text = text
+
+    def replace(self, text, a, old_b, new_b):
+        """
+        Updates the index after the text in [@a, @old_b) of the previous
+        contents was replaced with the text in [@a, @new_b) of @text.
+        """
+        # Identifiers touching the change may have changed too.
+        a = _word_begin(self.text, a)
+        old_b = _word_end(self.text, old_b)
+        new_b = old_b + (len(text) - len(self.text))
+        delta = new_b - old_b
+
+        for word in list(self.words):
+            offsets = self.words[word]
+            i = bisect_left(offsets, a)
+            if i == len(offsets):
+                continue
+            j = bisect_left(offsets, old_b, i)
+            offsets[i:] = [x + delta for x in offsets[j:]]
+            if not offsets:
+                del self.words[word]
+
+        for match in _RX_IDENTIFIER.finditer(text, a, new_b):
+            offsets = self.words.setdefault(match.group(), [])
+            offsets.insert(bisect_left(offsets, match.start()),
+                           match.start())
+        self.text = text
+
+
+def _word_begin(text, pt):
+    while pt > 0 and _RX_IDENTIFIER.match(text, pt - 1, pt):
+        pt -= 1
+    return pt
+
+
+def _word_end(text, pt):
+    match = _RX_IDENTIFIER.match(text, pt)
+    return match.end() if match else pt
@@ -0,0 +1,202 @@
+"""
+Incremental search for / and ?.
+
+Searching the whole buffer on the UI thread for every character typed into
+the input panel makes typing stutter in big buffers. Instead, we wait until
+the user pauses typing, look for a match in the visible region first and,
+failing that, search a copy of the buffer in the background.
+
+Every query is tagged with a generation number so that results arriving for
+stale queries are dropped.
+"""
+
+import re
+
+import sublime
+
+from Vintageous.vi.search import find_in_range
+from Vintageous.vi.search import find_wrapping
+from Vintageous.vi.search import literal_term
+from Vintageous.vi.search import reverse_find_wrapping
+from Vintageous.vi.search import Matches
+from Vintageous.vi.search import reverse_search
+from Vintageous.vi.utils import R
+
+
+class IncrementalSearch(object):
+    """
+    Searches for the queries typed into the / and ? input panels.
+
+    @on_found is called on the UI thread with the region of the match to
+    highlight, or `None` if there isn't any.
+    """
+
+    # Milliseconds to wait for more input before searching.
+    delay = 50
+
+    def __init__(self, view, on_found, forward=True):
+        self.view = view
+        self.on_found = on_found
+        self.forward = forward
+        self.generation = 0
+        self._text = None
+        self._change_count = None
+        # Matches indexed by (query, flags).
+        self._matches = {}
+
+    def cancel(self):
+        """
+        Drops any pending search.
+        """
+        self.generation += 1
+
+    def update(self, query, flags=0, count=1):
+        """
+        Schedules a search for @query starting at the first selection.
+        """
+        self.generation += 1
+        generation = self.generation
+        sel = self.view.sel()[0]
+        sublime.set_timeout(
+            lambda: self._run(generation, query, flags, sel, count),
+            self.delay)
+
+    def _run(self, generation, query, flags, sel, count):
+        if generation != self.generation:
+            return
+
+        if not query:
+            self.on_found(None)
+            return
+
+        hit = self._find_in_visible_region(query, flags, sel, count)
+        if hit:
+            self.on_found(hit)
+            return
+
+        pattern = self._compile(query, flags)
+        if pattern is None:
+            # Python doesn't understand this pattern; let Sublime Text deal
+            # with it.
+            self.on_found(self._find_in_view(query, flags, sel, count))
+            return
+
+        sublime.set_timeout_async(
+            lambda: self._search(generation, query, flags, pattern, sel, count),
+            0)
+
+    def _search(self, generation, query, flags, pattern, sel, count):
+        # Runs in the worker thread.
+        if generation != self.generation:
+            return
+
+        text = self._get_text()
+        matches = self.find_all(text, query, flags, pattern)
+        hit = self.pick(matches, sel, count, len(text))
+
+        sublime.set_timeout(lambda: self._deliver(generation, hit), 0)
+
+    def _deliver(self, generation, hit):
+        if generation == self.generation:
+            self.on_found(hit)
+
+    def _get_text(self):
+        change_count = self.view.change_count()
+        if self._change_count != change_count:
+            self._text = self.view.substr(R(0, self.view.size()))
+            self._change_count = change_count
+            self._matches = {}
+        return self._text
+
+    def _compile(self, query, flags):
+        re_flags = re.MULTILINE
+        if flags & sublime.IGNORECASE:
+            re_flags |= re.IGNORECASE
+
+        literal = self._literal(query, flags)
+        if literal is not None:
+            # Find overlapping matches too.
+            return re.compile('(?={0})'.format(re.escape(literal)), re_flags)
+
+        try:
+            return re.compile(query, re_flags)
+        except re.error:
+            return None
+
+    def _find_in_visible_region(self, query, flags, sel, count):
+        if count != 1:
+            return
+
+        visible = self.view.visible_region()
+        if self.forward:
+            start = sel.b + 1
+            if visible.contains(start):
+                return find_in_range(self.view, query, start, visible.b,
+                                     flags)
+        elif visible.contains(sel.b):
+            return reverse_search(self.view, query, visible.a, sel.b, flags)
+
+    def _find_in_view(self, query, flags, sel, count):
+        if self.forward:
+            return find_wrapping(self.view, term=query, start=sel.b + 1,
+                                 end=self.view.size(), flags=flags,
+                                 times=count)
+        return reverse_find_wrapping(self.view, term=query, start=0,
+                                     end=sel.b, flags=flags, times=count)
+
+    def find_all(self, text, query, flags, pattern):
+        """
+        Returns the `Matches` of @query in @text.
+
+        Results are cached. For literal queries, the matches of the longest
+        cached prefix of @query are used as candidates, so typing a query
+        one character at a time doesn't rescan the buffer every time.
+        """
+        literal = self._literal(query, flags)
+        if literal is not None:
+            key = (True, literal, flags)
+        else:
+            key = (False, query, flags)
+        try:
+            return self._matches[key]
+        except KeyError:
+            pass
+
+        if literal is not None:
+            candidates = self._prefix_matches(literal, flags)
+            if candidates is not None:
+                starts = [a for a in candidates.starts
+                          if pattern.match(text, a)]
+            else:
+                starts = [m.start() for m in pattern.finditer(text)]
+            matches = Matches(starts, [a + len(literal) for a in starts])
+        else:
+            found = [m.span() for m in pattern.finditer(text)]
+            matches = Matches([a for (a, b) in found], [b for (a, b) in found])
+
+        self._matches[key] = matches
+        return matches
+
+    def _literal(self, query, flags):
+        # Python's re module takes care of the case, so any plain string
+        # will do.
+        return literal_term(query, flags & ~sublime.IGNORECASE)
+
+    def _prefix_matches(self, literal, flags):
+        best = None
+        for key, matches in self._matches.items():
+            is_literal, cached_literal, cached_flags = key
+            if (is_literal and cached_flags == flags and
+                    literal.startswith(cached_literal) and
+                    (best is None or len(cached_literal) > len(best[0]))):
+                best = (cached_literal, matches)
+        return best[1] if best else None
+
+    def pick(self, matches, sel, count, size):
+        """
+        Returns the match that / (or ? if searching backwards) would jump
+        to from @sel, wrapping around the buffer.
+        """
+        if self.forward:
+            return matches.find_wrapping(sel.b + 1, size, sel.a, count)
+        return matches.reverse_find_wrapping(0, sel.b, sel.b, size, count)
@@ -0,0 +1,175 @@
+"""
+Index of the indentation of each line in a view.
+
+The indent text objects (ii, ai, aI) select blocks of lines indented at least
+as much as the current one. Instead of inspecting the buffer line by line, we
+keep the indentation width of every line, built in one pass the first time
+it's needed and, after the buffer changes, patched for the changed lines
+only.
+
+Widths are measured in columns, so tabs count up to the next tab stop.
+"""
+
+import sublime
+
+from Vintageous.vi.utils import changed_range
+
+
+# Stores IndentIndex instances indexed by view.id().
+_indexes = {}
+
+
+def destroy(view):
+    try:
+        del _indexes[view.id()]
+    except KeyError:
+        pass
+
+
+def get_index(view):
+    """
+    Returns the up-to-date `IndentIndex` of @view.
+    """
+    try:
+        index = _indexes[view.id()]
+    except KeyError:
+        index = IndentIndex(view)
+        _indexes[view.id()] = index
+    index.update()
+    return index
+
+
+def indentation_width(line, tab_size):
+    """
+    Returns the width in columns of @line's indentation, or `None` if @line
+    is blank.
+    """
+    stripped = line.lstrip(' \t')
+    if not stripped or stripped == '\r':
+        return None
+    indentation = line[:len(line) - len(stripped)]
+    if '\t' not in indentation:
+        return len(indentation)
+    return len(indentation.expandtabs(tab_size))
+
+
+class IndentIndex(object):
+    """
+    Indentation widths of the lines in a view, with `None` for blank lines.
+    """
+
+    # Changes touching more than this fraction of the buffer cause the index
+    # to be built again from scratch.
+    max_update_ratio = 0.25
+
+    def __init__(self, view):
+        self.view = view
+        self.change_count = None
+        self.tab_size = None
+        self.text = ''
+        self.widths = []
+
+    def update(self):
+        """
+        Brings the index up to date with the view's contents.
+        """
+        change_count = self.view.change_count()
+        tab_size = self.view.settings().get('tab_size', 4)
+        if change_count == self.change_count and tab_size == self.tab_size:
+            return
+
+        text = self.view.substr(sublime.Region(0, self.view.size()))
+        is_stale = (self.change_count is None or tab_size != self.tab_size)
+        self.change_count = change_count
+        if is_stale:
+            self.rebuild(text, tab_size)
+            return
+
+        a, old_b, new_b = changed_range(self.text, text)
+        if max(old_b, new_b) - a > len(text) * self.max_update_ratio:
+            self.rebuild(text, tab_size)
+            return
+        self.replace(text, a, old_b, new_b)
+
+    def rebuild(self, text, tab_size):
+        self.tab_size = tab_size
+        self.widths = [indentation_width(line, tab_size)
+                       for line in text.split('\n')]
+        self.text = text
+
+    def replace(self, text, a, old_b, new_b):
+        """
+        Updates the index after the text in [@a, @old_b) of the previous
+        contents was replaced with the text in [@a, @new_b) of @text.
+        """
+        first_row = self.text.count('\n', 0, a)
+        last_row = first_row + self.text.count('\n', a, old_b)
+
+        start = text.rfind('\n', 0, a) + 1
+        end = text.find('\n', new_b)
+        if end < 0:
+            end = len(text)
+
+        self.widths[first_row:last_row + 1] = [
+            indentation_width(line, self.tab_size)
+            for line in text[start:end].split('\n')]
+        self.text = text
+
+    def block(self, row, count=1, above=False, below=False):
+        """
+        Returns (first row, last row) of the block of lines indented at least
+        as much as @row, or `None` if the buffer is blank. Blank lines inside
+        the block are part of it. If @row is blank, the indentation of the
+        next non-blank line is used instead.
+
+        @count
+          Number of indentation levels to include, starting from @row's.
+        @above
+          Whether to include the line before the block.
+        @below
+          Whether to include the line after the block.
+        """
+        level_row = self._next_non_blank(row)
+        if level_row is None:
+            level_row = self._previous_non_blank(row)
+            if level_row is None:
+                return None
+
+        first, last = self._extend(level_row)
+        for i in range(count - 1):
+            header = self._previous_non_blank(first - 1)
+            if header is None:
+                break
+            first, last = self._extend(header)
+
+        if above:
+            header = self._previous_non_blank(first - 1)
+            if header is not None:
+                first = header
+        if below:
+            footer = self._next_non_blank(last + 1)
+            if footer is not None:
+                last = footer
+        return first, last
+
+    def _extend(self, row):
+        widths = self.widths
+        level = widths[row]
+        first = last = row
+        while first > 0 and (widths[first - 1] is None or
+                             widths[first - 1] >= level):
+            first -= 1
+        while last < len(widths) - 1 and (widths[last + 1] is None or
+                                          widths[last + 1] >= level):
+            last += 1
+        return self._next_non_blank(first), self._previous_non_blank(last)
+
+    def _next_non_blank(self, row):
+        for i in range(row, len(self.widths)):
+            if self.widths[i] is not None:
+                return i
+
+    def _previous_non_blank(self, row):
+        for i in range(row, -1, -1):
+            if self.widths[i] is not None:
+                return i
@@ -150,7 +150,7 @@ def vi_backtick(state):
 
 
 def vi_left_square_bracket(state):
-    p = parser_def(command=lambda x: x in '(){}',
+    p = parser_def(command=lambda x: x in '(){}[]mM',
                    interactive_command=None,
                    input_param=None,
                    on_done=None,
@@ -0,0 +1,389 @@
+"""
+Translation of Vim's regular expressions.
+
+Vim's pattern syntax differs from the one understood by Python's re module
+and by Sublime Text's regex engine. We translate Vim patterns into the
+subset of syntax common to both engines, so the same pattern finds the same
+matches whether it's used by a search, :substitute, :global or a range
+address.
+
+Translated and compiled patterns are kept in a small LRU cache, so repeating
+a search or substitution doesn't parse and compile the pattern again.
+
+Unsupported: look-around (\\@=, \\@!, etc.), \\zs and \\ze, and ~, which is
+matched literally.
+"""
+
+from collections import OrderedDict
+import re
+
+import sublime
+
+from Vintageous.vi.settings import get_option
+
+
+# Translated and compiled patterns, least recently used first.
+_cache = OrderedDict()
+
+# Entries kept in the cache before evicting the least recently used one.
+MAX_CACHED_PATTERNS = 64
+
+# Characters that can be operators, either on their own or escaped,
+# depending on the 'magic' level.
+_OPERATORS = '()|+?={@<>.*[~^$%'
+
+# Operators that don't need a backslash, indexed by 'magic' level.
+_PLAIN_OPERATORS = {
+    'v': _OPERATORS,
+    'm': '.*[~^$',
+    'M': '^$',
+    'V': '^',
+}
+
+# Characters that must be escaped to be matched literally by either engine.
+_SPECIAL = '.^$*+?{}[]\\|()'
+
+# Contents of the character classes, as (bracket expression, negated).
+_CLASSES = {
+    's': (' \\t', False),
+    'S': (' \\t', True),
+    'd': ('0-9', False),
+    'D': ('0-9', True),
+    'w': ('0-9A-Za-z_', False),
+    'W': ('0-9A-Za-z_', True),
+    'a': ('A-Za-z', False),
+    'A': ('A-Za-z', True),
+    'l': ('a-z', False),
+    'L': ('a-z', True),
+    'u': ('A-Z', False),
+    'U': ('A-Z', True),
+    'x': ('0-9A-Fa-f', False),
+    'X': ('0-9A-Fa-f', True),
+    'o': ('0-7', False),
+    'O': ('0-7', True),
+    'h': ('A-Za-z_', False),
+    'H': ('A-Za-z_', True),
+    'k': ('\\w', False),
+    'K': ('A-Za-z_', False),
+    'i': ('\\w', False),
+    'I': ('A-Za-z_', False),
+}
+
+# Contents of the POSIX character classes allowed in bracket expressions.
+_POSIX_CLASSES = {
+    'alnum': '0-9A-Za-z',
+    'alpha': 'A-Za-z',
+    'blank': ' \\t',
+    'digit': '0-9',
+    'lower': 'a-z',
+    'space': ' \\t\\n\\r\\f\\v',
+    'upper': 'A-Z',
+    'xdigit': '0-9A-Fa-f',
+    'punct': re.escape('!"#$%&\'()*+,-./:;<=>?@[\\]^_`{|}~'),
+}
+
+_ESCAPED_CHARS = {
+    'e': '\\x1b',
+    't': '\\t',
+    'r': '\\r',
+    'n': '\\n',
+    'b': '\\x08',
+}
+
+
+def get_options(view):
+    """
+    Returns the values of the 'magic' and 'ignorecase' options in @view.
+    """
+    magic = get_option(view, 'magic') not in (False, '0')
+    ignorecase = get_option(view, 'ignorecase') in (True, '1')
+    return magic, ignorecase
+
+
+def translate(pattern, magic=True):
+    """
+    Translates the Vim pattern @pattern.
+
+    Returns a tuple (translated pattern, case), where case is `True` if the
+    pattern contains \\c, `False` if it contains \\C, and `None` otherwise.
+
+    @pattern
+      Pattern in Vim's syntax.
+    @magic
+      Value of the 'magic' option.
+    """
+    return _cached(('translate', pattern, magic),
+                   lambda: _Translator(pattern, magic).translate())
+
+
+def to_sublime(pattern, magic=True, ignorecase=False):
+    """
+    Returns a tuple (pattern, flags) to search for the Vim pattern @pattern
+    with `view.find()` and friends.
+
+    @pattern
+      Pattern in Vim's syntax.
+    @magic
+      Value of the 'magic' option.
+    @ignorecase
+      Value of the 'ignorecase' option.
+    """
+    translated, case = translate(pattern, magic)
+    if case is None:
+        case = ignorecase
+    return translated, (sublime.IGNORECASE if case else 0)
+
+
+def compile_pattern(pattern, magic=True, ignorecase=False):
+    """
+    Returns the Vim pattern @pattern compiled with Python's re module.
+
+    Raises `ValueError` or `re.error` if the pattern is invalid.
+
+    @pattern
+      Pattern in Vim's syntax.
+    @magic
+      Value of the 'magic' option.
+    @ignorecase
+      Value of the 'ignorecase' option.
+    """
+    def compile_():
+        translated, flags = to_sublime(pattern, magic, ignorecase)
+        re_flags = re.MULTILINE
+        if flags & sublime.IGNORECASE:
+            re_flags |= re.IGNORECASE
+        return re.compile(translated, re_flags)
+
+    return _cached(('compile', pattern, magic, ignorecase), compile_)
+
+
+def _cached(key, f):
+    try:
+        value = _cache[key]
+        _cache.move_to_end(key)
+        return value
+    except KeyError:
+        pass
+
+    value = f()
+    _cache[key] = value
+    if len(_cache) > MAX_CACHED_PATTERNS:
+        _cache.popitem(last=False)
+    return value
+
+
+def _escape(c):
+    return '\\' + c if c in _SPECIAL else c
+
+
+class _Translator(object):
+    def __init__(self, pattern, magic=True):
+        self.pattern = pattern
+        self.mode = 'm' if magic else 'M'
+        self.case = None
+        self.pos = 0
+        self.out = []
+
+    def translate(self):
+        while self.pos < len(self.pattern):
+            c = self.next()
+            if c == '\\':
+                if self.pos == len(self.pattern):
+                    raise ValueError('trailing backslash in pattern')
+                c = self.next()
+                if c in _PLAIN_OPERATORS[self.mode]:
+                    self.emit(_escape(c))
+                elif c in _OPERATORS:
+                    self.operator(c)
+                else:
+                    self.escape(c)
+            elif c in _PLAIN_OPERATORS[self.mode]:
+                self.operator(c)
+            else:
+                self.emit(_escape(c))
+        return ''.join(self.out), self.case
+
+    def next(self):
+        c = self.pattern[self.pos]
+        self.pos += 1
+        return c
+
+    def peek(self, n=1):
+        return self.pattern[self.pos:self.pos + n]
+
+    def emit(self, text):
+        self.out.append(text)
+
+    def at_start(self):
+        return not self.out or self.out[-1] in ('(', '(?:', '|', '^')
+
+    def at_end(self):
+        rest = self.pattern[self.pos:]
+        if self.mode == 'v':
+            return rest == '' or rest[0] in '|)'
+        return rest == '' or rest[:2] in ('\\|', '\\)')
+
+    def operator(self, c):
+        if c in '()|':
+            self.emit(c)
+        elif c in '+?=':
+            self.emit('?' if c == '=' else c)
+        elif c == '*':
+            self.emit('\\*' if self.at_start() else '*')
+        elif c == '{':
+            self.brace()
+        elif c == '<':
+            self.emit('\\b(?=\\w)')
+        elif c == '>':
+            self.emit('\\b(?<=\\w)')
+        elif c == '.':
+            self.emit('.')
+        elif c == '[':
+            self.bracket()
+        elif c == '~':
+            self.emit('~')
+        elif c == '^':
+            self.emit('^' if self.at_start() else '\\^')
+        elif c == '$':
+            self.emit('$' if self.at_end() else '\\$')
+        elif c == '%':
+            self.percent()
+        else:
+            raise ValueError('unsupported operator in pattern: ' + c)
+
+    def brace(self):
+        end = self.pattern.find('}', self.pos)
+        if end == -1:
+            raise ValueError('missing } in pattern')
+        contents = self.pattern[self.pos:end]
+        self.pos = end + 1
+        if contents.endswith('\\'):
+            contents = contents[:-1]
+
+        match = re.match(r'^(-?)(\d*)(,?)(\d*)$', contents)
+        if not match:
+            raise ValueError('invalid \\{...} in pattern')
+        lazy, low, comma, high = match.groups()
+
+        if not comma:
+            quantifier = '{%s}' % low if low else '*'
+        elif not low and not high:
+            quantifier = '*'
+        else:
+            quantifier = '{%s,%s}' % (low or '0', high)
+        self.emit(quantifier + ('?' if lazy else ''))
+
+    def bracket(self, newline=False):
+        start = self.pos
+        parts = []
+        if self.peek() == '^':
+            parts.append('^')
+            self.pos += 1
+        if self.peek() == ']':
+            parts.append('\\]')
+            self.pos += 1
+
+        while self.pos < len(self.pattern):
+            c = self.next()
+            if c == ']':
+                # Like in Vim, only \_[] matches a newline character, even
+                # if the bracket is negated.
+                negated = parts[:1] == ['^']
+                if newline != negated:
+                    parts.append('\\n')
+                self.emit('[' + ''.join(parts) + ']')
+                return
+            if c == '[' and self.peek() == ':':
+                end = self.pattern.find(':]', self.pos)
+                name = self.pattern[self.pos + 1:end] if end != -1 else ''
+                if name in _POSIX_CLASSES:
+                    parts.append(_POSIX_CLASSES[name])
+                    self.pos = end + 2
+                    continue
+            if c == '\\' and self.pos < len(self.pattern):
+                d = self.next()
+                if d in '\\]^-':
+                    parts.append('\\' + d)
+                elif d in _ESCAPED_CHARS:
+                    parts.append(_ESCAPED_CHARS[d])
+                else:
+                    # Vim takes the backslash literally.
+                    parts.append('\\\\' + _escape(d))
+                continue
+            parts.append('\\' + c if c in '[\\' else c)
+
+        # Without a closing ], [ is taken literally.
+        self.pos = start
+        self.emit('\\[')
+
+    def percent(self):
+        if self.peek() == '(':
+            self.pos += 1
+            self.emit('(?:')
+            return
+
+        kind = self.peek()
+        digits = {'d': '0123456789', 'x': '0123456789abcdefABCDEF',
+                  'u': '0123456789abcdefABCDEF', 'o': '01234567'}
+        if kind in digits:
+            self.pos += 1
+            end = self.pos
+            while (end < len(self.pattern) and
+                   self.pattern[end] in digits[kind]):
+                end += 1
+            if end > self.pos:
+                base = {'d': 10, 'x': 16, 'u': 16, 'o': 8}[kind]
+                code = int(self.pattern[self.pos:end], base)
+                self.pos = end
+                self.emit(_escape(chr(code)))
+                return
+
+        raise ValueError('unsupported \\% item in pattern')
+
+    def escape(self, c):
+        if c in 'vmMV':
+            self.mode = c
+        elif c == 'c':
+            self.case = True
+        elif c == 'C':
+            if self.case is None:
+                self.case = False
+        elif c in _CLASSES:
+            contents, negated = _CLASSES[c]
+            if negated:
+                # Negated classes don't match a newline character either.
+                self.emit('[^' + contents + '\\n]')
+            else:
+                self.emit('[' + contents + ']')
+        elif c == '_':
+            self.newline_class()
+        elif c in _ESCAPED_CHARS:
+            self.emit(_ESCAPED_CHARS[c])
+        elif c in '123456789':
+            self.emit('\\' + c)
+        elif c.isalnum():
+            raise ValueError('unsupported item in pattern: \\' + c)
+        else:
+            self.emit(_escape(c))
+
+    def newline_class(self):
+        # \_x: like x, but also matches a newline character.
+        if self.pos == len(self.pattern):
+            raise ValueError('trailing \\_ in pattern')
+        c = self.next()
+        if c == '.':
+            self.emit('[\\s\\S]')
+        elif c == '^':
+            self.emit('^')
+        elif c == '$':
+            self.emit('$')
+        elif c == '[':
+            self.bracket(newline=True)
+        elif c in _CLASSES:
+            contents, negated = _CLASSES[c]
+            if negated:
+                self.emit('[^' + contents + ']')
+            else:
+                self.emit('[' + contents + '\\n]')
+        else:
+            raise ValueError('unsupported item in pattern: \\_' + c)
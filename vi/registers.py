@@ -1,6 +1,13 @@
 import sublime
 
+from collections import deque
 import itertools
+import mmap
+import tempfile
+
+from Vintageous.vi import clipboard
+from Vintageous.vi.utils import modes
+from Vintageous.vi.utils import read_regions
 
 
 REG_UNNAMED = '"'
@@ -23,18 +30,171 @@ REG_ALL = REG_SPECIAL + REG_VALID_NUMBERS + REG_VALID_NAMES
 # todo(guillermo): There are more.
 # todo(guillermo): "* and "+ don't do what they should in linux
 
+# Register values longer than this many characters are kept in temporary
+# files instead of in memory.
+SPILL_THRESHOLD = 1 << 20
+# Characters of register values kept in memory if the
+# 'vintageous_registers_memory_limit' setting isn't set. Beyond that, the
+# largest values are moved to temporary files.
+DEFAULT_MEMORY_LIMIT = 1 << 26
+
 
 def init_register_data():
     return {
         '0': None,
-        # init registers 1-9
-        '1-9': [None] * 9,
+        # init registers 1-9; deletes push values onto the left end.
+        '1-9': deque([None] * 9, maxlen=9),
     }
 
 
 # Stores register data.
 _REGISTER_DATA = init_register_data()
 
+# Characters of the values packed into memory since the registers were last
+# walked. Values dropped from registers since aren't subtracted, so this is
+# never less than the characters held in memory.
+_packed_size = 0
+
+
+class Block(list):
+    """
+    Register value yanked in visual block mode, like Vim's blockwise
+    registers: one fragment per row of the block.
+
+    @width
+      Number of columns spanned by the block.
+    """
+
+    def __init__(self, rows, width=None):
+        super().__init__(rows)
+        if width is None:
+            width = max([len(row) for row in self] or [0])
+        self.width = width
+
+
+class SpilledValue(object):
+    """
+    Register value stored in a memory-mapped temporary file. The value is
+    read back only when the register is used.
+    """
+
+    def __init__(self, values):
+        data = [v.encode('utf-8') for v in values]
+        self.lengths = [len(d) for d in data]
+        # Width of blockwise values, or `None`.
+        self.width = values.width if isinstance(values, Block) else None
+        # Size in characters.
+        self.size = sum(len(v) for v in values)
+        self._file = tempfile.TemporaryFile()
+        self._file.write(b''.join(data))
+        self._file.flush()
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def first(self):
+        """
+        Returns the first fragment without reading the others.
+        """
+        return self._map[0:self.lengths[0]].decode('utf-8')
+
+    def load(self):
+        values = []
+        pt = 0
+        for length in self.lengths:
+            values.append(self._map[pt:pt + length].decode('utf-8'))
+            pt += length
+        if self.width is not None:
+            return Block(values, self.width)
+        return values
+
+
+def _pack(values):
+    """
+    Returns @values in the form they are stored in registers.
+    """
+    global _packed_size
+    if isinstance(values, SpilledValue):
+        return values
+    values = _as_strings(values)
+    size = sum(len(v) for v in values)
+    if size > SPILL_THRESHOLD:
+        return SpilledValue(values)
+    _packed_size += size
+    return values
+
+
+def _as_strings(values):
+    if isinstance(values, Block):
+        return Block([str(v) for v in values], values.width)
+    return [str(v) for v in values]
+
+
+def _unpack(value):
+    if isinstance(value, SpilledValue):
+        return value.load()
+    return value
+
+
+def _stored_values():
+    """
+    Yields each value held in registers once, even if it's held in more than
+    one register.
+    """
+    seen = set()
+    for name, value in _REGISTER_DATA.items():
+        for v in (value if name == '1-9' else (value,)):
+            if v and id(v) not in seen:
+                seen.add(id(v))
+                yield v
+
+
+def memory_usage():
+    """
+    Returns (characters in memory, characters in temporary files) used by
+    register values.
+    """
+    in_memory = on_disk = 0
+    for value in _stored_values():
+        if isinstance(value, SpilledValue):
+            on_disk += value.size
+        else:
+            in_memory += sum(len(v) for v in value)
+    return in_memory, on_disk
+
+
+def enforce_memory_limit(limit):
+    """
+    Moves the largest register values held in memory to temporary files
+    until at most @limit characters are held in memory.
+    """
+    global _packed_size
+    sizes = {}
+    values = []
+    for value in _stored_values():
+        if not isinstance(value, SpilledValue):
+            sizes[id(value)] = sum(len(v) for v in value)
+            values.append(value)
+
+    total = sum(sizes.values())
+    _packed_size = total
+    if total <= limit:
+        return
+
+    spilled = {}
+    for value in sorted(values, key=lambda v: sizes[id(v)], reverse=True):
+        if total <= limit:
+            break
+        spilled[id(value)] = SpilledValue(value)
+        total -= sizes[id(value)]
+
+    for name, value in list(_REGISTER_DATA.items()):
+        if name == '1-9':
+            for i, v in enumerate(value):
+                if id(v) in spilled:
+                    value[i] = spilled[id(v)]
+        elif id(value) in spilled:
+            _REGISTER_DATA[name] = spilled[id(value)]
+    _packed_size = total
+
 
 # todo(guillermooo): Subclass dict properly.
 class Registers(object):
@@ -74,23 +234,31 @@ class Registers(object):
         # return Registers(instance.view, instance.settings)
 
     def _set_default_register(self, values):
-        assert isinstance(values, list)
-        # Coerce all values into strings.
-        values = [str(v) for v in values]
+        assert isinstance(values, (list, SpilledValue))
         # todo(guillermo): could be made a decorator.
-        _REGISTER_DATA[REG_UNNAMED] = values
+        _REGISTER_DATA[REG_UNNAMED] = _pack(values)
+
+    def _enforce_memory_limit(self):
+        limit = self.settings.view['vintageous_registers_memory_limit']
+        if limit is None:
+            limit = DEFAULT_MEMORY_LIMIT
+        # Only walk the registers once they may hold too much.
+        if _packed_size > limit:
+            enforce_memory_limit(limit)
 
     def _maybe_set_sys_clipboard(self, name, value):
         # We actually need to check whether the option is set to a bool; could
         # be any JSON type.
         if (name in REG_SYS_CLIPBOARD_ALL or
            self.settings.view['vintageous_use_sys_clipboard'] is True):
-                # Make sure Sublime Text does the right thing in the presence
-                # of multiple selections.
+                # Sublime Text's copy command keeps one fragment per
+                # selection, so pasting with as many carets pastes one each.
+                # It can't be deferred, as it copies the current selections.
                 if len(value) > 1:
                     self.view.run_command('copy')
+                    clipboard.reset()
                 else:
-                    sublime.set_clipboard(value[0])
+                    clipboard.set(value[0])
 
     def set(self, name, values):
         """
@@ -112,7 +280,7 @@ class Registers(object):
         assert isinstance(values, list), \
             "Register values must be inside a list."
         # Coerce all values into strings.
-        values = [str(v) for v in values]
+        values = _as_strings(values)
 
         # Special registers and invalid registers won't be set.
         if (not (name.isalpha() or name.isdigit() or
@@ -124,11 +292,13 @@ class Registers(object):
                     # raise Exception("Can only set a-z and 0-9 registers.")
                     return None
 
-        _REGISTER_DATA[name] = values
+        value = _pack(values)
+        _REGISTER_DATA[name] = value
 
         if name not in (REG_EXPRESSION,):
-            self._set_default_register(values)
+            self._set_default_register(value)
             self._maybe_set_sys_clipboard(name, values)
+        self._enforce_memory_limit()
 
     def append_to(self, name, suffixes):
         """
@@ -138,15 +308,23 @@ class Registers(object):
         assert name in "ABCDEFGHIJKLMNOPQRSTUVWXYZ", \
             "Can only append to A-Z registers."
 
-        existing_values = _REGISTER_DATA.get(name.lower(), '')
+        existing_values = _unpack(_REGISTER_DATA.get(name.lower())) or ''
         new_values = itertools.zip_longest(existing_values,
                                            suffixes, fillvalue='')
         new_values = [(prefix + suffix) for (prefix, suffix) in new_values]
-        _REGISTER_DATA[name.lower()] = new_values
-        self._set_default_register(new_values)
+        value = _pack(new_values)
+        _REGISTER_DATA[name.lower()] = value
+        self._set_default_register(value)
         self._maybe_set_sys_clipboard(name, new_values)
+        self._enforce_memory_limit()
 
     def get(self, name=REG_UNNAMED):
+        return _unpack(self._lookup(name))
+
+    def _lookup(self, name):
+        # Returns the value of a register as stored; values in temporary
+        # files aren't loaded.
+
         # We accept integers or strings a register names.
         name = str(name)
         assert len(str(name)) == 1, "Register names must be 1 char long."
@@ -160,7 +338,7 @@ class Registers(object):
             except AttributeError:
                 return ''
         elif name in REG_SYS_CLIPBOARD_ALL:
-            return [sublime.get_clipboard()]
+            return [clipboard.get()]
         elif ((name not in (REG_UNNAMED, REG_SMALL_DELETE)) and
                 (name in REG_SPECIAL)):
             return
@@ -168,7 +346,7 @@ class Registers(object):
         # clipboard.
         elif ((name == REG_UNNAMED) and
               (self.settings.view['vintageous_use_sys_clipboard'] is True)):
-            return [sublime.get_clipboard()]
+            return [clipboard.get()]
 
         # If the expression register holds a value and we're requesting the
         # unnamed register, return the expression register and clear it
@@ -190,58 +368,87 @@ class Registers(object):
             pass
 
     def yank(self, vi_cmd_data, register=None, operation='yank'):
+        can_yank = vi_cmd_data._can_yank
+        populates_small_delete = vi_cmd_data._populates_small_delete_register
+        if not (can_yank or populates_small_delete):
+            return
+
+        # Extract the text once; every register set below shares it.
+        fragments = self.get_selected_text(vi_cmd_data)
+        if self.settings.vi['mode'] == modes.VISUAL_BLOCK:
+            fragments = Block(fragments)
+        value = None
+
         # Populate registers if we have to.
-        if vi_cmd_data._can_yank:
+        if can_yank:
             if register and register != REG_UNNAMED:
-                self[register] = self.get_selected_text(vi_cmd_data)
+                self[register] = fragments
             else:
-                self[REG_UNNAMED] = self.get_selected_text(vi_cmd_data)
+                self[REG_UNNAMED] = fragments
+                value = _REGISTER_DATA[REG_UNNAMED]
                 # if yanking, the 0 register gets set
                 if operation == 'yank':
-                    _REGISTER_DATA['0'] = self.get_selected_text(vi_cmd_data)
+                    _REGISTER_DATA['0'] = value
                 # if chaning or deleting, the numbered registers get set
                 elif operation in ('change', 'delete'):
-                    text = self.get_selected_text(vi_cmd_data)
-                    # TODO: very inefficient
-                    _REGISTER_DATA['1-9'].insert(0, text)
-                    if len(_REGISTER_DATA['1-9']) > 10:
-                        _REGISTER_DATA['1-9'].pop()
+                    # The oldest value falls off the right end.
+                    _REGISTER_DATA['1-9'].appendleft(value)
                 else:
                     raise ValueError('unsupported operation: ' + operation)
 
-        # # XXX: Small register delete. Improve this implementation.
-        if vi_cmd_data._populates_small_delete_register:
-            is_same_line = (lambda r: self.view.line(r.begin()) ==
-                            self.view.line(r.end() - 1))
-            if all(is_same_line(x) for x in list(self.view.sel())):
-                self[REG_SMALL_DELETE] = self.get_selected_text(vi_cmd_data)
+        # Deletes within a line also go to the small delete register. The
+        # text of a selection spans one line if only its last character can
+        # be a newline.
+        if (populates_small_delete and
+                all('\n' not in f[:-1] for f in fragments)):
+            if value is None:
+                self[REG_SMALL_DELETE] = fragments
+            else:
+                _REGISTER_DATA[REG_SMALL_DELETE] = value
 
     def get_selected_text(self, vi_cmd_data):
         """Inspect settings and populate registers as needed.
         """
-        fragments = [self.view.substr(r) for r in list(self.view.sel())]
+        regions = list(self.view.sel())
+        fragments = read_regions(self.view, regions)
 
         # Add new line at EOF, but don't add too many new lines.
         if (vi_cmd_data._synthetize_new_line_at_eof and
            not vi_cmd_data._yanks_linewise):
             if (not fragments[-1].endswith('\n') and
                 # XXX: It appears regions can end beyond the buffer's EOF (?).
-               self.view.sel()[-1].b >= self.view.size()):
+               regions[-1].b >= self.view.size()):
                     fragments[-1] += '\n'
 
         if fragments and vi_cmd_data._yanks_linewise:
-            for i, f in enumerate(fragments):
-                # When should we add a newline character?
-                #  * always except when we have a non-\n-only string followed
-                # by a newline char.
-                if (not f.endswith('\n')) or f.endswith('\n\n'):
-                    fragments[i] = f + '\n'
+            # When should we add a newline character?
+            #  * always except when we have a non-\n-only string followed
+            # by a newline char.
+            fragments = [f if (f.endswith('\n') and not f.endswith('\n\n'))
+                         else f + '\n'
+                         for f in fragments]
         return fragments
 
     def to_dict(self):
         # XXX: Stopgap solution until we sublass from dict
         return {name: self.get(name) for name in REG_ALL}
 
+    def summarize(self):
+        """
+        Returns a list of (name, first fragment, number of fragments) for the
+        registers holding a value. Values in temporary files aren't loaded.
+        """
+        summaries = []
+        for name in REG_ALL:
+            value = self._lookup(name)
+            if not value:
+                continue
+            if isinstance(value, SpilledValue):
+                summaries.append((name, value.first(), len(value.lengths)))
+            else:
+                summaries.append((name, value[0], len(value)))
+        return summaries
+
     def __getitem__(self, key):
         return self.get(key)
 
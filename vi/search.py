@@ -1,10 +1,345 @@
 import sublime
 import sublime_plugin
 
+from bisect import bisect_left
+from bisect import bisect_right
 import re
 
+from Vintageous.vi import hlsearch
+from Vintageous.vi import identifiers
+from Vintageous.vi import regex
+from Vintageous.vi.snapshot import TextSnapshot
+
+
+# Stores (change_count, {(pattern, flags): Matches}) indexed by view.id().
+_match_indexes = {}
+
+# Patterns whose matches are cached per view before we start over.
+MAX_CACHED_PATTERNS = 16
+
+# Stores the TextSnapshot used by literal searches indexed by view.id().
+_snapshots = {}
+
+# Stores the generation of the search count shown indexed by view.id().
+_search_counts = {}
+
+# Largest count shown by the search count indicator; larger counts show as
+# '>N'. Overridden by the 'vintageous_max_search_count' setting.
+MAX_SEARCH_COUNT = 9999
+
+# Matches not cached yet are counted in the background in buffers larger than
+# this many characters.
+SYNC_SEARCH_COUNT_SIZE = 1 << 20
+
+# Characters with a special meaning in patterns.
+_REGEX_SPECIAL = '.^$*+?{}[]\\|()'
+
+
+def destroy(view):
+    _match_indexes.pop(view.id(), None)
+    _snapshots.pop(view.id(), None)
+    _search_counts.pop(view.id(), None)
+
+
+def literal_term(term, flags=0):
+    """
+    Returns the text that @term matches if it's a plain string, or `None` if
+    it needs a regex engine.
+
+    Searches for plain strings are served with `str.find()` and
+    `str.rfind()` over a snapshot of the buffer, which is much cheaper than
+    calling into Sublime Text's regex engine over and over.
+
+    @term
+      Search pattern in Sublime Text's syntax.
+    @flags
+      Sublime Text search flags.
+    """
+    if flags & sublime.LITERAL:
+        text = term
+    else:
+        chars = []
+        escaped = False
+        for c in term:
+            if escaped:
+                if c.isalnum():
+                    return None
+                chars.append(c)
+                escaped = False
+            elif c == '\\':
+                escaped = True
+            elif c in _REGEX_SPECIAL:
+                return None
+            else:
+                chars.append(c)
+        if escaped:
+            return None
+        text = ''.join(chars)
+
+    if not text:
+        return None
+    # Only texts without cased characters can ignore the case.
+    if (flags & sublime.IGNORECASE) and text.lower() != text.upper():
+        return None
+    return text
+
+
+def get_snapshot(view):
+    """
+    Returns a `TextSnapshot` of @view shared by literal searches until the
+    view's contents change.
+    """
+    snapshot = _snapshots.get(view.id())
+    if snapshot is None or not snapshot.is_valid():
+        snapshot = TextSnapshot(view)
+        _snapshots[view.id()] = snapshot
+    return snapshot
+
+
+def get_matches(view, pattern, flags=0):
+    """
+    Returns the `Matches` of @pattern in @view.
+
+    Matches are found with a single `view.find_all()` call and cached until
+    the view's contents change, so repeating a search (n, N, *, #) or
+    highlighting its matches doesn't scan the buffer again.
+
+    @view
+      Target view.
+    @pattern
+      Search pattern in Sublime Text's syntax.
+    @flags
+      Sublime Text search flags.
+    """
+    index = _get_index(view)
+    try:
+        return index[(pattern, flags)]
+    except KeyError:
+        pass
+
+    matches = _find_all(view, pattern, flags)
+    cache_matches(view, pattern, flags, matches)
+    return matches
+
+
+def get_cached_matches(view, pattern, flags=0):
+    """
+    Returns the cached `Matches` of @pattern in @view, or `None` if they
+    haven't been found yet.
+    """
+    return _get_index(view).get((pattern, flags))
+
+
+def _get_index(view):
+    change_count = view.change_count()
+    try:
+        cached_change_count, index = _match_indexes[view.id()]
+        if cached_change_count == change_count:
+            return index
+    except KeyError:
+        pass
+
+    index = {}
+    _match_indexes[view.id()] = (change_count, index)
+    return index
+
+
+def cache_matches(view, pattern, flags, matches):
+    """
+    Stores @matches as the `Matches` of @pattern in @view until the view's
+    contents change.
+    """
+    index = _get_index(view)
+    if len(index) >= MAX_CACHED_PATTERNS:
+        index.clear()
+    index[(pattern, flags)] = matches
+
+
+def _find_all(view, pattern, flags):
+    def find(pt):
+        return find_in_range(view, pattern, pt, view.size(), flags)
+
+    literal = literal_term(pattern, flags)
+    if literal is not None:
+        return _find_all_literal(view, literal, find)
+    regions = view.find_all(pattern, flags)
+    return Matches([r.a for r in regions], [r.b for r in regions], find)
+
+
+def _literal_match(pt, literal):
+    if pt != -1:
+        return sublime.Region(pt, pt + len(literal))
+
+
+def _find_all_literal(view, literal, find=None):
+    text = view.substr(sublime.Region(0, view.size()))
+    starts = []
+    size = len(literal)
+    i = text.find(literal)
+    while i != -1:
+        starts.append(i)
+        i = text.find(literal, i + size)
+    return Matches(starts, [a + size for a in starts], find)
+
+
+class Matches(object):
+    """
+    Sorted positions of the matches of a pattern in a buffer.
+
+    Matches don't overlap, like in Vim. Lookups are binary searches; their
+    results mirror those of `find_in_range()` and `reverse_search()`.
+    """
+
+    def __init__(self, starts, ends, find=None):
+        self.starts = starts
+        self.ends = ends
+        # Returns the first match starting at a given point or later. Used
+        # when a search starts inside a match, as there may be a match
+        # overlapping it.
+        self.find = find
+
+    def __len__(self):
+        return len(self.starts)
+
+    def regions(self):
+        return [sublime.Region(a, b) for (a, b) in zip(self.starts, self.ends)]
+
+    def first_after(self, start, end):
+        """
+        Returns the first match starting at @start or later, or `None` if it
+        doesn't end by @end.
+        """
+        i = bisect_left(self.starts, start)
+        if self.find and i > 0 and start < self.ends[i - 1]:
+            match = self.find(start)
+            if match and match.b <= end:
+                return match
+            return None
+        if i < len(self.starts) and self.ends[i] <= end:
+            return sublime.Region(self.starts[i], self.ends[i])
+
+    def last_before(self, start, end):
+        """
+        Returns the last match ending by @end, or `None` if it doesn't start
+        at @start or later.
+        """
+        i = self._last_index_before(start, end)
+        if i is not None:
+            return sublime.Region(self.starts[i], self.ends[i])
+
+    def _last_index_before(self, start, end):
+        i = bisect_right(self.ends, end) - 1
+        if i >= 0 and self.starts[i] >= start:
+            return i
+
+    def find_wrapping(self, start, end, wrap_end, times=1):
+        """
+        Like `find_wrapping()`. After wrapping around the end of the buffer,
+        the search stops at @wrap_end.
+        """
+        match = None
+        for x in range(times):
+            match = self.first_after(start, end)
+            if not match:
+                start, end = 0, wrap_end
+                match = self.first_after(start, end)
+                if not match:
+                    return
+            start = match.b
+        return match
+
+    def reverse_find_wrapping(self, start, end, wrap_start, size, times=1):
+        """
+        Like `reverse_find_wrapping()`. After wrapping around the beginning of
+        the buffer, the search stops at @wrap_start.
+        """
+        i = self._last_index_before(start, end)
+        if i is None and start <= wrap_start:
+            i = self._last_index_before(wrap_start, size)
+        if i is None:
+            return
+        # Each further step goes back one match, cycling through all of them
+        # once it wraps around.
+        i = (i - (times - 1)) % len(self.starts)
+        return sublime.Region(self.starts[i], self.ends[i])
+
+
+def show_search_count(view, pattern, flags, pt):
+    """
+    Shows in the status bar which match of @pattern starts at @pt, out of
+    how many, like Vim's searchcount(): [3/1200].
+
+    Moving between matches only takes a lookup in the cached matches.
+    Counting matches that aren't cached yet in a big buffer happens in the
+    background.
+
+    @view
+      Target view.
+    @pattern
+      Search pattern in Sublime Text's syntax.
+    @flags
+      Sublime Text search flags.
+    @pt
+      Start of the current match.
+    """
+    generation = _search_counts.get(view.id(), 0) + 1
+    _search_counts[view.id()] = generation
+    max_count = view.settings().get('vintageous_max_search_count',
+                                    MAX_SEARCH_COUNT)
+
+    matches = get_cached_matches(view, pattern, flags)
+    if matches is None and view.size() <= SYNC_SEARCH_COUNT_SIZE:
+        matches = get_matches(view, pattern, flags)
+    if matches is not None:
+        view.set_status('vim-search-count',
+                        format_search_count(matches, pt, max_count))
+        return
+
+    view.set_status('vim-search-count', '[?/?]')
+    change_count = view.change_count()
+
+    def count():
+        # Runs in the worker thread.
+        matches = _find_all(view, pattern, flags)
+        sublime.set_timeout(lambda: deliver(matches), 0)
+
+    def deliver(matches):
+        if (_search_counts.get(view.id()) != generation or
+                view.change_count() != change_count):
+            return
+        cache_matches(view, pattern, flags, matches)
+        view.set_status('vim-search-count',
+                        format_search_count(matches, pt, max_count))
+
+    sublime.set_timeout_async(count, 0)
+
+
+def clear_search_count(view):
+    """
+    Removes the search count indicator from the status bar.
+    """
+    _search_counts[view.id()] = _search_counts.get(view.id(), 0) + 1
+    view.erase_status('vim-search-count')
+
+
+def format_search_count(matches, pt, max_count=MAX_SEARCH_COUNT):
+    """
+    Returns the search count indicator for the match of @matches starting at
+    @pt, like [3/1200]. Counts over @max_count show as '>@max_count'.
+    """
+    def fmt(n):
+        return '>{0}'.format(max_count) if n > max_count else str(n)
+
+    index = bisect_right(matches.starts, pt)
+    return '[{0}/{1}]'.format(fmt(index), fmt(len(matches)))
+
 
 def find_in_range(view, term, start, end, flags=0):
+    literal = literal_term(term, flags)
+    if literal is not None:
+        pt = get_snapshot(view).find(literal, start, end)
+        return _literal_match(pt, literal)
+
     found = view.find(term, start, flags)
     if found and found.b <= end:
         return found
@@ -69,6 +404,11 @@ def reverse_find_wrapping(view, term, start, end, flags=0, times=1):
 
 
 def find_last_in_range(view, term, start, end, flags=0):
+    literal = literal_term(term, flags)
+    if literal is not None:
+        pt = get_snapshot(view).rfind(literal, start, end)
+        return _literal_match(pt, literal)
+
     found = find_in_range(view, term, start, end, flags)
     last_found = found
     while found:
@@ -80,42 +420,77 @@ def find_last_in_range(view, term, start, end, flags=0):
     return last_found
 
 
-# reverse search
-def reverse_search(view, term, start, end, flags=0):
-    assert isinstance(start, int) or start is None
-    assert isinstance(end, int) or end is None
-
-    start = start if (start is not None) else 0
-    end = end if (end is not None) else view.size()
+# Escaped letters that mean the same to Python's re module as they do to
+# Sublime Text's regex engine, and that can't match a newline character.
+_LINE_SAFE_ESCAPES = 'bBdtw'
 
-    if start < 0 or end > view.size():
-        return None
+# Compiled line patterns indexed by (term, flags). None means the term can't
+# be searched line by line.
+_line_patterns = {}
 
-    lo_line = view.full_line(start)
-    hi_line = view.full_line(end)
-
-    while True:
-        low_row, hi_row = view.rowcol(lo_line.a)[0], view.rowcol(hi_line.a)[0]
-        middle_row = (low_row + hi_row) // 2
 
-        middle_line = view.full_line(view.text_point(middle_row, 0))
+def compile_line_pattern(term, flags=0):
+    """
+    Compiles @term with Python's re module if that's guaranteed to find the
+    same matches as Sublime Text, and no match can span multiple lines.
+    Returns `None` otherwise.
 
-        lo_region = sublime.Region(lo_line.a, middle_line.b)
-        hi_region = sublime.Region(middle_line.b, min(hi_line.b, end))
-
-        if find_in_range(view, term, hi_region.a, hi_region.b, flags):
-            lo_line = view.full_line(middle_line.b)
-        elif find_in_range(view, term, lo_region.a, lo_region.b, flags):
-            hi_line = view.full_line(middle_line.a)
-        else:
-            return None
-
-        if lo_line == hi_line:
-            # we found the line we were looking for, now extract the match.
-            return find_last_in_range(view, term, hi_line.a, min(hi_line.b, end), flags)
+    @term
+      Search pattern in Sublime Text's syntax.
+    @flags
+      Sublime Text search flags.
+    """
+    try:
+        return _line_patterns[(term, flags)]
+    except KeyError:
+        pass
+
+    re_flags = re.MULTILINE
+    if flags & sublime.IGNORECASE:
+        re_flags |= re.IGNORECASE
+
+    pattern = None
+    if flags & sublime.LITERAL:
+        if '\n' not in term:
+            pattern = re.compile(re.escape(term), re_flags)
+    elif _is_line_safe(term):
+        try:
+            pattern = re.compile(term, re_flags)
+        except re.error:
+            pass
+
+    _line_patterns[(term, flags)] = pattern
+    return pattern
+
+
+def _is_line_safe(term):
+    if '\n' in term or '[^' in term or '[:' in term:
+        return False
+
+    escaped = False
+    for c in term:
+        if escaped:
+            if c.isalnum() and c not in _LINE_SAFE_ESCAPES:
+                return False
+            # Word boundaries and buffer anchors in Sublime Text.
+            if c in '<>`\'':
+                return False
+            escaped = False
+        elif c == '\\':
+            escaped = True
+    return not escaped
 
 
-def reverse_search_by_pt(view, term, start, end, flags=0):
+def reverse_search(view, term, start, end, flags=0):
+    """
+    Returns the last match of @term in the range [@start, @end], or `None`.
+
+    The text is scanned backwards from @end in growing chunks, so the
+    search stops as soon as it finds the closest match. Patterns that may
+    span multiple lines, or that Python doesn't understand like Sublime
+    Text does, are looked up in the matches Sublime Text's engine finds in
+    the whole buffer instead, which are cached.
+    """
     assert isinstance(start, int) or start is None
     assert isinstance(end, int) or end is None
 
@@ -125,28 +500,47 @@ def reverse_search_by_pt(view, term, start, end, flags=0):
     if start < 0 or end > view.size():
         return None
 
-    lo_line = view.full_line(start)
-    hi_line = view.full_line(end)
+    literal = literal_term(term, flags)
+    if literal is not None:
+        pt = get_snapshot(view).rfind(literal, start, end)
+        return _literal_match(pt, literal)
 
-    while True:
-        low_row, hi_row = view.rowcol(lo_line.a)[0], view.rowcol(hi_line.a)[0]
-        middle_row = (low_row + hi_row) // 2
+    pattern = compile_line_pattern(term, flags)
+    if pattern is None:
+        return get_matches(view, term, flags).last_before(start, end)
 
-        middle_line = view.full_line(view.text_point(middle_row, 0))
+    text = TextSnapshot(view)
+    # Each chunk looks for matches starting before @hi; the first one also
+    # accepts empty matches at @end.
+    hi = end + 1
+    chunk_size = 1 << 12
+    while True:
+        lo = view.line(max(hi - chunk_size, start)).a
+        # Include the preceding newline so that lookbehinds work, and read up
+        # to the end of the line so that anchors like $ work.
+        offset = max(lo - 1, 0)
+        chunk = text.substr(offset, view.line(min(hi, end)).b)
+
+        last_match = None
+        for match in pattern.finditer(chunk, lo - offset):
+            a, b = offset + match.start(), offset + match.end()
+            # Matches from @hi on belong to the chunk scanned before.
+            if a >= hi or b > end:
+                break
+            if a >= start:
+                last_match = (a, b)
+
+        if last_match:
+            return sublime.Region(*last_match)
+        if lo <= start:
+            return None
 
-        lo_region = sublime.Region(lo_line.a, middle_line.b)
-        hi_region = sublime.Region(middle_line.b, min(hi_line.b, end))
+        hi = lo
+        chunk_size = min(chunk_size << 1, 1 << 20)
 
-        if find_in_range(view, term, hi_region.a, hi_region.b, flags):
-            lo_line = view.full_line(middle_line.b)
-        elif find_in_range(view, term, lo_region.a, lo_region.b, flags):
-            hi_line = view.full_line(middle_line.a)
-        else:
-            return None
 
-        if lo_line == hi_line:
-            # we found the line we were looking for, now extract the match.
-            return find_last_in_range(view, term, max(hi_line.a, start), min(hi_line.b, end), flags)
+def reverse_search_by_pt(view, term, start, end, flags=0):
+    return reverse_search(view, term, start, end, flags)
 
 
 # TODO: Test me.
@@ -154,34 +548,31 @@ class BufferSearchBase(sublime_plugin.TextCommand):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
-    def calculate_flags(self):
-        # TODO: Implement smartcase?
-        flags = 0
-        if self.view.settings().get('vintageous_magic') == False:
-             flags |= sublime.LITERAL
-
-        if self.view.settings().get('vintageous_ignorecase') == True:
-            flags |= sublime.IGNORECASE
+    def translate(self, query):
+        """
+        Returns a tuple (pattern, flags) to search for the Vim pattern
+        @query, honoring the 'magic' and 'ignorecase' options.
+        """
+        return regex.to_sublime(query, *regex.get_options(self.view))
 
-        return flags
+    def calculate_flags(self, query=''):
+        # TODO: Implement smartcase?
+        return self.translate(query)[1]
 
     def build_pattern(self, query):
-        return query
+        return self.translate(query)[0]
 
-    def hilite(self, query):
-        flags = self.calculate_flags()
-        regs = self.view.find_all(self.build_pattern(query), flags)
+    def find_matches(self, query):
+        return get_matches(self.view, self.build_pattern(query),
+                           self.calculate_flags(query))
 
-        if not regs:
-            self.view.erase_regions('vi_search')
-            return
-
-        # TODO: Re-enable this.
-        # if State(self.view).settings.vi['hlsearch'] == False:
-        #     return
+    def hilite(self, query):
+        hlsearch.highlight(self.view, self.build_pattern(query),
+                           self.calculate_flags(query))
 
-        self.view.add_regions('vi_search', regs, 'comment', '',
-                              sublime.DRAW_NO_FILL)
+    def display_search_count(self, query, match):
+        show_search_count(self.view, self.build_pattern(query),
+                          self.calculate_flags(query), match.a)
 
 
 # TODO: Test me.
@@ -189,7 +580,7 @@ class ExactWordBufferSearchBase(BufferSearchBase):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
-    def calculate_flags(self):
+    def calculate_flags(self, query=''):
         if self.view.settings().get('vintageous_ignorecase') == True:
             return sublime.IGNORECASE
         return 0
@@ -201,3 +592,17 @@ class ExactWordBufferSearchBase(BufferSearchBase):
 
     def build_pattern(self, query):
         return r'\b{0}\b'.format(re.escape(query))
+
+    def find_matches(self, query):
+        flags = self.calculate_flags(query)
+        if flags or not identifiers.is_identifier(query):
+            return super().find_matches(query)
+
+        # Look the identifier up instead of scanning the buffer.
+        pattern = self.build_pattern(query)
+        matches = get_cached_matches(self.view, pattern, flags)
+        if matches is None:
+            starts = list(identifiers.occurrences(self.view, query))
+            matches = Matches(starts, [a + len(query) for a in starts])
+            cache_matches(self.view, pattern, flags, matches)
+        return matches
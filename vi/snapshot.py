@@ -0,0 +1,131 @@
+import sublime
+
+
+class TextSnapshot(object):
+    """
+    Read-only copy of a view's text shared by commands that need to inspect
+    the buffer many times in a row.
+
+    Text is fetched from the view lazily in fixed-size chunks, so that a
+    command only pays for the parts of the buffer it actually reads. The
+    snapshot isn't updated if the view changes; check .change_count to know
+    whether it's still valid.
+
+    Positions outside the buffer behave as in `view.substr()`: reading them
+    yields '\\x00'.
+    """
+
+    chunk_size = 1 << 16
+
+    def __init__(self, view):
+        self.view = view
+        self.size = view.size()
+        self.change_count = view.change_count()
+        self._chunks = {}
+
+    def __len__(self):
+        return self.size
+
+    def is_valid(self):
+        return self.change_count == self.view.change_count()
+
+    def _chunk(self, i):
+        try:
+            return self._chunks[i]
+        except KeyError:
+            start = i * self.chunk_size
+            end = min(start + self.chunk_size, self.size)
+            text = self.view.substr(sublime.Region(start, end))
+            self._chunks[i] = text
+            return text
+
+    def substr(self, a, b=None):
+        """
+        Returns the text in [@a, @b), or the character at @a if @b is None.
+        """
+        if b is None:
+            return self.char(a)
+
+        a, b = max(min(a, b), 0), min(max(a, b), self.size)
+        if a >= b:
+            return ''
+
+        first, last = a // self.chunk_size, (b - 1) // self.chunk_size
+        if first == last:
+            offset = first * self.chunk_size
+            return self._chunk(first)[a - offset:b - offset]
+
+        parts = []
+        for i in range(first, last + 1):
+            offset = i * self.chunk_size
+            parts.append(self._chunk(i)[max(a - offset, 0):b - offset])
+        return ''.join(parts)
+
+    def char(self, pt):
+        if pt < 0 or pt >= self.size:
+            return '\x00'
+        i = pt // self.chunk_size
+        return self._chunk(i)[pt - i * self.chunk_size]
+
+    def find(self, sub, start=0, end=None):
+        """
+        Returns the lowest position in [@start, @end) where @sub is found
+        entirely, or -1.
+        """
+        end = self.size if end is None else min(end, self.size)
+        start = max(start, 0)
+        overlap = max(len(sub) - 1, 0)
+        pos = start
+        while pos < end:
+            stop = min((pos // self.chunk_size + 1) * self.chunk_size, end)
+            window = self.substr(pos, min(stop + overlap, end))
+            i = window.find(sub)
+            if i != -1:
+                return pos + i
+            pos = stop
+        return -1
+
+    def rfind(self, sub, start=0, end=None):
+        """
+        Returns the highest position in [@start, @end) where @sub is found
+        entirely, or -1.
+        """
+        end = self.size if end is None else min(end, self.size)
+        start = max(start, 0)
+        overlap = max(len(sub) - 1, 0)
+        pos = end
+        while pos > start:
+            begin = max(((pos - 1) // self.chunk_size) * self.chunk_size, start)
+            window = self.substr(begin, min(pos + overlap, end))
+            i = window.rfind(sub)
+            if i != -1:
+                return begin + i
+            pos = begin
+        return -1
+
+    def line_begin(self, pt):
+        """
+        Returns the position where the line containing @pt begins.
+        """
+        pt = max(min(pt, self.size), 0)
+        start = max(pt - self.chunk_size, 0)
+        nl = self.rfind('\n', start, pt)
+        if nl != -1 or start == 0:
+            return nl + 1
+        # Don't read long lines in full; the view knows where they begin.
+        return self.view.line(pt).a
+
+    def line_end(self, pt):
+        """
+        Returns the position where the line containing @pt ends, excluding
+        the newline character.
+        """
+        pt = max(min(pt, self.size), 0)
+        end = min(pt + self.chunk_size, self.size)
+        nl = self.find('\n', pt, end)
+        if nl != -1:
+            return nl
+        if end == self.size:
+            return self.size
+        # Don't read long lines in full; the view knows where they end.
+        return self.view.line(pt).b
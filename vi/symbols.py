@@ -0,0 +1,257 @@
+"""
+Index of the symbols (functions, classes...) defined in a view.
+
+[[, ]], [m, ]m and the function and class text objects need the extent of
+each definition, but Sublime Text only reports where symbol names are. The
+extents are derived from indentation: a definition spans its first line and
+the indented lines after it, plus a closing line at its own indentation
+level that starts with a closing bracket or 'end', as in C-like languages
+and Ruby.
+
+The index is built from `view.symbols()` the first time it's needed after
+the buffer changes.
+"""
+
+from bisect import bisect_left
+from bisect import bisect_right
+import re
+
+import sublime
+
+
+# Stores SymbolIndex instances indexed by view.id().
+_indexes = {}
+
+FUNCTION = 'function'
+CLASS = 'class'
+
+_RX_CLOSING_LINE = re.compile(r'[\])}]|end\s*(?:$|#|--)')
+# Characters ending the last line of a definition's header, before its body.
+_HEADER_ENDS = ('{', ':')
+# Lines inspected after the first line of a definition looking for the end of
+# its header.
+MAX_HEADER_LINES = 20
+
+
+def destroy(view):
+    try:
+        del _indexes[view.id()]
+    except KeyError:
+        pass
+
+
+def get_index(view):
+    """
+    Returns the up-to-date `SymbolIndex` of @view.
+    """
+    change_count = view.change_count()
+    try:
+        index = _indexes[view.id()]
+        if index.change_count == change_count:
+            return index
+    except KeyError:
+        pass
+
+    symbols = []
+    for region, name in view.symbols():
+        scope = view.scope_name(region.a)
+        if 'entity.name.class' in scope or 'entity.name.type' in scope:
+            kind = CLASS
+        elif 'entity.name.function' in scope:
+            kind = FUNCTION
+        else:
+            kind = None
+        symbols.append((region.a, name, kind))
+
+    index = SymbolIndex(view.substr(sublime.Region(0, view.size())), symbols)
+    index.change_count = change_count
+    _indexes[view.id()] = index
+    return index
+
+
+class Symbol(object):
+    """
+    Definition of a symbol.
+
+    @name_pt
+      Start of the symbol's name.
+    @start
+      First non-blank character of the definition's first line.
+    @end
+      First non-blank character of the definition's last line.
+    @region
+      Full lines spanned by the definition.
+    @inner
+      Full lines of the definition's body, or `None` if the definition takes
+      up a single line.
+    """
+
+    def __init__(self, name, kind, name_pt):
+        self.name = name
+        self.kind = kind
+        self.name_pt = name_pt
+        self.start = None
+        self.end = None
+        self.region = None
+        self.inner = None
+        self.parent = None
+        self.depth = 0
+
+    def __repr__(self):
+        return '<Symbol {0} {1}>'.format(self.name, self.region)
+
+
+class SymbolIndex(object):
+    """
+    Symbols of a view sorted by position, with their extents.
+    """
+
+    def __init__(self, text, symbols):
+        """
+        @text
+          Contents of the view.
+        @symbols
+          Iterable of tuples (name position, name, kind).
+        """
+        self.change_count = None
+        self.symbols = []
+        self.build(text, symbols)
+
+        self._starts = [s.start for s in self.symbols]
+        self._region_starts = [s.region.a for s in self.symbols]
+        self._ends = sorted(s.end for s in self.symbols)
+        top_level = [s for s in self.symbols if s.depth == 0]
+        self._top_starts = [s.start for s in top_level]
+        self._top_ends = sorted(s.end for s in top_level)
+
+    def build(self, text, symbols):
+        lines = text.split('\n')
+        line_starts = []
+        pt = 0
+        for line in lines:
+            line_starts.append(pt)
+            pt += len(line) + 1
+
+        # Symbols by row. Only the first symbol in a line is kept.
+        by_row = {}
+        for name_pt, name, kind in sorted(symbols):
+            row = bisect_right(line_starts, name_pt) - 1
+            by_row.setdefault(row, Symbol(name, kind, name_pt))
+
+        def indentation(row):
+            line = lines[row]
+            return len(line) - len(line.lstrip())
+
+        def close(symbol, first_row, last_row):
+            symbol.start = line_starts[first_row] + indentation(first_row)
+            symbol.end = line_starts[last_row] + indentation(last_row)
+            symbol.region = sublime.Region(line_starts[first_row],
+                                           full_line_end(last_row))
+
+            header_row = first_row
+            for row in range(first_row, min(last_row, first_row +
+                                            MAX_HEADER_LINES)):
+                if lines[row].rstrip().endswith(_HEADER_ENDS):
+                    header_row = row
+                    break
+
+            body_last_row = last_row
+            if (body_last_row > header_row and
+                    _RX_CLOSING_LINE.match(lines[last_row].lstrip())):
+                body_last_row -= 1
+            if body_last_row > header_row:
+                symbol.inner = sublime.Region(line_starts[header_row + 1],
+                                              full_line_end(body_last_row))
+
+        def full_line_end(row):
+            return min(line_starts[row] + len(lines[row]) + 1, len(text))
+
+        # Stack of (symbol, first row, indentation) for open definitions.
+        stack = []
+        last_non_blank = 0
+        for row, line in enumerate(lines):
+            stripped = line.lstrip()
+            if not stripped:
+                continue
+
+            indent = len(line) - len(stripped)
+            closing = _RX_CLOSING_LINE.match(stripped)
+            # An opening brace in a line of its own belongs to the header
+            # before it.
+            while (stack and indent <= stack[-1][2] and
+                    not stripped.startswith('{')):
+                symbol, first_row, symbol_indent = stack.pop()
+                if closing and indent == symbol_indent:
+                    close(symbol, first_row, row)
+                    closing = None
+                else:
+                    close(symbol, first_row, last_non_blank)
+
+            if row in by_row:
+                symbol = by_row[row]
+                if stack:
+                    symbol.parent = stack[-1][0]
+                    symbol.depth = symbol.parent.depth + 1
+                stack.append((symbol, row, indent))
+                self.symbols.append(symbol)
+            last_non_blank = row
+
+        while stack:
+            symbol, first_row, _ = stack.pop()
+            close(symbol, first_row, last_non_blank)
+
+        self.symbols.sort(key=lambda s: s.start)
+
+    def containing(self, pt, kind=None, count=1):
+        """
+        Returns the @count-th innermost symbol of type @kind whose definition
+        contains @pt, or `None`.
+        """
+        i = bisect_right(self._region_starts, pt) - 1
+        symbol = self.symbols[i] if i >= 0 else None
+        # Definitions starting before pt either contain it or are nested in
+        # a definition containing it.
+        while symbol and not symbol.region.a <= pt < symbol.region.b:
+            symbol = symbol.parent
+
+        while symbol:
+            if kind is None or symbol.kind == kind:
+                count -= 1
+                if count == 0:
+                    return symbol
+            symbol = symbol.parent
+        return None
+
+    def find(self, name):
+        """
+        Returns the first symbol called @name, or `None`.
+        """
+        for symbol in self.symbols:
+            if symbol.name == name:
+                return symbol
+
+    def next_start(self, pt, count=1, top_level=False):
+        starts = self._top_starts if top_level else self._starts
+        return _nth_after(starts, pt, count)
+
+    def previous_start(self, pt, count=1, top_level=False):
+        starts = self._top_starts if top_level else self._starts
+        return _nth_before(starts, pt, count)
+
+    def next_end(self, pt, count=1, top_level=False):
+        ends = self._top_ends if top_level else self._ends
+        return _nth_after(ends, pt, count)
+
+    def previous_end(self, pt, count=1, top_level=False):
+        ends = self._top_ends if top_level else self._ends
+        return _nth_before(ends, pt, count)
+
+
+def _nth_after(points, pt, count):
+    i = bisect_right(points, pt) + count - 1
+    return points[i] if i < len(points) else None
+
+
+def _nth_before(points, pt, count):
+    i = bisect_left(points, pt) - count
+    return points[i] if i >= 0 else None
@@ -0,0 +1,182 @@
+"""
+Tree of the HTML/XML elements in a view.
+
+it, at and % on tags need to pair start tags with their end tags. Instead of
+searching back and forth through the buffer with regexes, the buffer is
+tokenized once into a list of elements, which is cached until the buffer
+changes.
+
+Unclosed elements (like <br> or <li> without </li>) and stray end tags are
+ignored. Comments are skipped, and so is the content of <script> and
+<style> elements.
+"""
+
+from bisect import bisect_right
+import re
+
+import sublime
+
+
+# Stores TagTree instances indexed by view.id().
+_trees = {}
+
+_ATTRIBUTES = r'''(?:[^>"']|"[^"]*"|'[^']*')*'''
+
+_RX_TOKEN = re.compile(r'''
+    <!--.*?(?:-->|\Z)
+    |
+    # The content of <script> and <style> isn't markup, so it's consumed along
+    # with the start tag.
+    <(?P<raw>script|style)(?=[\s/>])(?P<raw_attrs>{0})>
+    .*?(?=</(?P=raw)\b|\Z)
+    |
+    <(?P<end>/?)(?P<name>[0-9A-Za-z][0-9A-Za-z:._-]*)(?P<attrs>{0})(?:>|\Z)
+    '''.format(_ATTRIBUTES), re.DOTALL | re.IGNORECASE | re.VERBOSE)
+
+
+def destroy(view):
+    try:
+        del _trees[view.id()]
+    except KeyError:
+        pass
+
+
+def get_tree(view):
+    """
+    Returns the up-to-date `TagTree` of @view.
+    """
+    change_count = view.change_count()
+    try:
+        tree = _trees[view.id()]
+        if tree.change_count == change_count:
+            return tree
+    except KeyError:
+        pass
+
+    tree = TagTree(view.substr(sublime.Region(0, view.size())))
+    tree.change_count = change_count
+    _trees[view.id()] = tree
+    return tree
+
+
+class Element(object):
+    """
+    Element delimited by a start tag and an end tag.
+
+    @start
+      Region of the start tag.
+    @end
+      Region of the end tag.
+    """
+
+    def __init__(self, name, start, end):
+        self.name = name
+        self.start = start
+        self.end = end
+        self.parent = None
+
+    def __repr__(self):
+        return '<Element {0} {1} {2}>'.format(self.name, self.start, self.end)
+
+    def ancestor(self, count):
+        """
+        Returns the element @count - 1 levels above this one, or `None`.
+        """
+        element = self
+        for i in range(count - 1):
+            element = element.parent
+            if element is None:
+                break
+        return element
+
+
+class TagTree(object):
+    """
+    Elements of a document sorted by the position of their start tags.
+    """
+
+    def __init__(self, text):
+        self.change_count = None
+        self.elements = []
+        self._starts = []
+        self._by_end = []
+        self._ends = []
+        self.build(text)
+
+    def build(self, text):
+        elements = []
+        # Stack of (key, name, begin, end) for start tags without an end tag
+        # yet.
+        stack = []
+        for match in _RX_TOKEN.finditer(text):
+            name = match.group('raw')
+            if name:
+                stack.append((name.lower(), name, match.start(),
+                              match.end('raw_attrs') + 1))
+                continue
+
+            end_tag, name, attrs = match.group('end', 'name', 'attrs')
+            if not name:
+                # Comment.
+                continue
+
+            key = name.lower()
+            if not end_tag:
+                if not attrs.endswith('/'):
+                    stack.append((key, name, match.start(), match.end()))
+                continue
+
+            for i in range(len(stack) - 1, -1, -1):
+                if stack[i][0] == key:
+                    _, start_name, a, b = stack[i]
+                    elements.append(Element(
+                        start_name, sublime.Region(a, b),
+                        sublime.Region(match.start(), match.end())))
+                    del stack[i:]
+                    break
+
+        elements.sort(key=lambda e: e.start.a)
+        self.elements = elements
+        self._starts = [e.start.a for e in elements]
+        self._by_end = sorted(elements, key=lambda e: e.end.a)
+        self._ends = [e.end.a for e in self._by_end]
+
+        # Elements are properly nested, so the parent of each one is the
+        # closest previous element that hasn't ended yet.
+        open_elements = []
+        for element in elements:
+            while open_elements and open_elements[-1].end.b <= element.start.a:
+                open_elements.pop()
+            if open_elements:
+                element.parent = open_elements[-1]
+            open_elements.append(element)
+
+    def containing(self, pt, count=1):
+        """
+        Returns the element @count levels up from the innermost element
+        containing @pt (tags included), or `None`.
+        """
+        i = bisect_right(self._starts, pt) - 1
+        if i < 0:
+            return None
+        element = self.elements[i]
+        while element and element.end.b <= pt:
+            element = element.parent
+        if element is None:
+            return None
+        return element.ancestor(count)
+
+    def tag_at(self, pt):
+        """
+        Returns (element, is_start_tag) for the tag containing @pt, or
+        (`None`, `None`).
+        """
+        i = bisect_right(self._starts, pt) - 1
+        if i >= 0 and self.elements[i].start.a <= pt < self.elements[i].start.b:
+            return self.elements[i], True
+
+        i = bisect_right(self._ends, pt) - 1
+        if i >= 0 and self._by_end[i].end.a <= pt < self._by_end[i].end.b:
+            return self._by_end[i], False
+
+        return None, None
@@ -1,3 +1,4 @@
+from bisect import bisect_left
 import re
 
 import sublime
@@ -9,24 +10,17 @@ from sublime import CLASS_LINE_END
 from sublime import CLASS_LINE_START
 from sublime import CLASS_EMPTY_LINE
 
+from Vintageous.vi import indents
 from Vintageous.vi import search
+from Vintageous.vi import symbols
 from Vintageous.vi import units
 from Vintageous.vi import utils
 from Vintageous.vi.search import find_in_range
 from Vintageous.vi.search import reverse_search_by_pt
+from Vintageous.vi.tags import get_tree as get_tag_tree
 from Vintageous.vi.utils import resolve_insertion_point_at_b
 
 
-RX_ANY_TAG = r'</?([0-9A-Za-z-]+).*?>'
-RX_ANY_TAG_NAMED_TPL = r'</?({0}) *?.*?>'
-RXC_ANY_TAG = re.compile(r'</?([0-9A-Za-z]+).*?>')
-# According to the HTML 5 editor's draft, only 0-9A-Za-z characters can be
-# used in tag names. TODO: This won't be enough in Dart Polymer projects,
-# for example.
-RX_ANY_START_TAG = r'<([0-9A-Za-z]+)(.*?)>'
-RX_ANY_END_TAG = r'</([0-9A-Za-z-]+).*?>'
-
-
 ANCHOR_NEXT_WORD_BOUNDARY = CLASS_WORD_START | CLASS_PUNCTUATION_START | \
                             CLASS_LINE_END
 ANCHOR_PREVIOUS_WORD_BOUNDARY = CLASS_WORD_END | CLASS_PUNCTUATION_END | \
@@ -46,6 +40,11 @@ TAG = 4
 WORD = 5
 BIG_WORD = 6
 PARAGRAPH = 7
+ARGUMENT = 8
+FUNCTION = 9
+CLASS = 10
+INDENT = 11
+BIG_INDENT = 12
 
 
 PAIRS = {
@@ -60,8 +59,13 @@ PAIRS = {
     '}': (('\\{', '\\}'), BRACKET),
     '<': (('<', '>'), BRACKET),
     '>': (('<', '>'), BRACKET),
+    'a': (None, ARGUMENT),
     'b': (('\\(', '\\)'), BRACKET),
     'B': (('\\{', '\\}'), BRACKET),
+    'c': (None, CLASS),
+    'f': (None, FUNCTION),
+    'i': (None, INDENT),
+    'I': (None, BIG_INDENT),
     'p': (None, PARAGRAPH),
     's': (None, SENTENCE),
     't': (None, TAG),
@@ -230,7 +234,10 @@ def get_text_object_region(view, s, text_object, inclusive=False, count=1):
         return s
 
     if type_ == TAG:
-        begin_tag, end_tag, _ = find_containing_tag(view, s.b)
+        begin_tag, end_tag, _ = find_containing_tag(view, s.b, count)
+        if not begin_tag:
+            return s
+
         if inclusive:
             return sublime.Region(begin_tag.a, end_tag.b)
         else:
@@ -239,6 +246,33 @@ def get_text_object_region(view, s, text_object, inclusive=False, count=1):
     if type_ == PARAGRAPH:
         return find_paragraph_text_object(view, s, inclusive=inclusive, count=count)
 
+    if type_ in (FUNCTION, CLASS):
+        kind = symbols.FUNCTION if type_ == FUNCTION else symbols.CLASS
+        symbol = symbols.get_index(view).containing(
+            resolve_insertion_point_at_b(s), kind, count)
+        if not symbol:
+            return s
+
+        if inclusive:
+            return symbol.region
+        return symbol.inner or s
+
+    if type_ in (INDENT, BIG_INDENT):
+        row = view.rowcol(resolve_insertion_point_at_b(s))[0]
+        rows = indents.get_index(view).block(
+            row, count, above=inclusive,
+            below=inclusive and type_ == BIG_INDENT)
+        if not rows:
+            return s
+
+        return sublime.Region(view.text_point(rows[0], 0),
+                              view.full_line(view.text_point(rows[1], 0)).b)
+
+    if type_ == ARGUMENT:
+        argument = find_argument(view, resolve_insertion_point_at_b(s),
+                                 inclusive=inclusive, count=count)
+        return argument or s
+
     if type_ == BRACKET:
         b = resolve_insertion_point_at_b(s)
         opening = find_prev_lone_bracket(view, b, delims)
@@ -252,26 +286,14 @@ def get_text_object_region(view, s, text_object, inclusive=False, count=1):
         return sublime.Region(opening.a + 1, closing.b - 1)
 
     if type_ == QUOTE:
-        # Vim only operates on the current line.
-        line = view.line(s)
-        # FIXME: Escape sequences like \" are probably syntax-dependant.
-        prev_quote = reverse_search_by_pt(view, r'(?<!\\\\)' + delims[0],
-                                          start=line.a, end=s.b)
-
-        next_quote = find_in_range(view, r'(?<!\\\\)' + delims[0],
-                                   start=s.b, end=line.b)
-
-        if next_quote and not prev_quote:
-            prev_quote = next_quote
-            next_quote = find_in_range(view, r'(?<!\\\\)' + delims[0],
-                                       start=prev_quote.b, end=line.b)
-
-        if not (prev_quote and next_quote):
+        quoted = find_quoted_region(view, resolve_insertion_point_at_b(s),
+                                    delims[0])
+        if not quoted:
             return s
 
         if inclusive:
-            return sublime.Region(prev_quote.a, next_quote.b)
-        return sublime.Region(prev_quote.a + 1, next_quote.b - 1)
+            return quoted
+        return sublime.Region(quoted.a + 1, quoted.b - 1)
 
     if type_ == WORD:
         w = a_word(view, s.b, inclusive=inclusive, count=count)
@@ -320,6 +342,160 @@ def get_text_object_region(view, s, text_object, inclusive=False, count=1):
     return s
 
 
+# Quote positions in the last line tokenized by `line_quotes()`, as a tuple
+# (view id, change count, line start, quote, positions). Operating on many
+# carets in the same line only needs to tokenize it once.
+_last_line_quotes = None
+
+
+def line_quotes(view, line, quote):
+    """
+    Returns the sorted positions of the unescaped @quote characters in
+    @line. A backslash escapes the next character.
+    """
+    global _last_line_quotes
+
+    key = (view.id(), view.change_count(), line.a, quote)
+    if _last_line_quotes and _last_line_quotes[:4] == key:
+        return _last_line_quotes[4]
+
+    positions = []
+    for match in re.finditer(r'\\.|' + re.escape(quote), view.substr(line)):
+        if match.end() - match.start() == 1:
+            positions.append(line.a + match.start())
+    _last_line_quotes = key + (positions,)
+    return positions
+
+
+def find_quoted_region(view, pt, quote):
+    """
+    Returns the region of the string delimited by @quote at @pt, quotes
+    included, or `None`.
+
+    Like Vim, only the line containing @pt is considered: its quotes are
+    paired from the start of the line. If @pt isn't inside a string, the
+    next string in the line is used. If the line has no such string but @pt
+    is inside a multiline string according to the syntax definition, the
+    string's region is returned instead.
+    """
+    line = view.line(pt)
+    positions = line_quotes(view, line, quote)
+
+    i = bisect_left(positions, pt)
+    if i < len(positions) and positions[i] == pt:
+        # At a quote: it's opening if an even number of quotes precede it.
+        i -= i % 2
+    elif i % 2:
+        # Inside a string.
+        i -= 1
+
+    if i + 1 < len(positions):
+        return sublime.Region(positions[i], positions[i + 1] + 1)
+
+    return find_quoted_scope(view, pt, quote)
+
+
+def find_quoted_scope(view, pt, quote):
+    """
+    Returns the region of the multiline string scope at @pt if it's
+    delimited by @quote, or `None`.
+    """
+    if not view.score_selector(pt, 'string'):
+        return None
+
+    region = view.extract_scope(pt)
+    if (region.size() < 2 or
+            view.line(region.a) == view.line(region.b) or
+            view.substr(region.a) != quote or
+            view.substr(region.b - 1) != quote):
+        return None
+    return region
+
+
+# Characters inspected on each side of the caret when looking for the
+# argument list around it.
+MAX_ARGUMENT_SCAN = 1 << 15
+
+RXC_ARGUMENT_TOKEN = re.compile(r'''
+    "(?:\\.|[^"\\\n])*"
+    |
+    '(?:\\.|[^'\\\n])*'
+    |
+    [()\[\]{},]
+    ''', re.VERBOSE)
+
+_OPENING_BRACKETS = '([{'
+
+
+def find_argument(view, pt, inclusive=False, count=1):
+    """
+    Returns the region of the @count arguments starting with the one at @pt,
+    or `None`.
+
+    Arguments are separated by the commas directly inside the innermost
+    brackets containing @pt. Commas and brackets inside nested brackets or
+    string literals are skipped. Only as many characters as
+    `MAX_ARGUMENT_SCAN` are inspected on each side of @pt.
+
+    @inclusive
+      If `True`, a separating comma and the whitespace around it are
+      included too: the one after the arguments or, for the last argument,
+      the one before them.
+    """
+    begin = max(0, pt - MAX_ARGUMENT_SCAN)
+    text = view.substr(sublime.Region(begin, min(view.size(),
+                                                 pt + MAX_ARGUMENT_SCAN)))
+    offset = pt - begin
+
+    separators = None
+    # Stack of (opening bracket position, top-level comma positions).
+    stack = []
+    for match in RXC_ARGUMENT_TOKEN.finditer(text):
+        c = match.group()
+        if len(c) != 1:
+            # String literal.
+            continue
+
+        if c in _OPENING_BRACKETS:
+            stack.append((match.start(), []))
+        elif c == ',':
+            if stack:
+                stack[-1][1].append(match.start())
+        elif stack:
+            opening, commas = stack.pop()
+            if opening < offset <= match.start():
+                separators = [opening] + commas + [match.start()]
+                break
+
+    if not separators:
+        return None
+
+    i = bisect_left(separators, offset) - 1
+    j = min(i + count, len(separators) - 1)
+    a = _skip_whitespace(text, separators[i] + 1)
+    b = _skip_whitespace_reverse(text, separators[j])
+
+    if inclusive:
+        if j < len(separators) - 1:
+            b = _skip_whitespace(text, separators[j] + 1)
+        elif i > 0:
+            a = separators[i]
+
+    return sublime.Region(begin + a, begin + max(a, b))
+
+
+def _skip_whitespace(text, i):
+    while i < len(text) and text[i].isspace():
+        i += 1
+    return i
+
+
+def _skip_whitespace_reverse(text, i):
+    while i > 0 and text[i - 1].isspace():
+        i -= 1
+    return i
+
+
 def find_next_lone_bracket(view, start, items, unbalanced=0):
     # TODO: Extract common functionality from here and the % motion instead of
     # duplicating code.
@@ -513,114 +689,15 @@ def word_end_reverse(view, pt, count=1, big=False):
     return max(t - 1, 0)
 
 
-def next_end_tag(view, pattern=RX_ANY_TAG, start=0, end=-1):
-    region = view.find(pattern, start, sublime.IGNORECASE)
-    if region.a == -1:
-        return None, None, None
-    match = re.search(pattern, view.substr(region))
-    return (region, match.group(1), match.group(0).startswith('</'))
-
-
-def previous_begin_tag(view, pattern, start=0, end=0):
-    assert pattern, 'bad call'
-    region = reverse_search_by_pt(view, RX_ANY_TAG, start, end,
-                                  sublime.IGNORECASE)
-    if not region:
-        return None, None, None
-    match = re.search(RX_ANY_TAG, view.substr(region))
-    return (region, match.group(1), match.group(0)[1] != '/')
-
-
-def get_region_end(r):
-    return {'start': r.end()}
-
-
-def get_region_begin(r):
-    return {'start': 0, 'end': r.begin()}
-
-
-def get_closest_tag(view, pt):
-    while pt > 0 and view.substr(pt) != '<':
-        pt -= 1
-
-    if view.substr(pt) != '<':
-        return None
-
-    next_tag = view.find(RX_ANY_TAG, pt)
-    if next_tag.a != pt:
-        return None
-
-    return pt, next_tag
-
-
-def find_containing_tag(view, start):
-    # BUG: fails if start < first begin tag
+def find_containing_tag(view, start, count=1):
+    """
+    Returns a tuple (begin_region, end_region, tag_name) for the element
+    @count levels up from the innermost one containing @start. Returns
+    (`None`, `None`, `None`) if there's no such element.
+    """
     # TODO: Should not select tags in PCDATA sections.
-    _, closest_tag = get_closest_tag(view, start)
-    if not closest_tag:
+    element = get_tag_tree(view).containing(start, count)
+    if element is None:
         return None, None, None
 
-    start = closest_tag.a if ((closest_tag.contains(start)) and
-                              (view.substr(closest_tag)[1] == '/')) else start
-
-    search_forward_args = {
-        'pattern': RX_ANY_TAG,
-        'start': start,
-    }
-    end_region, tag_name = next_unbalanced_tag(view,
-                                 search=next_end_tag,
-                                 search_args=search_forward_args,
-                                 restart_at=get_region_end)
-
-    if not end_region:
-        return None, None, None
-
-    search_backward_args = {
-        'pattern': RX_ANY_TAG_NAMED_TPL.format(tag_name),
-        'start': 0,
-        'end': end_region.a
-    }
-    begin_region, _ = next_unbalanced_tag(view,
-                                 search=previous_begin_tag,
-                                 search_args=search_backward_args,
-                                 restart_at=get_region_begin)
-
-    if not end_region:
-        return None, None, None
-
-    return begin_region, end_region, tag_name
-
-
-def next_unbalanced_tag(view,
-                        search=None,
-                        search_args={},
-                        restart_at=None,
-                        tags=[]):
-    assert search and restart_at, 'wrong call'
-
-    region, tag, is_end_tag = search(view, **search_args)
-
-    if not region:
-        return None, None
-
-    if not is_end_tag:
-        tags.append(tag)
-        search_args.update(restart_at(region))
-        return next_unbalanced_tag(view,
-                                   search,
-                                   search_args,
-                                   restart_at,
-                                   tags)
-
-    if not tags or (tag not in tags):
-        return region, tag
-
-    while tag != tags.pop():
-        continue
-
-    search_args.update(restart_at(region))
-    return next_unbalanced_tag(view,
-                               search,
-                               search_args,
-                               restart_at,
-                               tags)
+    return element.start, element.end, element.name
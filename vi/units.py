@@ -10,6 +10,7 @@ from sublime import CLASS_WORD_START
 
 
 from Vintageous.vi.search import reverse_search_by_pt
+from Vintageous.vi.snapshot import TextSnapshot
 from Vintageous.vi import utils
 from Vintageous.vi.utils import next_non_white_space_char
 from Vintageous.vi.utils import R
@@ -101,6 +102,15 @@ def word_starts(view, start, count=1, internal=False):
     assert count > 0
 
     pt = start
+    # Skip all the words we can in a single pass; the last one may need
+    # special treatment below.
+    steps = count if not internal else count - 1
+    if steps > 1:
+        pt = nth_word_start(view, start, steps)
+        if not internal:
+            return pt
+        count = 1
+
     for i in range(count):
         # On the last motion iteration, we must do some special stuff if we are still on the
         # starting line of the motion.
@@ -115,6 +125,7 @@ def word_starts(view, start, count=1, internal=False):
             pt = next_non_white_space_char(view, pt, white_space=' \t')
             while not (view.size() == pt or
                        view.line(pt).empty() or
+                       not view.substr(pt).isspace() or
                        view.substr(view.line(pt)).strip()):
                 pt = next_word_start(view, pt)
                 pt = next_non_white_space_char(view, pt, white_space=' \t')
@@ -132,6 +143,13 @@ def big_word_starts(view, start, count=1, internal=False):
     assert count > 0
 
     pt = start
+    steps = count if not internal else count - 1
+    if steps > 1:
+        pt = nth_word_start(view, start, steps, big=True)
+        if not internal:
+            return pt
+        count = 1
+
     for i in range(count):
         if internal and i == count - 1 and view.line(start) == view.line(pt):
             if view.substr(pt) == '\n':
@@ -143,6 +161,7 @@ def big_word_starts(view, start, count=1, internal=False):
             pt = next_non_white_space_char(view, pt, white_space=' \t')
             while not (view.size() == pt or
                        view.line(pt).empty() or
+                       not view.substr(pt).isspace() or
                        view.substr(view.line(pt)).strip()):
                 pt = next_big_word_start(view, pt)
                 pt = next_non_white_space_char(view, pt, white_space=' \t')
@@ -155,6 +174,66 @@ def big_word_starts(view, start, count=1, internal=False):
     return pt
 
 
+# Compiled word start patterns indexed by word separators.
+_word_start_patterns = {}
+
+
+def _word_start_pattern(separators):
+    try:
+        return _word_start_patterns[separators]
+    except KeyError:
+        pass
+
+    if separators:
+        seps = re.escape(separators)
+        pattern = (r'(?<![^\s{0}])[^\s{0}]|(?<![{0}])[{0}]|(?<=\n)(?=\n)'
+                   .format(seps))
+    else:
+        pattern = r'(?<!\S)\S|(?<=\n)(?=\n)'
+
+    _word_start_patterns[separators] = re.compile(pattern)
+    return _word_start_patterns[separators]
+
+
+def nth_word_start(view, start, count, big=False):
+    """
+    Returns the point where the @count-th word after @start begins, as `w`
+    (or `W` if @big is `True`) would find it in NORMAL mode.
+
+    Instead of stepping from word to word, this scans the text after @start
+    once, so its cost depends on the distance covered and not on @count.
+    Blank lines count as words; lines with only white space don't.
+
+    @view
+      Target view.
+    @start
+      Point to start searching from.
+    @count
+      Number of words to skip.
+    @big
+      Whether to look for WORDs instead of words.
+    """
+    separators = '' if big else view.settings().get('word_separators', '')
+    pattern = _word_start_pattern(separators)
+
+    size = view.size()
+    window = 1 << 12
+    while True:
+        end = min(start + window, size)
+        text = view.substr(sublime.Region(start, end))
+        # Matches are never spurious at the end of the window, so we can scan
+        # it entirely. Bigger windows are rescanned from the start, which
+        # keeps the total cost linear.
+        found = 0
+        for match in pattern.finditer(text, 1):
+            found += 1
+            if found == count:
+                return start + match.start()
+        if end == size:
+            return size
+        window <<= 2
+
+
 def word_ends(view, start, count=1, big=False):
     assert start >= 0 and count > 0, 'bad call'
 
@@ -221,100 +300,104 @@ def inner_lines(view, s, count=1):
 
 
 def next_paragraph_start(view, pt, count=1, skip_empty=True):
-    if utils.row_at(view, pt) == utils.last_row(view):
-        if not view.line(view.size()).empty():
-            return view.size() - 1
-        return view.size()
+    # Paragraph boundaries are found by searching the text for empty lines,
+    # so large counts don't have to walk the buffer row by row.
+    text = TextSnapshot(view)
+    last_bol = text.line_begin(text.size)
+
+    if text.line_begin(pt) == last_bol:
+        if last_bol != text.size:
+            return text.size - 1
+        return text.size
 
     # skip empty rows before moving for the first time
-    current_row = utils.row_at(view, pt)
-    if (view.line(view.text_point(current_row + 1, 0)).empty() and
-        view.line(pt).empty()):
-            pt, _ = _next_non_empty_row(view, pt)
+    if (_is_empty_line(text, text.line_end(pt) + 1) and
+        _is_empty_line(text, pt)):
+            pt, _ = _next_non_empty_row(text, pt)
 
     for i in range(count):
-        pt, eof = _next_empty_row(view, pt)
+        pt, eof = _next_empty_row(text, pt)
         if eof:
-            if view.line(pt).empty():
+            if _is_empty_line(text, pt):
                 return pt
             return pt - 1
 
         if skip_empty and (i != (count - 1)):
-            pt, eof = _next_non_empty_row(view, pt)
+            pt, eof = _next_non_empty_row(text, pt)
             if eof:
-                if not view.line(pt).empty():
+                if not _is_empty_line(text, pt):
                     return pt - 1
                 return pt
     return pt
 
 
-def _next_empty_row(view, pt):
-    r = utils.row_at(view, pt)
-    while True:
-        r += 1
-        pt = view.text_point(r, 0)
-        if utils.row_at(view, pt) == utils.last_row(view):
-            return view.size(), True
-        if view.line(pt).empty():
-            return pt, False
+def _is_empty_line(text, pt):
+    return text.line_begin(pt) == text.line_end(pt)
 
 
-def _next_non_empty_row(view, pt):
-    r = utils.row_at(view, pt)
+def _next_empty_row(text, pt):
+    last_bol = text.line_begin(text.size)
+    # An empty row begins right after a newline character followed by
+    # another one.
+    nl = text.find('\n\n', text.line_end(pt))
+    if nl == -1 or (nl + 1) >= last_bol:
+        return text.size, True
+    return nl + 1, False
+
+
+def _next_non_empty_row(text, pt):
+    last_bol = text.line_begin(text.size)
+    bol = text.line_end(pt) + 1
     while True:
-        r += 1
-        reg = view.line(view.text_point(r, 0))
-        if r >= utils.last_row(view):
-            return view.size(), True
-        if not reg.empty():
-            return reg.a, False
+        if bol >= last_bol:
+            return text.size, True
+        if text.char(bol) != '\n':
+            return bol, False
+        bol += 1
 
 
 def prev_paragraph_start(view, pt, count=1, skip_empty=True):
+    text = TextSnapshot(view)
+
     # first row?
-    if utils.row_at(view, pt) == 0:
+    if text.line_begin(pt) == 0:
         return 0
 
-    current_row = utils.row_at(view, pt)
-    if (view.line(view.text_point(current_row - 1, 0)).empty() and
-        view.line(view.text_point(current_row, 0)).empty()):
-            pt, bof = _prev_non_empty_row(view, pt)
+    bol = text.line_begin(pt)
+    if (_is_empty_line(text, bol - 1) and _is_empty_line(text, bol)):
+            pt, bof = _prev_non_empty_row(text, pt)
 
             if bof:
                 return 0
 
     for i in range(count):
-        pt, bof = _prev_empty_row(view, pt)
+        pt, bof = _prev_empty_row(text, pt)
         if bof:
             return 0
 
         if skip_empty and (count > 1) and (i != count - 1):
-            pt, bof = _prev_non_empty_row(view, pt)
+            pt, bof = _prev_non_empty_row(text, pt)
             if bof:
                 return pt
 
-    return view.text_point(utils.row_at(view, pt), 0)
+    return text.line_begin(pt)
 
 
-def _prev_empty_row(view, pt):
-    r = utils.row_at(view, pt)
-    while True:
-        r -= 1
-        if r == 0:
-            return 0, True
-        pt = view.text_point(r, 0)
-        if view.line(pt).empty():
-            return pt, False
+def _prev_empty_row(text, pt):
+    nl = text.rfind('\n\n', 0, text.line_begin(pt))
+    if nl == -1:
+        return 0, True
+    return nl + 1, False
 
 
-def _prev_non_empty_row(view, pt):
-    r = utils.row_at(view, pt)
+def _prev_non_empty_row(text, pt):
+    bol = text.line_begin(pt)
     while True:
-        r -= 1
-        reg = view.line(view.text_point(r, 0))
+        if bol == 0:
+            return 0, True
+        bol = text.line_begin(bol - 1)
         # stop if we hit the first row
-        if r <= 0:
+        if bol == 0:
             return 0, True
-        if not reg.empty():
-            return reg.a, False
-
+        if not _is_empty_line(text, bol):
+            return bol, False
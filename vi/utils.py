@@ -1,7 +1,9 @@
 import sublime
 import sublime_plugin
 from Vintageous.vi.sublime import is_view as sublime_is_view
+from Vintageous.vi.snapshot import TextSnapshot
 
+from array import array
 from contextlib import contextmanager
 import re
 
@@ -9,6 +11,12 @@ import re
 # alias
 R = sublime.Region
 
+# Lines longer than this are "long lines" (for example, in minified files).
+# Commands that would normally read a whole line only read this many
+# characters around the caret in them. Can be overridden with the
+# `vintageous_long_line_threshold` setting.
+LONG_LINE_THRESHOLD = 20000
+
 
 def mark_as_widget(view):
     """
@@ -156,6 +164,37 @@ def regions_transformer(view, f):
     view.sel().add_all(new)
 
 
+def regions_transformer_batch(view, f):
+    """
+    Applies @f to all the selections in @view at once.
+
+    Use this instead of `regions_transformer` when a command may have to deal
+    with thousands of selections.
+
+    @f
+      Callable taking the view, two `array`s holding the .a and .b ends of
+      every selection, and a `TextSnapshot` of the view. It must return two
+      arrays of the same length with the new ends. It may modify and return
+      the arrays it receives.
+
+    The view's selection is left untouched if no region has changed.
+    """
+    sels = view.sel()
+    old_a = array('l', (s.a for s in sels))
+    old_b = array('l', (s.b for s in sels))
+
+    new_a, new_b = f(view, array('l', old_a), array('l', old_b),
+                     TextSnapshot(view))
+    if len(new_a) != len(old_a) or len(new_b) != len(old_b):
+        raise ValueError('one region per selection required')
+
+    if new_a == old_a and new_b == old_b:
+        return
+
+    sels.clear()
+    sels.add_all([R(a, b) for (a, b) in zip(new_a, new_b)])
+
+
 def resolve_insertion_point_at_b(region):
     """
     Returns the insertion point closest to @region.b for a visual region.
@@ -302,6 +341,89 @@ class IrreversibleMouseTextCommand(sublime_plugin.TextCommand):
         pass
 
 
+# Regions or points are read with a single view.substr() call if there are
+# at least this many and they span at most MAX_BULK_READ characters.
+BULK_READ_MIN_REGIONS = 64
+MAX_BULK_READ = 1 << 24
+# Regions spanning more than this many characters are only read at once if
+# they cover at least BULK_READ_MIN_COVERAGE of the span, so that a few
+# sparse regions don't copy most of the buffer.
+SMALL_BULK_READ = 1 << 16
+BULK_READ_MIN_COVERAGE = 0.125
+
+
+def read_regions(view, regions):
+    """
+    Returns the text of each region in @regions, which must be sorted as
+    selections are.
+
+    Many regions close to one another are read with a single call to
+    `view.substr()`.
+    """
+    if len(regions) < BULK_READ_MIN_REGIONS:
+        return [view.substr(r) for r in regions]
+
+    begin = regions[0].begin()
+    end = regions[-1].end()
+    span = end - begin
+    if span > MAX_BULK_READ or (
+            span > SMALL_BULK_READ and
+            sum(r.size() for r in regions) < span * BULK_READ_MIN_COVERAGE):
+        return [view.substr(r) for r in regions]
+
+    text = view.substr(R(begin, end))
+    return [text[r.begin() - begin:r.end() - begin] for r in regions]
+
+
+def line_ends(view, pts):
+    """
+    Returns the end of the line containing each point in @pts, which must be
+    sorted.
+
+    The text between the first and the last point is read at once instead of
+    calling `view.line()` for each point.
+    """
+    if len(pts) < 2 or pts[-1] - pts[0] > MAX_BULK_READ:
+        return [view.line(pt).b for pt in pts]
+
+    begin = pts[0]
+    text = view.substr(R(begin, pts[-1]))
+    last_end = view.line(pts[-1]).b
+    ends = []
+    # Index in text of the newline after the current point, or len(text) if
+    # there's none.
+    nl = -1
+    for pt in pts:
+        if nl < pt - begin:
+            nl = text.find('\n', pt - begin)
+            if nl < 0:
+                nl = len(text)
+        ends.append(begin + nl if nl < len(text) else last_end)
+    return ends
+
+
+def erase_regions(view, edit, regions):
+    """
+    Erases @regions, which must be sorted and must not overlap, working
+    backwards so that they aren't displaced by earlier erasures.
+
+    Returns where each region begins after the erasure.
+    """
+    size = view.size()
+    # XXX: It appears regions can end beyond the buffer's EOF (?).
+    regions = [R(min(r.begin(), size), min(r.end(), size)) for r in regions]
+    for r in reversed(regions):
+        if not r.empty():
+            view.erase(edit, r)
+
+    pts = []
+    erased = 0
+    for r in regions:
+        pts.append(r.begin() - erased)
+        erased += r.size()
+    return pts
+
+
 def next_non_white_space_char(view, pt, white_space='\t '):
     while (view.substr(pt) in white_space) and (pt <= view.size()):
         pt += 1
@@ -392,6 +514,91 @@ def get_bol(view, pt):
     return view.line(pt).a
 
 
+def long_line_threshold(view):
+    return view.settings().get('vintageous_long_line_threshold',
+                               LONG_LINE_THRESHOLD)
+
+
+def is_long_line(view, line):
+    """
+    Returns `True` if @line is too long to be read in full on every
+    keypress.
+
+    @view
+      Target view.
+    @line
+      A region spanning a line in @view.
+    """
+    return line.size() > long_line_threshold(view)
+
+
+def line_tail(view, pt):
+    """
+    Returns the region from @pt to the end of its line.
+
+    In long lines, the region is cut short after as many characters as the
+    long line threshold.
+    """
+    return R(pt, min(view.line(pt).b, pt + long_line_threshold(view)))
+
+
+def changed_range(old, new):
+    """
+    Returns (a, old_b, new_b) such that only old[a:old_b] differs from
+    new[a:new_b].
+    """
+    a = _common_prefix(old, new)
+    size = _common_suffix(old, new, min(len(old), len(new)) - a)
+    return a, len(old) - size, len(new) - size
+
+
+# Characters compared at a time when looking for the part of a text that
+# changed.
+_CHUNK_SIZE = 1 << 16
+
+
+def _common_prefix(old, new):
+    size = min(len(old), len(new))
+    i = 0
+    while i < size and old[i:i + _CHUNK_SIZE] == new[i:i + _CHUNK_SIZE]:
+        i += _CHUNK_SIZE
+    if i >= size:
+        return size
+
+    # The chunks differ; bisect the one starting at i.
+    lo, hi = i, min(i + _CHUNK_SIZE, size)
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if old[i:mid] == new[i:mid]:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+
+def _common_suffix(old, new, max_size):
+    def tail(text, k, n):
+        # The n characters ending k characters before the end of text.
+        return text[len(text) - k - n:len(text) - k]
+
+    k = 0
+    while (k < max_size and
+            tail(old, k, min(_CHUNK_SIZE, max_size - k)) ==
+            tail(new, k, min(_CHUNK_SIZE, max_size - k))):
+        k += _CHUNK_SIZE
+    if k >= max_size:
+        return max_size
+
+    lo, hi = k, min(k + _CHUNK_SIZE, max_size)
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if tail(old, k, mid - k) == tail(new, k, mid - k):
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+
 def replace_sel(view, new_sel):
     if new_sel is None or new_sel == []:
         raise ValueError('no new_sel')
@@ -8,6 +8,8 @@ from Vintageous.state import _init_vintageous
 from Vintageous.state import State
 from Vintageous.vi import cmd_base
 from Vintageous.vi import cmd_defs
+from Vintageous.vi import columns
+from Vintageous.vi import hlsearch
 from Vintageous.vi import mappings
 from Vintageous.vi import search
 from Vintageous.vi import units
@@ -19,6 +21,7 @@ from Vintageous.vi.keys import key_names
 from Vintageous.vi.keys import KeySequenceTokenizer
 from Vintageous.vi.keys import to_bare_command_name
 from Vintageous.vi.mappings import Mappings
+from Vintageous.vi.registers import Block
 from Vintageous.vi.utils import first_sel
 from Vintageous.vi.utils import gluing_undo_groups
 from Vintageous.vi.utils import IrreversibleTextCommand
@@ -280,7 +283,7 @@ class _vi_c(ViTextCommandBase):
 
         self.state.registers.yank(self, register)
 
-        self.view.run_command('right_delete')
+        self.erase_sel(edit)
 
         self.enter_insert_mode(mode)
 
@@ -429,7 +432,8 @@ class _enter_normal_mode_impl(ViTextCommandBase):
 
         regions_transformer(self.view, f)
 
-        self.view.erase_regions('vi_search')
+        hlsearch.clear(self.view)
+        search.clear_search_count(self.view)
         self.view.run_command('_vi_adjust_carets', {'mode': mode})
 
 
@@ -1155,6 +1159,8 @@ class _vi_d(ViTextCommandBase):
 
     _can_yank = True
     _populates_small_delete_register = True
+    # Characters read after each caret looking for the next non-blank one.
+    LOOKAHEAD = 80
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -1190,18 +1196,40 @@ class _vi_d(ViTextCommandBase):
         state = self.state
         state.registers.yank(self, register, operation='delete')
 
-        self.view.run_command('left_delete')
-        self.view.run_command('_vi_adjust_carets')
+        pts = utils.erase_regions(self.view, edit, list(self.view.sel()))
+        if mode == modes.INTERNAL_NORMAL:
+            pts = self.text_starts(pts)
+        self.view.sel().clear()
+        self.view.sel().add_all([R(pt) for pt in pts])
 
         self.enter_normal_mode(mode)
 
-        # XXX: abstract this out for all types of selections.
-        def advance_to_text_start(view, s):
-            pt = utils.next_non_white_space_char(self.view, s.b)
-            return R(pt)
-
-        if mode == modes.INTERNAL_NORMAL:
-            regions_transformer(self.view, advance_to_text_start)
+    def text_starts(self, pts):
+        """
+        Returns the first non-blank character at or after each caret in @pts.
+        Carets at the end of a non-empty line are moved back onto its last
+        character first.
+        """
+        size = self.view.size()
+        windows = utils.read_regions(self.view, [
+            R(max(pt - 1, 0), min(pt + self.LOOKAHEAD, size)) for pt in pts])
+
+        starts = []
+        for pt, window in zip(pts, windows):
+            i = 1 if pt > 0 else 0
+            if (window[i:i + 1] in ('\n', '') and i > 0 and
+                    window[i - 1] != '\n'):
+                pt -= 1
+                i -= 1
+            rest = window[i:]
+            skip = len(rest) - len(rest.lstrip('\t '))
+            if skip == len(rest) and pt + skip < size:
+                # Blanks run past the window.
+                starts.append(min(utils.next_non_white_space_char(
+                                  self.view, pt + skip), size))
+            else:
+                starts.append(min(pt + skip, size))
+        return starts
 
 
 class _vi_big_a(ViTextCommandBase):
@@ -1411,7 +1439,7 @@ class _vi_big_d(ViTextCommandBase):
         state = self.state
         state.registers.yank(self)
 
-        self.view.run_command('left_delete')
+        self.erase_sel(edit)
 
         self.enter_normal_mode(mode)
 
@@ -1577,7 +1605,7 @@ class _vi_x(ViTextCommandBase):
 
         if not abort:
             self.state.registers.yank(self, register)
-            self.view.run_command('right_delete')
+            self.erase_sel(edit)
         self.enter_normal_mode(mode)
 
 
@@ -1852,6 +1880,42 @@ class _vi_big_x(ViTextCommandBase):
         self.enter_normal_mode(mode)
 
 
+def paste_block(view, edit, pt, block, count, after=True):
+    """
+    Pastes the rows of @block, repeated @count times, in consecutive lines
+    starting at the line of @pt, all of them at the same column: the
+    column after @pt's or, if @after is `False`, @pt's. Lines too short to
+    reach that column are padded with spaces, and lines are added at EOF if
+    needed. The whole paste is a single replacement.
+
+    Returns the top left corner of the pasted block.
+    """
+    first_line = view.line(pt)
+    row, col = view.rowcol(pt)
+    if after and not first_line.empty():
+        col += 1
+
+    last_row = min(row + len(block) - 1, utils.last_row(view))
+    region = R(first_line.a, view.line(view.text_point(last_row, 0)).b)
+    lines = view.substr(region).split('\n')
+    lines.extend([''] * (len(block) - len(lines)))
+
+    new_lines = []
+    for line, fragment in zip(lines, block):
+        line = line.ljust(col)
+        tail = line[col:]
+        padded = fragment.ljust(block.width)
+        if tail:
+            piece = padded * count
+        else:
+            # Don't leave trailing blanks.
+            piece = padded * (count - 1) + fragment
+        new_lines.append(line[:col] + piece + tail)
+
+    view.replace(edit, region, '\n'.join(new_lines))
+    return first_line.a + col
+
+
 class _vi_big_p(ViTextCommandBase):
     _can_yank = True
     _synthetize_new_line_at_eof = True
@@ -1878,7 +1942,17 @@ class _vi_big_p(ViTextCommandBase):
 
         # TODO: Enable pasting to multiple selections.
         sel = list(self.view.sel())[0]
+
+        if isinstance(fragments, Block) and mode == modes.INTERNAL_NORMAL:
+            pt = paste_block(self.view, edit, sel.b, fragments, count,
+                             after=False)
+            self.view.sel().clear()
+            self.view.sel().add(R(pt))
+            self.enter_normal_mode(mode=mode)
+            return
+
         text_block, linewise = self.merge(fragments)
+        text_block *= count
 
         if mode == modes.INTERNAL_NORMAL:
             if not linewise:
@@ -1946,112 +2020,107 @@ class _vi_p(ViTextCommandBase):
             state.registers['"'] = prev_text
 
         sels = list(self.view.sel())
+        if (isinstance(fragments, Block) and
+                state.mode not in (modes.VISUAL, modes.VISUAL_LINE)):
+            pt = paste_block(self.view, edit, sels[0].b, fragments, count)
+            self.view.sel().clear()
+            self.view.sel().add(R(pt))
+            self.enter_normal_mode(mode)
+            return
+
         # If we have the same number of pastes and selections, map 1:1. Otherwise paste paste[0]
         # to all target selections.
-        if len(sels) == len(fragments):
-            sel_to_frag_mapped = zip(sels, fragments)
-        else:
-            sel_to_frag_mapped = zip(sels, [fragments[0],] * len(sels))
-
-        # FIXME: Fix this mess. Separate linewise from charwise pasting.
-        pasting_linewise = True
-        offset = 0
-        paste_locations = []
-        for selection, fragment in reversed(list(sel_to_frag_mapped)):
-            fragment = self.prepare_fragment(fragment)
-            if fragment.startswith('\n'):
-                # Pasting linewise...
-                # If pasting at EOL or BOL, make sure we paste before the newline character.
-                if (utils.is_at_eol(self.view, selection) or
-                    utils.is_at_bol(self.view, selection)):
-                    l = self.paste_all(edit, selection,
-                                       self.view.line(selection.b).b,
-                                       fragment,
-                                       count)
-                    paste_locations.append(l)
-                else:
-                    l = self.paste_all(edit, selection,
-                                   self.view.line(selection.b - 1).b,
-                                   fragment,
-                                   count)
-                    paste_locations.append(l)
-            else:
-                pasting_linewise = False
-                # Pasting charwise...
-                # If pasting at EOL, make sure we don't paste after the newline character.
-                if self.view.substr(selection.b) == '\n':
-                    l = self.paste_all(edit, selection, selection.b + offset,
-                                   fragment, count)
-                    paste_locations.append(l)
-                else:
-                    l = self.paste_all(edit, selection, selection.b + offset + 1,
-                                   fragment, count)
-                    paste_locations.append(l)
-                offset += len(fragment) * count
-
-        if pasting_linewise:
-            self.reset_carets_linewise(paste_locations)
-        else:
-            self.reset_carets_charwise(paste_locations, len(fragment))
-
-        self.enter_normal_mode(mode)
+        if len(sels) != len(fragments):
+            fragments = [fragments[0]] * len(sels)
 
-    def reset_carets_charwise(self, pts, paste_len):
-        # FIXME: Won't work for multiple jagged pastes...
-        b_pts = [s.b for s in list(self.view.sel())]
-        if len(b_pts) > 1:
-            self.view.sel().clear()
-            self.view.sel().add_all([R(ploc + paste_len - 1,
-                                                    ploc + paste_len - 1)
-                                    for ploc in pts])
+        if state.mode in (modes.VISUAL, modes.VISUAL_LINE):
+            pts = self.paste_over(edit, sels, fragments, count)
         else:
-            self.view.sel().clear()
-            self.view.sel().add(R(pts[0] + paste_len - 1,
-                                               pts[0] + paste_len - 1))
+            pts = self.paste_after(edit, sels, fragments, count)
 
-    def reset_carets_linewise(self, pts):
         self.view.sel().clear()
-
-        if self.state.mode == modes.VISUAL_LINE:
-            self.view.sel().add_all([R(loc) for loc in pts])
-            return
-
-        pts = [utils.next_non_white_space_char(self.view, pt + 1)
-                    for pt in pts]
-
         self.view.sel().add_all([R(pt) for pt in pts])
 
-    def prepare_fragment(self, text):
-        if text.endswith('\n') and text != '\n':
-            text = '\n' + text[0:-1]
-        return text
+        self.enter_normal_mode(mode)
 
-    # TODO: Improve this signature.
-    def paste_all(self, edit, sel, at, text, count):
-        state = self.state
+    def paste_after(self, edit, sels, fragments, count):
+        """
+        Pastes each fragment @count times after the caret of its selection:
+        linewise fragments go after the caret's line, and the rest after the
+        caret's character.
 
-        if state.mode not in (modes.VISUAL, modes.VISUAL_LINE):
-            # TODO: generate string first, then insert?
+        Returns the positions the carets should move to.
+        """
+        size = self.view.size()
+        ends = utils.line_ends(self.view, [s.b for s in sels])
+        targets = []
+        for sel, line_end, fragment in zip(sels, ends, fragments):
+            text = self.prepare_fragment(fragment) * count
+            if text.startswith('\n'):
+                at = line_end
+            else:
+                # If pasting at EOL, make sure we don't paste after the newline character.
+                at = sel.b if line_end == sel.b else sel.b + 1
             # Make sure we can paste at EOF.
-            at = at if at <= self.view.size() else self.view.size()
-            for x in range(count):
-                self.view.insert(edit, at, text)
-            return at
+            targets.append((R(min(at, size)), text, text.startswith('\n')))
 
-        else:
-            if text.startswith('\n'):
-                text = text * count
+        return self.apply(edit, targets)
+
+    def paste_over(self, edit, sels, fragments, count):
+        """
+        Replaces each selection with its fragment repeated @count times.
+
+        Returns the positions the carets should move to.
+        """
+        targets = []
+        for sel, fragment in zip(sels, fragments):
+            text = self.prepare_fragment(fragment) * count
+            linewise = text.startswith('\n')
+            if linewise:
                 if not text.endswith('\n'):
                     text = text + '\n'
-            else:
-                text = text * count
-
-            if state.mode == modes.VISUAL_LINE:
-                if text.startswith('\n'):
+                if self.state.mode == modes.VISUAL_LINE:
                     text = text[1:]
+            targets.append((sel, text, linewise))
+
+        return self.apply(edit, targets)
+
+    def apply(self, edit, targets):
+        """
+        Replaces each region in @targets, a list of (region, text, linewise)
+        sorted by region, with its text.
 
-            self.view.replace(edit, sel, text)
-            return sel.begin()
+        Returns where the caret should go for each target: the first
+        non-blank character of the first pasted line after linewise pastes,
+        and the last pasted character otherwise.
+        """
+        # Work backwards so that regions aren't displaced by earlier changes.
+        for region, text, _ in reversed(targets):
+            if region.empty():
+                self.view.insert(edit, region.a, text)
+            else:
+                self.view.replace(edit, region, text)
+
+        pts = []
+        delta = 0
+        for region, text, linewise in targets:
+            begin = region.begin() + delta
+            delta += len(text) - region.size()
+            if linewise and self.state.mode == modes.VISUAL_LINE:
+                pts.append(begin)
+            elif linewise:
+                line_end = text.find('\n', 1)
+                first_line = text[1:line_end if line_end > 0 else len(text)]
+                pts.append(begin + 1 + len(first_line) -
+                           len(first_line.lstrip('\t ')))
+            else:
+                pts.append(begin + max(len(text) - 1, 0))
+        return pts
+
+    def prepare_fragment(self, text):
+        if text.endswith('\n') and text != '\n':
+            text = '\n' + text[0:-1]
+        return text
 
 
 class _vi_gt(ViWindowCommandBase):
@@ -2198,8 +2267,7 @@ class _vi_modify_numbers(ViTextCommandBase):
         end = pt
         while self.view.substr(end).isdigit():
             end += 1
-        return (sign, int(self.view.substr(R(pt, end))),
-                R(end, self.view.line(pt).b))
+        return (sign, int(self.view.substr(R(pt, end))), R(pt, end))
 
 
     def find_next_num(self, regions):
@@ -2211,7 +2279,7 @@ class _vi_modify_numbers(ViTextCommandBase):
                     a -=1
                 regions[i] = R(a)
 
-        lines = [self.view.substr(R(r.b, self.view.line(r.b).b)) for r in regions]
+        lines = [self.view.substr(utils.line_tail(self.view, r.b)) for r in regions]
         matches = [_vi_modify_numbers.NUM_PAT.search(text) for text in lines]
         if all(matches):
             return [(reg.b + ma.start()) for (reg, ma) in zip(regions, matches)]
@@ -2233,17 +2301,16 @@ class _vi_modify_numbers(ViTextCommandBase):
         count = count if not subtract else -count
         end_sels = []
         for pt in reversed(pts):
-            sign, num, tail = self.get_editable_data(pt)
+            sign, num, num_region = self.get_editable_data(pt)
 
             num_as_text = str((sign * num) + count)
-            new_text = num_as_text + self.view.substr(tail)
 
             offset = 0
             if sign == -1:
                 offset = -1
-                self.view.replace(edit, R(pt - 1, tail.b), new_text)
+                self.view.replace(edit, R(pt - 1, num_region.b), num_as_text)
             else:
-                self.view.replace(edit, R(pt, tail.b), new_text)
+                self.view.replace(edit, num_region, num_as_text)
 
             rowcol = self.view.rowcol(pt + len(num_as_text) - 1 + offset)
             end_sels.append(rowcol)
@@ -2472,7 +2539,8 @@ class _enter_visual_block_mode(ViTextCommandBase):
             lhs_edge = self.view.rowcol(first.b)[1]
             regs = self.view.split_by_newlines(first)
 
-            offset_a, offset_b = self.view.rowcol(first.a)[1], self.view.rowcol(first.b)[1]
+            offset_a = columns.col_at(self.view, first.a)
+            offset_b = columns.col_at(self.view, first.b)
             min_offset_x = min(offset_a, offset_b)
             max_offset_x = max(offset_a, offset_b)
 
@@ -2480,10 +2548,11 @@ class _enter_visual_block_mode(ViTextCommandBase):
             for r in regs:
                 if r.empty():
                     break
-                row, _ = self.view.rowcol(r.end() - 1)
-                a = self.view.text_point(row, min_offset_x)
-                eol = self.view.rowcol(self.view.line(r.end() - 1).b)[1]
-                b = self.view.text_point(row, min(max_offset_x, eol))
+                column_map = columns.get_map(self.view, r.end() - 1)
+                line_end = column_map.begin + column_map.size
+                a = min(column_map.pt_at(min_offset_x), line_end)
+                eol = column_map.width
+                b = min(column_map.pt_at(max_offset_x), line_end)
 
                 if first.a <= first.b:
                     if offset_b < offset_a:
@@ -2687,9 +2756,13 @@ class _vi_g_big_h(ViWindowCommandBase):
     def run(self, mode=None, count=1):
         view = self.window.active_view()
 
-        regs = view.get_regions('vi_search')
+        # Only the matches around the viewport are highlighted, so look up
+        # the rest of them.
+        hl = hlsearch.get_highlight(view)
+        regs = (search.get_matches(view, hl.pattern, hl.flags).regions()
+                if hl else [])
         if regs:
-            view.sel().add_all(view.get_regions('vi_search'))
+            view.sel().add_all(regs)
 
             self.state.enter_select_mode()
             self.state.display_status()
@@ -2714,7 +2787,7 @@ class _vi_ctrl_x_ctrl_l(ViTextCommandBase):
         matches = []
         while end > 0:
             match = search.reverse_search(self.view,
-                                          r'^\s*{0}'.format(escaped),
+                                          r'^[ \t]*{0}'.format(escaped),
                                           0, end, flags=0)
             if (match is None) or (len(matches) == self.MAX_MATCHES):
                 break
@@ -5,26 +5,32 @@ import sublime_plugin
 
 from itertools import chain
 from collections import Counter
+import re
 
 from Vintageous import state as state_module
+from Vintageous.ex.ex_error import ERR_INVALID_SEARCH_PATTERN
+from Vintageous.ex.ex_error import show_error
+from Vintageous.ex.ex_error import VimError
 from Vintageous.state import State
 from Vintageous.vi import cmd_defs
+from Vintageous.vi import columns
+from Vintageous.vi import folds
+from Vintageous.vi import identifiers
+from Vintageous.vi import symbols
+from Vintageous.vi import tags
 from Vintageous.vi import units
 from Vintageous.vi import utils
 from Vintageous.vi.core import ViMotionCommand
+from Vintageous.vi.incsearch import IncrementalSearch
 from Vintageous.vi.keys import mappings
 from Vintageous.vi.keys import seqs
 from Vintageous.vi.search import BufferSearchBase
 from Vintageous.vi.search import ExactWordBufferSearchBase
 from Vintageous.vi.search import find_in_range
-from Vintageous.vi.search import find_wrapping
-from Vintageous.vi.search import reverse_find_wrapping
 from Vintageous.vi.search import reverse_search
 from Vintageous.vi.search import reverse_search_by_pt
-from Vintageous.vi.text_objects import find_containing_tag
 from Vintageous.vi.text_objects import find_next_lone_bracket
 from Vintageous.vi.text_objects import find_prev_lone_bracket
-from Vintageous.vi.text_objects import get_closest_tag
 from Vintageous.vi.text_objects import get_text_object_region
 from Vintageous.vi.text_objects import word_end_reverse
 from Vintageous.vi.text_objects import word_reverse
@@ -37,6 +43,7 @@ from Vintageous.vi.utils import mark_as_widget
 from Vintageous.vi.utils import modes
 from Vintageous.vi.utils import R
 from Vintageous.vi.utils import regions_transformer
+from Vintageous.vi.utils import regions_transformer_batch
 from Vintageous.vi.utils import resize_visual_region
 from Vintageous.vi.utils import resolve_insertion_point_at_a
 from Vintageous.vi.utils import resolve_insertion_point_at_b
@@ -49,55 +56,60 @@ class _vi_find_in_line(ViMotionCommand):
         # Contrary to *f*, *t* does not look past the caret's position, so if
         # @character is under the caret, nothing happens.
 
-        def f(view, s):
-            if mode == modes.VISUAL_LINE:
-                raise ValueError(
-                    'this operator is not valid in mode {}'.format(mode))
-
-            b = s.b
+        def find(text, s_a, s_b):
+            b = s_b
             # If we are in any visual mode, get the actual insertion point.
-            if s.size() > 0:
-                b = resolve_insertion_point_at_b(s)
+            if s_a < s_b:
+                b = s_b - 1
 
             # Vim skips a character while performing the search
             # if the command is ';' or ',' after a 't' or 'T'
             if skipping:
                 b = b + 1
 
-            eol = view.line(b).end()
+            # Don't scan long lines all the way to the end.
+            eol = min(text.line_end(b), b + threshold)
 
-            match = R(b + 1)
+            match = b
             for i in range(count):
                 # Define search range as 'rest of the line to the right'.
-                search_range = R(match.end(), eol)
-                match = find_in_range(view, char, search_range.a,
-                            search_range.b, sublime.LITERAL)
+                match = text.find(char, match + 1, eol)
 
                 # Count too high or simply no match; break.
-                if match is None:
-                    return s
+                if match == -1:
+                    return s_a, s_b
 
-            target_pos = match.a
+            target_pos = match
             if not inclusive:
                 target_pos = target_pos - 1
 
             if mode == modes.NORMAL:
-                return R(target_pos)
+                return target_pos, target_pos
             elif mode == modes.INTERNAL_NORMAL:
-                return R(s.a, target_pos + 1)
+                return s_a, target_pos + 1
             # For visual modes...
             else:
-                new_a = resolve_insertion_point_at_a(s)
-                return utils.new_inclusive_region(new_a, target_pos)
+                new_a = s_a if (s_a < s_b) else (s_a - 1)
+                if new_a <= target_pos:
+                    return new_a, target_pos + 1
+                return new_a + 1, target_pos
+
+        def f(view, a, b, text):
+            for i in range(len(a)):
+                a[i], b[i] = find(text, a[i], b[i])
+            return a, b
 
         if not all([char, mode]):
             raise ValueError('bad parameters')
 
+        if mode == modes.VISUAL_LINE:
+            raise ValueError(
+                'this operator is not valid in mode {}'.format(mode))
+
         char = utils.translate_char(char)
+        threshold = utils.long_line_threshold(self.view)
 
-        state = self.state
-
-        regions_transformer(self.view, f)
+        regions_transformer_batch(self.view, f)
 
 
 class _vi_reverse_find_in_line(ViMotionCommand):
@@ -105,52 +117,56 @@ class _vi_reverse_find_in_line(ViMotionCommand):
        before the caret, nothing happens.
     """
     def run(self, char=None, mode=None, count=1, inclusive=True, skipping=False):
-        def f(view, s):
-            if mode == modes.VISUAL_LINE:
-                raise ValueError(
-                    'this operator is not valid in mode {}'.format(mode))
-
-            b = s.b
-            if s.size() > 0:
-                b = resolve_insertion_point_at_b(s)
+        def find(text, s_a, s_b):
+            b = s_b
+            if s_a < s_b:
+                b = s_b - 1
 
             # Vim skips a character while performing the search
             # if the command is ';' or ',' after a 't' or 'T'
             if skipping:
                 b = b - 1
 
-            line_start = view.line(b).a
+            line_start = max(text.line_begin(b), b - threshold)
 
-            try:
-                match = b
-                for i in range(count):
-                    # line_text does not include character at match
-                    line_text = view.substr(sublime.Region(line_start, match))
-                    found_at = line_text.rindex(char)
-                    match = line_start + found_at
-            except ValueError:
-                return s
+            match = b
+            for i in range(count):
+                # The search range does not include the character at match.
+                match = text.rfind(char, line_start, match)
+                if match == -1:
+                    return s_a, s_b
 
             target_pos = match
             if not inclusive:
                 target_pos = target_pos + 1
 
             if mode == modes.NORMAL:
-                return sublime.Region(target_pos)
+                return target_pos, target_pos
             elif mode == modes.INTERNAL_NORMAL:
-                return sublime.Region(b, target_pos)
+                return b, target_pos
             # For visual modes...
             else:
-                new_a = resolve_insertion_point_at_a(s)
-                return utils.new_inclusive_region(new_a, target_pos)
+                new_a = s_a if (s_a < s_b) else (s_a - 1)
+                if new_a <= target_pos:
+                    return new_a, target_pos + 1
+                return new_a + 1, target_pos
+
+        def f(view, a, b, text):
+            for i in range(len(a)):
+                a[i], b[i] = find(text, a[i], b[i])
+            return a, b
 
         if not all([char, mode]):
             raise ValueError('bad parameters')
 
+        if mode == modes.VISUAL_LINE:
+            raise ValueError(
+                'this operator is not valid in mode {}'.format(mode))
+
         char = utils.translate_char(char)
+        threshold = utils.long_line_threshold(self.view)
 
-        state = self.state
-        regions_transformer(self.view, f)
+        regions_transformer_batch(self.view, f)
 
 
 class _vi_slash(ViMotionCommand, BufferSearchBase):
@@ -163,6 +179,7 @@ class _vi_slash(ViMotionCommand, BufferSearchBase):
         # TODO: re-enable this.
         # on_change = self.on_change if state.settings.vi['incsearch'] else None
         on_change = self.on_change
+        self.inc_search = IncrementalSearch(self.view, self.show_inc_search_hit)
 
         mark_as_widget(self.view.window().show_input_panel(
                                                             '',
@@ -174,6 +191,7 @@ class _vi_slash(ViMotionCommand, BufferSearchBase):
     def on_done(self, s):
         state = self.state
         state.sequence += s + '<CR>'
+        self.inc_search.cancel()
         self.view.erase_regions('vi_inc_search')
         state.last_buffer_search_command = 'vi_slash'
         state.motion = cmd_defs.ViSearchForwardImpl(term=s)
@@ -183,25 +201,31 @@ class _vi_slash(ViMotionCommand, BufferSearchBase):
         state.eval()
 
     def on_change(self, s):
-        state = self.state
-        flags = self.calculate_flags()
-        self.view.erase_regions('vi_inc_search')
-        next_hit = find_wrapping(self.view,
-                                 term=s,
-                                 start=self.view.sel()[0].b + 1,
-                                 end=self.view.size(),
-                                 flags=flags,
-                                 times=state.count)
-        if next_hit:
-            if state.mode == modes.VISUAL:
-                next_hit = sublime.Region(self.view.sel()[0].a, next_hit.a + 1)
+        try:
+            pattern, flags = self.translate(s)
+        except ValueError:
+            # The user hasn't finished typing the pattern yet.
+            self.inc_search.cancel()
+            self.show_inc_search_hit(None)
+            return
+        self.inc_search.update(pattern, flags, self.state.count)
+
+    def show_inc_search_hit(self, next_hit):
+        if not next_hit:
+            self.view.erase_regions('vi_inc_search')
+            return
+
+        if self.state.mode == modes.VISUAL:
+            next_hit = sublime.Region(self.view.sel()[0].a, next_hit.a + 1)
 
+        if self.view.get_regions('vi_inc_search') != [next_hit]:
             self.view.add_regions('vi_inc_search', [next_hit], 'comment', '')
-            if not self.view.visible_region().contains(next_hit.b):
-                self.view.show(next_hit.b)
+        if not self.view.visible_region().contains(next_hit.b):
+            self.view.show(next_hit.b)
 
     def on_cancel(self):
         state = self.state
+        self.inc_search.cancel()
         self.view.erase_regions('vi_inc_search')
         state.reset_command_data()
 
@@ -238,13 +262,20 @@ class _vi_slash_impl(ViMotionCommand, BufferSearchBase):
         # TODO: What should we do here? Case-sensitive or case-insensitive search? Configurable?
         # Search wrapping around the end of the buffer.
         # flags = sublime.IGNORECASE | sublime.LITERAL
-        flags = self.calculate_flags()
-        match = find_wrapping(self.view, search_string, start, wrapped_end, flags=flags, times=count)
+        try:
+            matches = self.find_matches(search_string)
+        except (ValueError, re.error):
+            show_error(VimError(ERR_INVALID_SEARCH_PATTERN))
+            return
+
+        match = matches.find_wrapping(start, wrapped_end, current_sel.a,
+                                      times=count)
         if not match:
             return
 
         regions_transformer(self.view, f)
         self.hilite(search_string)
+        self.display_search_count(search_string, match)
 
 
 
@@ -339,55 +370,20 @@ class _vi_h(ViMotionCommand):
 
 
 class _vi_j(ViMotionCommand):
-    def folded_rows(self, pt):
-        folds = self.view.folded_regions()
-        try:
-            fold = [f for f in folds if f.contains(pt)][0]
-            fold_row_a = self.view.rowcol(fold.a)[0]
-            fold_row_b = self.view.rowcol(fold.b - 1)[0]
-            # Return no. of hidden lines.
-            return (fold_row_b - fold_row_a)
-        except IndexError:
-            return 0
-
-    def next_non_folded_pt(self, pt):
-        # FIXME: If we have two contiguous folds, this method will fail.
-        # Handle folded regions.
-        folds = self.view.folded_regions()
-        try:
-            fold = [f for f in folds if f.contains(pt)][0]
-            non_folded_row = self.view.rowcol(self.view.full_line(fold.b).b)[0]
-            pt = self.view.text_point(non_folded_row, 0)
-        except IndexError:
-            pass
-        return pt
-
     def calculate_xpos(self, start, xpos):
-        size = self.view.settings().get('tab_size')
-        if self.view.line(start).empty():
+        column_map = columns.get_map(self.view, start)
+        if column_map.size == 0:
             return start, 0
-        else:
-            eol = self.view.line(start).b - 1
-        pt = 0
-        chars = 0
-        while (pt < xpos):
-            if self.view.substr(start + chars) == '\t':
-                pt += size
-            else:
-                pt += 1
-            chars += 1
-        pt = min(eol, start + chars)
-        return pt, chars
+        pt = column_map.pt_at(xpos)
+        return column_map.clamp(pt), pt - start
 
     def run(self, count=1, mode=None, xpos=0, no_translation=False):
         def f(view, s):
-            nonlocal xpos
             if mode == modes.NORMAL:
                 current_row = view.rowcol(s.b)[0]
-                target_row = min(current_row + count, view.rowcol(view.size())[0])
-                invisible_rows = self.folded_rows(view.line(s.b).b + 1)
-                target_pt = view.text_point(target_row + invisible_rows, 0)
-                target_pt = self.next_non_folded_pt(target_pt)
+                target_row = min(fold_index.row_below(current_row, count),
+                                 fold_index.visible_row(last_row))
+                target_pt = view.text_point(target_row, 0)
 
                 if view.line(target_pt).empty():
                     return sublime.Region(target_pt, target_pt)
@@ -406,15 +402,15 @@ class _vi_j(ViMotionCommand):
                 current_row = view.rowcol(exact_position)[0]
                 target_row = min(current_row + count, view.rowcol(view.size())[0])
                 target_pt = view.text_point(target_row, 0)
-                _, xpos = self.calculate_xpos(target_pt, xpos)
+                _, chars = self.calculate_xpos(target_pt, xpos)
 
-                end = min(self.view.line(target_pt).b, target_pt + xpos)
+                end = min(self.view.line(target_pt).b, target_pt + chars)
                 if s.a < s.b:
                     return sublime.Region(s.a, end + 1)
 
-                if (target_pt + xpos) >= s.a:
+                if (target_pt + chars) >= s.a:
                     return sublime.Region(s.a - 1, end + 1)
-                return sublime.Region(s.a, target_pt + xpos)
+                return sublime.Region(s.a, target_pt + chars)
 
 
             if mode == modes.VISUAL_LINE:
@@ -479,46 +475,25 @@ class _vi_j(ViMotionCommand):
                 self.view.sel().subtract(self.view.sel()[0])
                 return
 
+        fold_index = folds.get_index(self.view)
+        last_row = self.view.rowcol(self.view.size())[0]
         regions_transformer(self.view, f)
 
 
 class _vi_k(ViMotionCommand):
-    def previous_non_folded_pt(self, pt):
-        # FIXME: If we have two contiguous folds, this method will fail.
-        # Handle folded regions.
-        folds = self.view.folded_regions()
-        try:
-            fold = [f for f in folds if f.contains(pt)][0]
-            non_folded_row = self.view.rowcol(fold.a - 1)[0]
-            pt = self.view.text_point(non_folded_row, 0)
-        except IndexError:
-            pass
-        return pt
-
     def calculate_xpos(self, start, xpos):
-        if self.view.line(start).empty():
+        column_map = columns.get_map(self.view, start)
+        if column_map.size == 0:
             return start, 0
-        size = self.view.settings().get('tab_size')
-        eol = self.view.line(start).b - 1
-        pt = 0
-        chars = 0
-        while (pt < xpos):
-            if self.view.substr(start + chars) == '\t':
-                pt += size
-            else:
-                pt += 1
-            chars += 1
-        pt = min(eol, start + chars)
-        return (pt, chars)
+        pt = column_map.pt_at(xpos)
+        return column_map.clamp(pt), pt - start
 
     def run(self, count=1, mode=None, xpos=0, no_translation=False):
         def f(view, s):
-            nonlocal xpos
             if mode == modes.NORMAL:
                 current_row = view.rowcol(s.b)[0]
-                target_row = min(current_row - count, view.rowcol(view.size())[0])
+                target_row = fold_index.row_above(current_row, count)
                 target_pt = view.text_point(target_row, 0)
-                target_pt = self.previous_non_folded_pt(target_pt)
 
                 if view.line(target_pt).empty():
                     return sublime.Region(target_pt, target_pt)
@@ -537,15 +512,15 @@ class _vi_k(ViMotionCommand):
                 current_row = view.rowcol(exact_position)[0]
                 target_row = max(current_row - count, 0)
                 target_pt = view.text_point(target_row, 0)
-                _, xpos = self.calculate_xpos(target_pt, xpos)
+                _, chars = self.calculate_xpos(target_pt, xpos)
 
-                end = min(self.view.line(target_pt).b, target_pt + xpos)
+                end = min(self.view.line(target_pt).b, target_pt + chars)
                 if s.b >= s.a:
                     if (self.view.line(s.a).contains(s.b - 1) and
                         not self.view.line(s.a).contains(target_pt)):
                             return sublime.Region(s.a + 1, end)
                     else:
-                        if (target_pt + xpos) < s.a:
+                        if (target_pt + chars) < s.a:
                             return sublime.Region(s.a + 1, end)
                         else:
                             return sublime.Region(s.a, end + 1)
@@ -608,6 +583,7 @@ class _vi_k(ViMotionCommand):
             else:
                 return
 
+        fold_index = folds.get_index(self.view)
         regions_transformer(self.view, f)
 
 
@@ -718,38 +694,45 @@ class _vi_big_g(ViMotionCommand):
 
 class _vi_dollar(ViMotionCommand):
     def run(self, mode=None, count=1):
-        def f(view, s):
-            target = resolve_insertion_point_at_b(s)
+        def move(view, text, s_a, s_b):
+            target = (s_b - 1) if (s_a < s_b) else s_b
             if count > 1:
                 target = row_to_pt(view, row_at(view, target) + (count - 1))
-            eol = view.line(target).b
+            eol = text.line_end(target)
 
             if mode == modes.NORMAL:
-                return R(eol if view.line(eol).empty() else (eol - 1))
+                pt = eol if (text.line_begin(eol) == eol) else (eol - 1)
+                return pt, pt
 
             elif mode == modes.VISUAL:
                 # TODO(guillermooo): is this really a special case? can we not
                 # include this case in .resize_visual_region()?
                 # Perhaps we should always ensure that a minimal visual sel
                 # was always such that .a < .b?
-                if (s.a == eol) and not view.line(eol).empty():
-                    return R(s.a - 1, eol + 1)
-                return resize_visual_region(s, eol)
+                if (s_a == eol) and (text.line_begin(eol) != eol):
+                    return s_a - 1, eol + 1
+                r = resize_visual_region(R(s_a, s_b), eol)
+                return r.a, r.b
 
             elif mode == modes.INTERNAL_NORMAL:
                 # TODO(guillermooo): perhaps create a
                 # .is_linewise_motion() helper?
-                if get_bol(view, s.a) == s.a:
-                    return R(s.a, eol + 1)
-                return R(s.a, eol)
+                if text.line_begin(s_a) == s_a:
+                    return s_a, eol + 1
+                return s_a, eol
 
             elif mode == modes.VISUAL_LINE:
                 # TODO: Implement this. Not too useful, though.
-                return s
+                return s_a, s_b
 
-            return s
+            return s_a, s_b
 
-        regions_transformer(self.view, f)
+        def f(view, a, b, text):
+            for i in range(len(a)):
+                a[i], b[i] = move(view, text, a[i], b[i])
+            return a, b
+
+        regions_transformer_batch(self.view, f)
 
 class _vi_w(ViMotionCommand):
     def run(self, mode=None, count=1):
@@ -854,19 +837,25 @@ class _vi_e(ViMotionCommand):
 
 class _vi_zero(ViMotionCommand):
     def run(self, mode=None, count=1):
-        def f(view, s):
+        def move(text, s_a, s_b):
             if mode == modes.NORMAL:
-                return sublime.Region(view.line(s.b).a)
+                bol = text.line_begin(s_b)
+                return bol, bol
             elif mode == modes.INTERNAL_NORMAL:
-                return sublime.Region(s.a, view.line(s.b).a)
+                return s_a, text.line_begin(s_b)
             elif mode == modes.VISUAL:
-                if s.a < s.b:
-                    return sublime.Region(s.a, view.line(s.b - 1).a + 1)
+                if s_a < s_b:
+                    return s_a, text.line_begin(s_b - 1) + 1
                 else:
-                    return sublime.Region(s.a, view.line(s.b).a)
-            return s
+                    return s_a, text.line_begin(s_b)
+            return s_a, s_b
 
-        regions_transformer(self.view, f)
+        def f(view, a, b, text):
+            for i in range(len(a)):
+                a[i], b[i] = move(text, a[i], b[i])
+            return a, b
+
+        regions_transformer_batch(self.view, f)
 
 
 class _vi_right_brace(ViMotionCommand):
@@ -960,11 +949,9 @@ class _vi_percent(ViMotionCommand):
         if any([self.view.substr(pt) in p for p in self.pairs]):
             return None
 
-        _, tag = get_closest_tag(self.view, pt)
-        if tag.contains(pt):
-            begin_tag, end_tag, _ = find_containing_tag(self.view, pt)
-            if begin_tag:
-                return begin_tag if end_tag.contains(pt) else end_tag
+        element, is_start_tag = tags.get_tree(self.view).tag_at(pt)
+        if element:
+            return element.end if is_start_tag else element.start
 
 
     def run(self, percent=None, mode=None):
@@ -1047,9 +1034,7 @@ class _vi_percent(ViMotionCommand):
 
            Example: ('(', ('(', ')'), 1337))
         """
-        caret_row, caret_col = self.view.rowcol(caret_pt)
-        line_text = self.view.substr(sublime.Region(caret_pt,
-                                                    self.view.line(caret_pt).b))
+        line_text = self.view.substr(utils.line_tail(self.view, caret_pt))
         try:
             found_brackets = min([(line_text.index(bracket), bracket)
                                         for bracket in chain(*self.pairs)
@@ -1060,7 +1045,7 @@ class _vi_percent(ViMotionCommand):
         bracket_a, bracket_b = [(a, b) for (a, b) in self.pairs
                                        if found_brackets[1] in (a, b)][0]
         return (found_brackets[1], (bracket_a, bracket_b),
-                self.view.text_point(caret_row, caret_col + found_brackets[0]))
+                caret_pt + found_brackets[0])
 
     def find_balanced_closing_bracket(self, start, brackets, unbalanced=0):
         new_start = start
@@ -1210,25 +1195,14 @@ class _vi_big_m(ViMotionCommand):
 class _vi_star(ViMotionCommand, ExactWordBufferSearchBase):
     def run(self, count=1, mode=None, search_string=None):
         def f(view, s):
-            pattern = self.build_pattern(query)
-            flags = self.calculate_flags()
-
-            if mode == modes.INTERNAL_NORMAL:
-                match = find_wrapping(view,
-                                      term=pattern,
-                                      start=view.word(s.end()).end(),
-                                      end=view.size(),
-                                      flags=flags,
-                                      times=1)
-            else:
-                match = find_wrapping(view,
-                                      term=pattern,
-                                      start=view.word(s.end()).end(),
-                                      end=view.size(),
-                                      flags=flags,
-                                      times=1)
+            match = self.find_matches(query).find_wrapping(
+                                            view.word(s.end()).end(),
+                                            view.size(),
+                                            view.sel()[0].a,
+                                            times=count)
 
             if match:
+                found.append(match)
                 if mode == modes.INTERNAL_NORMAL:
                     return sublime.Region(s.a, match.begin())
                 elif mode == modes.VISUAL:
@@ -1250,7 +1224,10 @@ class _vi_star(ViMotionCommand, ExactWordBufferSearchBase):
             # Ensure n and N can repeat this search later.
             state.last_buffer_search = query
 
+        found = []
         regions_transformer(self.view, f)
+        if found:
+            self.display_search_count(query, found[0])
 
         if not search_string:
             state.last_buffer_search_command = 'vi_star'
@@ -1259,25 +1236,15 @@ class _vi_star(ViMotionCommand, ExactWordBufferSearchBase):
 class _vi_octothorp(ViMotionCommand, ExactWordBufferSearchBase):
     def run(self, count=1, mode=None, search_string=None):
         def f(view, s):
-            pattern = self.build_pattern(query)
-            flags = self.calculate_flags()
-
-            if mode == modes.INTERNAL_NORMAL:
-                match = reverse_find_wrapping(view,
-                                              term=pattern,
-                                              start=0,
-                                              end=start_sel.a,
-                                              flags=flags,
-                                              times=1)
-            else:
-                match = reverse_find_wrapping(view,
-                                              term=pattern,
-                                              start=0,
-                                              end=start_sel.a,
-                                              flags=flags,
-                                              times=1)
+            match = self.find_matches(query).reverse_find_wrapping(
+                                            0,
+                                            start_sel.a,
+                                            view.sel()[0].b,
+                                            view.size(),
+                                            times=count)
 
             if match:
+                found.append(match)
                 if mode == modes.INTERNAL_NORMAL:
                     return sublime.Region(s.b, match.begin())
                 elif mode == modes.VISUAL:
@@ -1300,7 +1267,10 @@ class _vi_octothorp(ViMotionCommand, ExactWordBufferSearchBase):
             state.last_buffer_search = query
 
         start_sel = self.view.sel()[0]
+        found = []
         regions_transformer(self.view, f)
+        if found:
+            self.display_search_count(query, found[0])
 
         if not search_string:
             state.last_buffer_search_command = 'vi_octothorp'
@@ -1408,28 +1378,37 @@ class _vi_underscore(ViMotionCommand):
 
 class _vi_hat(ViMotionCommand):
     def run(self, count=None, mode=None):
-        def f(view, s):
-            a = s.a
-            b = s.b
-            if s.size() > 0:
-                a = resolve_insertion_point_at_a(s)
-                b = resolve_insertion_point_at_b(s)
-
-            bol = self.view.line(b).a
-            bol = utils.next_non_white_space_char(self.view, bol, white_space='\t ')
+        def move(text, s_a, s_b):
+            a = s_a
+            b = s_b
+            if s_a < s_b:
+                b = s_b - 1
+            elif s_b < s_a:
+                a = s_a - 1
+
+            bol = text.line_begin(b)
+            while text.char(bol) in '\t ':
+                bol += 1
 
             if mode == modes.NORMAL:
-                return sublime.Region(bol)
+                return bol, bol
             elif mode == modes.INTERNAL_NORMAL:
                 # The character at the "end" of the region is skipped in both
                 # forward and reverse cases, so unlike other regions, no need to add 1 to it
-                return sublime.Region(a, bol)
+                return a, bol
             elif mode == modes.VISUAL:
-                return utils.new_inclusive_region(a, bol)
+                if a <= bol:
+                    return a, bol + 1
+                return a + 1, bol
             else:
-                return s
+                return s_a, s_b
 
-        regions_transformer(self.view, f)
+        def f(view, a, b, text):
+            for i in range(len(a)):
+                a[i], b[i] = move(text, a[i], b[i])
+            return a, b
+
+        regions_transformer_batch(self.view, f)
 
 
 class _vi_gj(ViMotionCommand):
@@ -1563,11 +1542,7 @@ class _vi_ctrl_d(ViMotionCommand):
 
 class _vi_pipe(ViMotionCommand):
     def col_to_pt(self, pt, nr):
-        if self.view.line(pt).size() < nr:
-            return self.view.line(pt).b - 1
-
-        row = self.view.rowcol(pt)[0]
-        return self.view.text_point(row, nr) - 1
+        return columns.pt_at(self.view, pt, nr - 1)
 
     def run(self, mode=None, count=None):
         def f(view, s):
@@ -1735,14 +1710,16 @@ class _vi_question_mark_impl(ViMotionCommand, BufferSearchBase):
         if search_string is None:
             return
 
-        flags = self.calculate_flags()
         # FIXME: What should we do here? Case-sensitive or case-insensitive search? Configurable?
-        found = reverse_find_wrapping(self.view,
-                                      term=search_string,
-                                      start=0,
-                                      end=self.view.sel()[0].b,
-                                      flags=flags,
-                                      times=count)
+        try:
+            matches = self.find_matches(search_string)
+        except (ValueError, re.error):
+            show_error(VimError(ERR_INVALID_SEARCH_PATTERN))
+            return
+
+        current_sel = self.view.sel()[0]
+        found = matches.reverse_find_wrapping(0, current_sel.b, current_sel.b,
+                                              self.view.size(), times=count)
 
         if not found:
             print("Vintageous: Pattern not found.")
@@ -1750,6 +1727,7 @@ class _vi_question_mark_impl(ViMotionCommand, BufferSearchBase):
 
         regions_transformer(self.view, f)
         self.hilite(search_string)
+        self.display_search_count(search_string, found)
 
 
 class _vi_question_mark(ViMotionCommand, BufferSearchBase):
@@ -1757,6 +1735,8 @@ class _vi_question_mark(ViMotionCommand, BufferSearchBase):
         self.state.reset_during_init = False
         state = self.state
         on_change = self.on_change if state.settings.vi['incsearch'] else None
+        self.inc_search = IncrementalSearch(self.view, self.show_inc_search_hit,
+                                            forward=False)
         mark_as_widget(self.view.window().show_input_panel(
                                                             '',
                                                             default,
@@ -1767,6 +1747,7 @@ class _vi_question_mark(ViMotionCommand, BufferSearchBase):
     def on_done(self, s):
         state = self.state
         state.sequence += s + '<CR>'
+        self.inc_search.cancel()
         self.view.erase_regions('vi_inc_search')
         state.last_buffer_search_command = 'vi_question_mark'
         state.motion = cmd_defs.ViSearchBackwardImpl(term=s)
@@ -1776,23 +1757,30 @@ class _vi_question_mark(ViMotionCommand, BufferSearchBase):
         state.eval()
 
     def on_change(self, s):
-        flags = self.calculate_flags()
-        self.view.erase_regions('vi_inc_search')
-        state = self.state
-        occurrence = reverse_find_wrapping(self.view,
-                                 term=s,
-                                 start=0,
-                                 end=self.view.sel()[0].b,
-                                 flags=flags,
-                                 times=state.count)
-        if occurrence:
-            if state.mode == modes.VISUAL:
-                occurrence = sublime.Region(self.view.sel()[0].a, occurrence.a)
+        try:
+            pattern, flags = self.translate(s)
+        except ValueError:
+            # The user hasn't finished typing the pattern yet.
+            self.inc_search.cancel()
+            self.show_inc_search_hit(None)
+            return
+        self.inc_search.update(pattern, flags, self.state.count)
+
+    def show_inc_search_hit(self, occurrence):
+        if not occurrence:
+            self.view.erase_regions('vi_inc_search')
+            return
+
+        if self.state.mode == modes.VISUAL:
+            occurrence = sublime.Region(self.view.sel()[0].a, occurrence.a)
+
+        if self.view.get_regions('vi_inc_search') != [occurrence]:
             self.view.add_regions('vi_inc_search', [occurrence], 'comment', '')
-            if not self.view.visible_region().contains(occurrence):
-                self.view.show(occurrence)
+        if not self.view.visible_region().contains(occurrence):
+            self.view.show(occurrence)
 
     def on_cancel(self):
+        self.inc_search.cancel()
         self.view.erase_regions('vi_inc_search')
         state = self.state
         state.reset_command_data()
@@ -1973,7 +1961,15 @@ class _vi_go_to_symbol(ViMotionCommand):
     """
     def find_symbol(self, r, globally=False):
         query = self.view.substr(self.view.word(r))
-        fname = self.view.file_name().replace('\\', '/')
+
+        if not globally:
+            # The view's own symbols are available even if the file hasn't
+            # been indexed (or saved) yet.
+            symbol = symbols.get_index(self.view).find(query)
+            if symbol:
+                return self.view.rowcol(symbol.name_pt)
+
+        fname = (self.view.file_name() or '').replace('\\', '/')
 
         locations = self.view.window().lookup_symbol_in_index(query)
         if not locations:
@@ -2010,6 +2006,14 @@ class _vi_go_to_symbol(ViMotionCommand):
 
         location = self.find_symbol(current_sel, globally=globally)
         if not location:
+            # Unsaved or unindexed buffer; fall back to searching for the
+            # first occurrence of the word like Vim does.
+            location = identifiers.find_declaration(self.view,
+                                                    current_sel.b,
+                                                    globally=globally)
+            if location is None:
+                return
+            regions_transformer(self.view, f)
             return
 
         if globally:
@@ -2046,6 +2050,33 @@ class _vi_gm(ViMotionCommand):
         regions_transformer(self.view, advance)
 
 
+def _move_to_symbol(view, mode, count, find, top_level):
+    """
+    Moves the selections to the symbol boundary returned by the `SymbolIndex`
+    method called @find.
+
+    @top_level
+      If `True`, only top-level definitions are considered.
+    """
+    index = symbols.get_index(view)
+    find = getattr(index, find)
+
+    def move(view, s):
+        pt = find(resolve_insertion_point_at_b(s), count, top_level)
+        if pt is None:
+            return s
+
+        if mode == modes.NORMAL:
+            return R(pt)
+        elif mode == modes.VISUAL:
+            return resize_visual_region(s, pt)
+        elif mode == modes.INTERNAL_NORMAL:
+            return R(s.a, pt)
+        return s
+
+    regions_transformer(view, move)
+
+
 class _vi_left_square_bracket(ViMotionCommand):
     """
     Vim: `[`
@@ -2057,7 +2088,21 @@ class _vi_left_square_bracket(ViMotionCommand):
         ')': ('\\(', '\\)'),
     }
 
+    # `[[`, `[]`, `[m` and `[M` go to the previous start or end of a
+    # definition.
+    SYMBOL_TARGETS = {
+        '[': ('previous_start', True),
+        ']': ('previous_end', True),
+        'm': ('previous_start', False),
+        'M': ('previous_end', False),
+    }
+
     def run(self, mode=None, count=1, char=None):
+        if char in self.SYMBOL_TARGETS:
+            _move_to_symbol(self.view, mode, count,
+                            *self.SYMBOL_TARGETS[char])
+            return
+
         def move(view, s):
             reg = find_prev_lone_bracket(self.view, s.b, brackets)
             if reg is not None:
@@ -2088,7 +2133,20 @@ class _vi_right_square_bracket(ViMotionCommand):
         ')': ('\\(', '\\)'),
     }
 
+    # `]]`, `][`, `]m` and `]M` go to the next start or end of a definition.
+    SYMBOL_TARGETS = {
+        ']': ('next_start', True),
+        '[': ('next_end', True),
+        'm': ('next_start', False),
+        'M': ('next_end', False),
+    }
+
     def run(self, mode=None, count=1, char=None):
+        if char in self.SYMBOL_TARGETS:
+            _move_to_symbol(self.view, mode, count,
+                            *self.SYMBOL_TARGETS[char])
+            return
+
         def move(view, s):
             reg = find_next_lone_bracket(self.view, s.b, brackets)
             if reg is not None:
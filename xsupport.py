@@ -9,7 +9,16 @@ import sublime_plugin
 
 from Vintageous.state import _init_vintageous
 from Vintageous.state import State
+from Vintageous.vi import clipboard
+from Vintageous.vi import columns
+from Vintageous.vi import folds
+from Vintageous.vi import hlsearch
+from Vintageous.vi import identifiers
+from Vintageous.vi import indents
+from Vintageous.vi import search
 from Vintageous.vi import settings
+from Vintageous.vi import symbols
+from Vintageous.vi import tags
 from Vintageous.vi import cmd_defs
 from Vintageous.vi.dot_file import DotFile
 from Vintageous.vi.utils import modes
@@ -49,6 +58,17 @@ class VintageStateTracker(sublime_plugin.EventListener):
 
     def on_close(self, view):
         settings.destroy(view)
+        folds.destroy(view)
+        columns.destroy(view)
+        search.destroy(view)
+        hlsearch.destroy(view)
+        identifiers.destroy(view)
+        indents.destroy(view)
+        tags.destroy(view)
+        symbols.destroy(view)
+
+    def on_modified(self, view):
+        hlsearch.on_modified(view)
 
 
 class ViMouseTracker(sublime_plugin.EventListener):
@@ -80,6 +100,23 @@ class ViMouseTracker(sublime_plugin.EventListener):
                     ]})
 
 
+class ViClipboardTracker(sublime_plugin.EventListener):
+
+    def sets_clipboard(self, command):
+        # Sublime Text's commands that set the system clipboard behind our
+        # back, like copy, cut and copy_path. Resetting the clipboard cache
+        # after any other copy_* command only costs an extra read.
+        return command == 'cut' or command.startswith('copy')
+
+    def on_post_text_command(self, view, command, args):
+        if self.sets_clipboard(command):
+            clipboard.reset()
+
+    def on_post_window_command(self, window, command, args):
+        if self.sets_clipboard(command):
+            clipboard.reset()
+
+
 # TODO: Test me.
 class ViFocusRestorerEvent(sublime_plugin.EventListener):
 
@@ -90,6 +127,8 @@ class ViFocusRestorerEvent(sublime_plugin.EventListener):
         self.timer = None
 
     def on_activated(self, view):
+        # The clipboard may have changed in another application.
+        clipboard.invalidate()
         if self.timer:
             self.timer.cancel()
             # Switching to a different view; enter normal mode.